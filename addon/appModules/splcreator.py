@@ -6,7 +6,7 @@
 
 # #155 (21.03): remove __future__ import when NVDA runs under Python 3.10.
 from __future__ import annotations
-from typing import Any, Optional
+from typing import Any, Mapping, Optional
 import appModuleHandler
 import addonHandler
 import scriptHandler
@@ -14,37 +14,28 @@ import globalVars
 import ui
 import api
 from NVDAObjects.IAccessible import sysListView32
-from .splstudio import splconfig, SPLTrackItem
+from .splstudio import splconfig, splcolumns, SPLTrackItem
 addonHandler.initTranslation()
 
 
 # Return a tuple of column headers.
 # This is just a thinly disguised indexOf function from Studio's track item class.
+# 21.03: column headers are defined in splcolumns module.
 def indexOf(creatorVersion: str) -> tuple[str, ...]:
-	# Nine columns per line for each tuple.
-	if creatorVersion >= "5.31":
-		return (
-			"Artist", "Title", "Position", "Cue", "Intro", "Outro", "Segue", "Duration", "Last Scheduled",
-			"7 Days", "Date Restriction", "Year", "Album", "Genre", "Mood", "Energy", "Tempo", "BPM",
-			"Gender", "Rating", "File Created", "Filename", "Client", "Other", "Intro Link", "Outro Link", "Language"
-		)
-	else:
-		return (
-			"Artist", "Title", "Position", "Cue", "Intro", "Outro", "Segue", "Duration", "Last Scheduled",
-			"7 Days", "Date Restriction", "Year", "Album", "Genre", "Mood", "Energy", "Tempo", "BPM",
-			"Gender", "Rating", "File Created", "Filename", "Client", "Other", "Intro Link", "Outro Link"
-		)
+	return splcolumns.creatorColumns(creatorVersion)
 
 
 class SPLCreatorItem(SPLTrackItem):
 	"""An entry in SPL Creator (mostly tracks).
 	"""
 
+	# 21.03: use header to column index map for this version, bound to the app module when first needed.
 	def indexOf(self, header: str) -> Optional[int]:
-		try:
-			return indexOf(self.appModule.productVersion).index(header)
-		except ValueError:
-			return None
+		columnIndices = self.appModule.columnIndices
+		if columnIndices is None:
+			columnIndices = splcolumns.headerMap("creator", self.appModule.productVersion)
+			self.appModule.columnIndices = columnIndices
+		return columnIndices.get(header)
 
 	@property
 	def exploreColumns(self) -> list[str]:
@@ -59,6 +50,9 @@ class SPLPlaylistEditorItem(SPLTrackItem):
 
 class AppModule(appModuleHandler.AppModule):
 
+	# 21.03: header to column index map for this Creator version (see track item's index of method).
+	columnIndices: Optional[Mapping[str, int]] = None
+
 	def __init__(self, *args, **kwargs):
 		super(AppModule, self).__init__(*args, **kwargs)
 		# Announce Creator version at startup unless minimal flag is set.
@@ -74,6 +68,8 @@ class AppModule(appModuleHandler.AppModule):
 	def terminate(self):
 		super(AppModule, self).terminate()
 		splconfig.closeConfig("splcreator")
+		# 21.03: forget column read strategies learned for this app.
+		SPLTrackItem.resetColumnReadStrategies(self.processID)
 		# Clear Playlist Editor status cache,
 		# otherwise it will generate errors when Creator restarts without restarting NVDA.
 		self._playlistEditorStatusCache.clear()
@@ -4,8 +4,7 @@
 
 # #155 (21.03): remove __future__ import when NVDA runs under Python 3.10.
 from __future__ import annotations
-from typing import Optional
-import threading
+from typing import Any, Generator, Optional
 import time
 import os
 import weakref
@@ -18,17 +17,13 @@ import ui
 import keyboardHandler
 import scriptHandler
 from NVDAObjects.IAccessible import IAccessible, sysListView32, getNVDAObjectFromEvent
-from winUser import user32, sendMessage, OBJID_CLIENT
+from winUser import user32, OBJID_CLIENT
 import tones
 import gui
 import wx
 import addonHandler
 addonHandler.initTranslation()
 
-# Various SPL IPC tags.
-SPLPlay = 12
-SPL_TrackPlaybackStatus = 104
-
 # Needed in Encoder support:
 # Encoder labels dictionary.
 SPLEncoderLabels = {}
@@ -38,8 +33,9 @@ SPLFocusToStudio = set()
 SPLPlayAfterConnecting = set()
 # Use a thread to monitor status changes for encoders.
 SPLBackgroundMonitor = set()
-# A collection of encoder status monitor threads.
-SPLBackgroundMonitorThreads: dict[str, threading.Thread] = {}
+# A collection of encoder status monitor jobs.
+# 21.03: status monitors are tasks run by the add-on scheduler instead of a thread per encoder.
+SPLBackgroundMonitorJobs: dict[str, Any] = {}
 # Do not play connection tone while an encoder is connecting.
 SPLNoConnectionTone = set()
 # Stop announcing connection status messages when an error is encountered.
@@ -165,13 +161,18 @@ def cleanup(appTerminating: bool = False, reset: bool = False) -> None:
 		return
 	if appTerminating:
 		saveEncoderConfig()
+	# 21.03: stop encoder status monitors, and log anything still active (leaking) afterwards.
+	if SPLBackgroundMonitorJobs:
+		from appModules.splstudio import splscheduler
+		splscheduler.cancelJobs(owner="encoders")
+		splscheduler.reportLeaks(owner="encoders")
 	if reset or appTerminating:
 		config.post_configSave.unregister(saveEncoderConfig)
 		config.post_configReset.unregister(resetEncoderConfig)
 	for flag in [
 		encoderConfig, SPLEncoderLabels,
 		SPLFocusToStudio, SPLPlayAfterConnecting,
-		SPLBackgroundMonitor, SPLBackgroundMonitorThreads,
+		SPLBackgroundMonitor, SPLBackgroundMonitorJobs,
 		SPLNoConnectionTone, SPLConnectionStopOnError
 	]:
 		if flag is not None:
@@ -465,33 +466,39 @@ class Encoder(IAccessible):
 		# #79 (18.10.1/18.09.3-lts): wxPython 4 is more strict about where timers can be invoked from.
 		# An exception will be logged if called from a thread other than the main one.
 		# This is especially the case with some speech synthesizers and/or braille displays.
-		try:
-			# #135 (20.06): find out how many background monitor threads for this encoder type are still active.
-			# #136 (20.07): encoder monitoring can cross encoder type boundaries
-			# (multiple encoder types can be monitored at once).
-			# Include encoder ID if multiple encoders have one encoder entry being monitored.
-			if len([thread for thread in SPLBackgroundMonitorThreads.values() if thread.is_alive()]) > 1:
-				ui.message("{}: {}".format(self.encoderId, message))
-			else:
-				ui.message(message)
-		except Exception:
-			pass
-
-	# Encoder connection reporter thread.
+		# 21.03: therefore the announcement broker delivers status messages from main thread,
+		# replacing pending status message for this encoder.
+		from appModules.splstudio import splannouncer
+		# #135 (20.06): find out how many background monitor threads for this encoder type are still active.
+		# #136 (20.07): encoder monitoring can cross encoder type boundaries
+		# (multiple encoder types can be monitored at once).
+		# Include encoder ID if multiple encoders have one encoder entry being monitored.
+		if len([job for job in SPLBackgroundMonitorJobs.values() if job.active]) > 1:
+			message = "{}: {}".format(self.encoderId, message)
+		splannouncer.announce(message, category=f"encoder {self.encoderId}")
+
+	# Encoder connection reporter job.
 	# By default background encoding (no manual connect) is assumed.
 	def connectStart(self, manualConnect: bool = False) -> None:
-		# 20.09: don't bother if another thread is monitoring this encoder.
-		if self.encoderId in SPLBackgroundMonitorThreads and SPLBackgroundMonitorThreads[self.encoderId].is_alive():
+		# 20.09: don't bother if another job is monitoring this encoder.
+		if self.encoderId in SPLBackgroundMonitorJobs and SPLBackgroundMonitorJobs[self.encoderId].active:
 			return
-		statusThread = threading.Thread(
-			target=self.reportConnectionStatus, kwargs=dict(manualConnect=manualConnect)
+		# 21.03: connection status reporter is a task run by the add-on scheduler.
+		# Because status is obtained via cross-process calls, each encoder is monitored from its own thread
+		# so other scheduled jobs (and other encoders) are not held up.
+		from appModules.splstudio import splscheduler
+		SPLBackgroundMonitorJobs[self.encoderId] = splscheduler.runThreadTask(
+			self.reportConnectionStatus(manualConnect=manualConnect),
+			name=f"encoder {self.encoderId}", owner="encoders"
 		)
-		statusThread.start()
-		SPLBackgroundMonitorThreads[self.encoderId] = statusThread
+
+	# 21.03: seconds to wait before checking connection status again.
+	statusPollInterval = 0.25
 
 	# #103: the abstract method that is responsible for announcing connection status.
+	# 21.03: this is a scheduler task, yielding seconds to wait before checking status again.
 	@abstractmethod
-	def reportConnectionStatus(self, manualConnect: bool = False) -> None:
+	def reportConnectionStatus(self, manualConnect: bool = False) -> Generator[float, None, None]:
 		raise NotImplementedError
 
 	# Respond to encoders being connected.
@@ -513,9 +520,11 @@ class Encoder(IAccessible):
 				ui.message(_("SPL Studio is minimized to system tray."))
 		if self.playAfterConnecting:
 			# Do not interupt the currently playing track.
-			SPLWin = user32.FindWindowW("SPLStudio", None)
-			if sendMessage(SPLWin, 1024, 0, SPL_TrackPlaybackStatus) == 0:
-				sendMessage(SPLWin, 1024, 0, SPLPlay)
+			# 21.03: go through Studio API function from Studio app module
+			# (records Studio API statistics and returns None if Studio is not running).
+			from appModules.splstudio import splbase
+			if splbase.studioAPI(0, splbase.SPL_TrackPlaybackStatus) == 0:
+				splbase.studioAPI(0, splbase.SPLPlay)
 
 	# Now the flag configuration scripts.
 
@@ -574,7 +583,7 @@ class Encoder(IAccessible):
 			self.backgroundMonitor = not self.backgroundMonitor
 			if self.backgroundMonitor:
 				try:
-					monitoring = SPLBackgroundMonitorThreads[self.encoderId].is_alive()
+					monitoring = SPLBackgroundMonitorJobs[self.encoderId].active
 				except KeyError:
 					monitoring = False
 				if not monitoring:
@@ -672,9 +681,9 @@ class Encoder(IAccessible):
 			loadEncoderConfig()
 		# 6.2: Make sure background monitor threads are started if the flag is set.
 		if self.backgroundMonitor:
-			if self.encoderId in SPLBackgroundMonitorThreads:
-				if not SPLBackgroundMonitorThreads[self.encoderId].is_alive():
-					del SPLBackgroundMonitorThreads[self.encoderId]
+			if self.encoderId in SPLBackgroundMonitorJobs:
+				if not SPLBackgroundMonitorJobs[self.encoderId].active:
+					del SPLBackgroundMonitorJobs[self.encoderId]
 				# If it is indeed alive...
 				# Otherwise another thread will be created to keep an eye on this encoder (undesirable).
 				else:
@@ -701,9 +710,9 @@ class SAMEncoder(Encoder, sysListView32.ListItem):
 	def connected(self) -> bool:
 		return self._getColumnContentRaw(2) == "Encoding"
 
-	def reportConnectionStatus(self, manualConnect: bool = False) -> None:
+	def reportConnectionStatus(self, manualConnect: bool = False) -> Generator[float, None, None]:
 		# A fake child object holds crucial information about connection status.
-		# In order to not block NVDA commands, this will be done using a different thread.
+		# In order to not block NVDA commands, this will be done using a scheduler task.
 		attemptTime = time.time()
 		messageCache = ""
 		# Status message flags.
@@ -714,7 +723,7 @@ class SAMEncoder(Encoder, sysListView32.ListItem):
 		# #141 (20.07): prevent multiple connection follow-up actions while background monitoring is on.
 		connectedBefore = False
 		while True:
-			time.sleep(0.001)
+			yield self.statusPollInterval
 			try:
 				status = self._getColumnContentRaw(2)
 				statusDetails = self._getColumnContentRaw(3)
@@ -851,8 +860,8 @@ class SPLEncoder(Encoder):
 		status = self._getColumnContentRaw(1)
 		return "Kbps" in status or "Connected" in status
 
-	def reportConnectionStatus(self, manualConnect: bool = False) -> None:
-		# Same routine as SAM encoder: use a thread to prevent blocking NVDA commands.
+	def reportConnectionStatus(self, manualConnect: bool = False) -> Generator[float, None, None]:
+		# Same routine as SAM encoder: use a scheduler task to prevent blocking NVDA commands.
 		attemptTime = time.time()
 		messageCache = ""
 		# Status flags.
@@ -860,7 +869,7 @@ class SPLEncoder(Encoder):
 		connected = False
 		connectedBefore = False
 		while True:
-			time.sleep(0.001)
+			yield self.statusPollInterval
 			try:
 				status = self._getColumnContentRaw(1)
 			except AttributeError:
@@ -14,12 +14,14 @@
 
 # #155 (21.03): remove __future__ import when NVDA runs under Python 3.10.
 from __future__ import annotations
-from typing import Any, Optional
+from typing import Any, Callable, Mapping, Optional
 from functools import wraps
 import os
 import time
 import threading
 from abc import abstractmethod
+from ctypes import Structure, byref, c_int, c_int32, c_int64, c_uint, c_uint32, c_uint64, c_wchar
+from ctypes import create_unicode_buffer, sizeof
 import controlTypes
 import appModuleHandler
 import api
@@ -34,6 +36,8 @@ import touchHandler
 import gui
 import wx
 from winUser import user32, OBJID_CLIENT
+import winKernel
+import watchdog
 from logHandler import log
 from NVDAObjects import NVDAObjectTextInfo
 from NVDAObjects.IAccessible import IAccessible, getNVDAObjectFromEvent, sysListView32
@@ -45,6 +49,9 @@ from . import splconfig
 from . import splconfui
 from . import splmisc
 from . import splactions
+from . import splscheduler
+from . import splannouncer
+from . import splcolumns
 import addonHandler
 addonHandler.initTranslation()
 from ..skipTranslation import translate
@@ -68,9 +75,10 @@ def finally_(func, final):
 SPLMinVersion = "5.30"
 
 # Threads pool.
-micAlarmT: Optional[threading.Timer] = None
-micAlarmT2 = None
-libScanT: Optional[threading.Thread] = None
+# 21.03: microphone alarm timers are jobs run by the add-on scheduler.
+# Library scan progress is tracked by Studio API heartbeat.
+micAlarmT: Optional[splscheduler.ScheduledJob] = None
+micAlarmT2: Optional[splscheduler.ScheduledJob] = None
 
 # Versions of Studio where library scanning functionality is broken.
 noLibScanMonitor: list[str] = []
@@ -88,7 +96,7 @@ def _micAlarmAnnouncer() -> None:
 		nvwave.playWaveFile(os.path.join(os.path.dirname(__file__), "SPL_MicAlarm.wav"))
 	if splconfig.SPLConfig["General"]["AlarmAnnounce"] in ("message", "both"):
 		# Translators: Presented when microphone has been active for a while.
-		ui.message(_("Microphone active"))
+		splannouncer.announce(_("Microphone active"), priority=splannouncer.PRIORITY_ALARM, category="micAlarm")
 
 
 # Manage microphone alarm announcement.
@@ -98,9 +106,13 @@ def micAlarmManager(micAlarmWav: str, micAlarmMessage: str) -> None:
 	global micAlarmT2
 	# Use a timer to play a tone when microphone was active for more than the specified amount.
 	# Mechanics come from Clock add-on.
-	if splconfig.SPLConfig["MicrophoneAlarm"]["MicAlarmInterval"]:
-		micAlarmT2 = wx.PyTimer(_micAlarmAnnouncer)
-		wx.CallAfter(micAlarmT2.Start, splconfig.SPLConfig["MicrophoneAlarm"]["MicAlarmInterval"] * 1000)
+	# 21.03: interval alarm is announced from main thread via the scheduler.
+	micAlarmInterval = splconfig.SPLConfig["MicrophoneAlarm"]["MicAlarmInterval"]
+	if micAlarmInterval:
+		micAlarmT2 = splscheduler.schedule(
+			micAlarmInterval, _micAlarmAnnouncer, name="micAlarmInterval", owner="splstudio",
+			interval=micAlarmInterval, mainThread=True
+		)
 
 
 # Category sounds dictionary (key = category, value = tone pitch).
@@ -111,6 +123,58 @@ _SPLCategoryTones = {
 }
 
 
+# 21.03: list view item structures (LVITEMW) as seen by 32-bit and 64-bit list views,
+# used when reading several columns of a track at once.
+class _LVITEM32(Structure):
+	_fields_ = [
+		("mask", c_uint), ("iItem", c_int), ("iSubItem", c_int), ("state", c_uint), ("stateMask", c_uint),
+		("pszText", c_uint32), ("cchTextMax", c_int), ("iImage", c_int), ("lParam", c_int32),
+		("iIndent", c_int), ("iGroupId", c_int), ("cColumns", c_uint), ("puColumns", c_uint32),
+		("piColFmt", c_uint32), ("iGroup", c_int)
+	]
+
+
+class _LVITEM64(Structure):
+	_fields_ = [
+		("mask", c_uint), ("iItem", c_int), ("iSubItem", c_int), ("state", c_uint), ("stateMask", c_uint),
+		("pszText", c_uint64), ("cchTextMax", c_int), ("iImage", c_int), ("lParam", c_int64),
+		("iIndent", c_int), ("iGroupId", c_int), ("cColumns", c_uint), ("puColumns", c_uint64),
+		("piColFmt", c_uint64), ("iGroup", c_int)
+	]
+
+
+# 21.03: how Playlist Viewer track names are built.
+# Either screen order (name provided by NVDA) is used,
+# or custom order with headers and column indices of included columns in announcement order.
+class _TrackNamePlan:
+
+	__slots__ = ("useScreenOrder", "headers", "columns")
+
+	def __init__(self, useScreenOrder: bool, headers: tuple[str, ...], columns: list[int]) -> None:
+		self.useScreenOrder = useScreenOrder
+		self.headers = headers
+		self.columns = columns
+
+	def __repr__(self) -> str:
+		return f"<TrackNamePlan useScreenOrder={self.useScreenOrder} headers={self.headers}>"
+
+
+# 21.03: column read strategies and statistics learned for an app (Studio, Creator, Track Tool).
+class _ColumnReadState:
+	"""Column read strategy ("inProc" or "outProc") and consecutive empty results for each list (window handle),
+	along with column read statistics (reads, empty results, total time in seconds) for each strategy.
+	"""
+
+	__slots__ = ("strategies", "emptyResults", "stats")
+
+	def __init__(self) -> None:
+		self.strategies: dict[int, str] = {}
+		self.emptyResults: dict[int, int] = {}
+		self.stats: dict[str, list[Any]] = {
+			"inProc": [0, 0, 0.0], "outProc": [0, 0, 0.0], "bulk": [0, 0, 0.0]
+		}
+
+
 # Routines for track items themselves (prepare for future work).
 # #65 (18.07): this base class represents trakc items
 # across StationPlaylist suites such as Studio, Creator and Track Tool.
@@ -133,14 +197,153 @@ class SPLTrackItem(sysListView32.ListItem):
 	# Because original column content raw method returns None if out proc fails, call the raw method twice.
 	# This resolves an issue where NVDA may fail to obtain column content when focused on a track
 	# right after starting NVDA while Studio is focused.
-	def _getColumnContentRaw(self, index):
-		columnContent = super(SPLTrackItem, self)._getColumnContentRaw(index)
-		# Don't bother asking out proc unless this is NVDA 2020.4 or later.
-		if columnContent is None and hasattr(self, "_getColumnContentRawOutProc"):
+	# 21.03: rather than always trying in proc first, learn which read strategy works for each list
+	# and go straight to it.
+	# Until a strategy returns column text, in proc is tried first, followed by out proc (as done before).
+	# Once learned, only that strategy is used, but because empty columns and failed reads look the same,
+	# the other strategy is tried after every few consecutive empty results and is used from then on if it works.
+	# Because Studio, Creator and Track Tool share this class,
+	# strategies and statistics are kept for each process.
+	columnReadReprobeInterval = 4
+	_columnReadStates: dict[int, _ColumnReadState] = {}
+
+	def _columnReadState(self) -> _ColumnReadState:
+		state = SPLTrackItem._columnReadStates.get(self.processID)
+		if state is None:
+			state = SPLTrackItem._columnReadStates[self.processID] = _ColumnReadState()
+		return state
+
+	def _readColumnContent(self, strategy: str, index: int) -> Optional[str]:
+		start = time.perf_counter()
+		if strategy == "inProc":
+			columnContent = super(SPLTrackItem, self)._getColumnContentRaw(index)
+		else:
 			columnContent = self._getColumnContentRawOutProc(index)
+		stats = self._columnReadState().stats[strategy]
+		stats[0] += 1
+		stats[2] += time.perf_counter() - start
+		if not columnContent:
+			stats[1] += 1
 		# For compatibility, return None instead of an empty string if value is indeed empty.
 		return columnContent if columnContent else None
 
+	def _setColumnReadStrategy(self, strategy: str) -> None:
+		state = self._columnReadState()
+		if state.strategies.get(self.windowHandle) != strategy:
+			log.debug(f"SPL: using {strategy} column reads for list {self.windowHandle}")
+			state.strategies[self.windowHandle] = strategy
+		state.emptyResults[self.windowHandle] = 0
+
+	def _getColumnContentRaw(self, index):
+		# Don't bother asking out proc unless this is NVDA 2020.4 or later.
+		if not hasattr(self, "_getColumnContentRawOutProc"):
+			return self._readColumnContent("inProc", index)
+		state = self._columnReadState()
+		strategy = state.strategies.get(self.windowHandle)
+		if strategy is None:
+			columnContent = self._readColumnContent("inProc", index)
+			if columnContent is not None:
+				self._setColumnReadStrategy("inProc")
+				return columnContent
+			columnContent = self._readColumnContent("outProc", index)
+			if columnContent is not None:
+				self._setColumnReadStrategy("outProc")
+			return columnContent
+		columnContent = self._readColumnContent(strategy, index)
+		if columnContent is not None:
+			state.emptyResults[self.windowHandle] = 0
+			return columnContent
+		emptyResults = state.emptyResults.get(self.windowHandle, 0) + 1
+		state.emptyResults[self.windowHandle] = emptyResults
+		if emptyResults % self.columnReadReprobeInterval:
+			return None
+		otherStrategy = "outProc" if strategy == "inProc" else "inProc"
+		columnContent = self._readColumnContent(otherStrategy, index)
+		if columnContent is not None:
+			self._setColumnReadStrategy(otherStrategy)
+		return columnContent
+
+	# Log column read statistics and forget learned column read strategies and statistics for the given process,
+	# typically when an app module terminates.
+	@classmethod
+	def resetColumnReadStrategies(cls, processID: int) -> None:
+		state = SPLTrackItem._columnReadStates.pop(processID, None)
+		if state is None:
+			return
+		log.debug(f"SPL: column read strategies for process {processID}: {state.strategies}")
+		for strategy, (reads, emptyResults, seconds) in state.stats.items():
+			if reads:
+				log.debug(
+					f"SPL: {strategy} column reads: {reads}, empty: {emptyResults}, "
+					f"average {seconds / reads * 1000:.3f} ms"
+				)
+
+	# 21.03: obtain contents of several columns of this track at once.
+	# Rather than allocating, writing, reading and freeing memory in the list's process for each column,
+	# item structures and text buffers for all requested columns are allocated as one block
+	# and written in one go, and after asking the list for each column, all column texts are read back in one go.
+	# If this fails, columns are read one by one.
+	columnTextMaxLength = 512
+
+	def _getColumnContentsRaw(self, columns: list[int]) -> list[Optional[str]]:
+		if not columns:
+			return []
+		# 21.03: bulk reads are done out of proc, so read columns one by one if in proc works better for this list.
+		state = self._columnReadState()
+		if state.strategies.get(self.windowHandle) != "inProc":
+			start = time.perf_counter()
+			try:
+				columnContents = self._getColumnContentsRawOutProc(columns)
+			except (OSError, watchdog.CallCancelled):
+				log.debugWarning("SPL: cannot read columns in bulk, reading them one by one", exc_info=True)
+			else:
+				stats = state.stats["bulk"]
+				stats[0] += 1
+				stats[1] += columnContents.count(None)
+				stats[2] += time.perf_counter() - start
+				# Bulk reads returning column text tell that out proc works for this list.
+				# If nothing was returned, columns might be empty or out proc might not work,
+				# so read columns one by one, letting column reads learn which strategy works.
+				if any(columnContent is not None for columnContent in columnContents):
+					self._setColumnReadStrategy("outProc")
+					return columnContents
+		return [self._getColumnContentRaw(column) for column in columns]
+
+	def _getColumnContentsRawOutProc(self, columns: list[int]) -> list[Optional[str]]:
+		LVITEM = _LVITEM64 if self.appModule.is64BitProcess else _LVITEM32
+		count = len(columns)
+		maxLength = self.columnTextMaxLength
+		itemsSize = sizeof(LVITEM) * count
+		textSize = sizeof(c_wchar) * maxLength * count
+		processHandle = self.processHandle
+		remoteBlock = winKernel.virtualAllocEx(
+			processHandle, None, itemsSize + textSize, winKernel.MEM_COMMIT, winKernel.PAGE_READWRITE
+		)
+		try:
+			remoteText = remoteBlock + itemsSize
+			items = (LVITEM * count)()
+			for pos, column in enumerate(columns):
+				items[pos].mask = sysListView32.LVIF_TEXT
+				items[pos].iSubItem = column
+				items[pos].pszText = remoteText + sizeof(c_wchar) * maxLength * pos
+				items[pos].cchTextMax = maxLength
+			winKernel.writeProcessMemory(processHandle, remoteBlock, byref(items), itemsSize, None)
+			row = self.IAccessibleChildID - 1
+			lengths = [
+				watchdog.cancellableSendMessage(
+					self.windowHandle, sysListView32.LVM_GETITEMTEXTW, row, remoteBlock + sizeof(LVITEM) * pos
+				) for pos in range(count)
+			]
+			texts = create_unicode_buffer(maxLength * count)
+			winKernel.readProcessMemory(processHandle, remoteText, texts, textSize, None)
+		finally:
+			winKernel.virtualFreeEx(processHandle, remoteBlock, 0, winKernel.MEM_RELEASE)
+		# For compatibility, return None instead of an empty string if value is indeed empty.
+		return [
+			texts[maxLength * pos:maxLength * pos + length] if length else None
+			for pos, length in enumerate(lengths)
+		]
+
 	# #103: provide an abstract index of function.
 	@abstractmethod
 	def indexOf(self, columnHeader: str) -> Optional[int]:
@@ -189,7 +392,7 @@ class SPLTrackItem(sysListView32.ListItem):
 			column = self.parent._columnOrderArray[columnPos]
 			header = self._getColumnHeaderRaw(column)
 		if column is not None:
-			columnContent = self._getColumnContentRaw(column)
+			columnContent = self._getColumnContentsRaw([column])[0]
 			# #61 (18.06): pressed once will announce column data, twice will present it in a browse mode window.
 			if scriptHandler.getLastScriptRepeatCount() == 0:
 				if columnContent:
@@ -222,11 +425,13 @@ class SPLTrackItem(sysListView32.ListItem):
 		# and add column header afterwards.
 		# 20.09: fetch column headers and texts from child columns,
 		# meaning columns viewer will reflect visual display order.
+		# 21.03: follow visual display order but read column texts in one go instead of creating child columns.
+		columns = list(self.parent._columnOrderArray)
 		columnContents = []
-		for column in self.children:
+		for column, content in zip(columns, self._getColumnContentsRaw(columns)):
 			columnContents.append(
 				"{}: {}".format(
-					column.columnHeaderText, column.name if column.name is not None else _("blank")
+					self._getColumnHeaderRaw(column), content if content is not None else _("blank")
 				)
 			)
 		# Translators: Title of the column data window.
@@ -243,12 +448,66 @@ class StudioPlaylistViewerItem(SPLTrackItem):
 	It provides utility scripts when Playlist Viewer entries are focused,
 	such as location text and enhanced column navigation."""
 
+	# 21.03: column contents are cached for a short time so a focus change reads each column only once.
+	# Because the cache is keyed by row position, each track item checks once (by reading Filename column)
+	# that cached contents for its row still belong to this track.
+	_columnCacheValidated = False
+
+	def _validateColumnCache(self) -> None:
+		if self._columnCacheValidated:
+			return
+		self._columnCacheValidated = True
+		filename = self.indexOf("Filename")
+		splbase.validateColumnContentRow(
+			self.windowHandle, self.IAccessibleChildID, filename,
+			super(StudioPlaylistViewerItem, self)._getColumnContentRaw(filename)
+		)
+
+	def _getColumnContentRaw(self, index):
+		self._validateColumnCache()
+		return splbase.cachedColumnContent(
+			self.windowHandle, self.IAccessibleChildID, index,
+			super(StudioPlaylistViewerItem, self)._getColumnContentRaw
+		)
+
+	def _getColumnContentsRaw(self, columns: list[int]) -> list[Optional[str]]:
+		self._validateColumnCache()
+		return splbase.cachedColumnContents(
+			self.windowHandle, self.IAccessibleChildID, columns,
+			super(StudioPlaylistViewerItem, self)._getColumnContentsRaw
+		)
+
 	def _get_name(self):
+		# 20.11: build name pieces, as SysListView32.ListItem class nullifies description.
+		# 21.03: use track name plan compiled from column announcement settings.
+		plan = self._trackNamePlan
+		if plan is None:
+			plan = StudioPlaylistViewerItem.compileTrackNamePlan()
+		if plan.useScreenOrder:
+			return super(StudioPlaylistViewerItem, self).name
+		trackNamePieces = []
+		# NVDA does not tell add-ons when table header reporting setting changes, so check it here.
+		includeColumnHeaders = config.conf["documentFormatting"]["reportTableHeaders"]
+		# Include status (actual item name as reported by MSAA) if present.
+		if self.firstChild.name:
+			trackNamePieces.append(self.firstChild.name)
+		# 21.03: read included columns in one go.
+		for header, content in zip(plan.headers, self._getColumnContentsRaw(plan.columns)):
+			if content:
+				trackNamePieces.append("{}: {}".format(header, content) if includeColumnHeaders else content)
+		return "; ".join(trackNamePieces)
+
+	# 21.03: track name plan compiled from column announcement settings.
+	_trackNamePlan: Optional[_TrackNamePlan] = None
+
+	# Compile column announcement settings into a track name plan,
+	# done when settings are loaded, reset, or when switching profiles,
+	# and when settings are changed (including pressing Apply in SPL add-on settings dialog).
+	@classmethod
+	def compileTrackNamePlan(cls) -> _TrackNamePlan:
 		# 6.3: Catch an unusual case where screen order is off yet column order is same as screen order
 		# and NVDA is told to announce all columns.
 		# 17.04: Even if vertical column commands are performed, build description pieces for consistency.
-		# 20.11: build name pieces, as SysListView32.ListItem class nullifies description.
-		# 19.06: have the column inclusion and order keys handy in order to avoid attribute lookup.
 		columnsToInclude = splconfig.SPLConfig["ColumnAnnouncement"]["IncludedColumns"]
 		columnOrder = splconfig.SPLConfig["ColumnAnnouncement"]["ColumnOrder"]
 		if (
@@ -257,23 +516,16 @@ class StudioPlaylistViewerItem(SPLTrackItem):
 				or len(columnsToInclude) != 17
 			)
 		):
-			trackNamePieces = []
-			includeColumnHeaders = config.conf["documentFormatting"]["reportTableHeaders"]
-			# Include status (actual item name as reported by MSAA) if present.
-			if self.firstChild.name:
-				trackNamePieces.append(self.firstChild.name)
-			for header in columnOrder:
-				if header in columnsToInclude:
-					index = self.indexOf(header)
-					if index is None:
-						continue
-					content = self._getColumnContentRaw(index)
-					if content:
-						trackNamePieces.append("{}: {}".format(header, content) if includeColumnHeaders else content)
-			trackName = "; ".join(trackNamePieces)
+			headers = tuple(
+				header for header in columnOrder
+				if header in columnsToInclude and cls._columnIndices.get(header) is not None
+			)
+			plan = _TrackNamePlan(False, headers, [cls._columnIndices[header] for header in headers])
 		else:
-			trackName = super(StudioPlaylistViewerItem, self).name
-		return trackName
+			plan = _TrackNamePlan(True, (), [])
+		cls._trackNamePlan = plan
+		log.debug(f"SPL: track name plan: {plan}")
+		return plan
 
 	def event_stateChange(self):
 		# Why is it that NVDA keeps announcing "not selected" when track items are scrolled?
@@ -291,12 +543,12 @@ class StudioPlaylistViewerItem(SPLTrackItem):
 	# 8.0: Make this a public function.
 	# #109 (19.08): now standardized around this function.
 	# #142 (20.09): do not ignore Status column (0) just because it is the name of the track as reported by MSAA.
+	# 21.03: use header to column index map built from default column order.
+	# Studio columns do not depend on Studio version, so the map is bound once for all tracks.
+	_columnIndices: Mapping[str, int] = splcolumns.headerMap("studio")
+
 	def indexOf(self, columnHeader: str) -> Optional[int]:
-		try:
-			columnHeaders = ["Status"] + splconfig._SPLDefaults["ColumnAnnouncement"]["ColumnOrder"]
-			return columnHeaders.index(columnHeader)
-		except ValueError:
-			return None
+		return self._columnIndices.get(columnHeader)
 
 	def reportFocus(self):
 		if splconfig.SPLConfig["General"]["CategorySounds"]:
@@ -332,7 +584,7 @@ class StudioPlaylistViewerItem(SPLTrackItem):
 	def _get_locationText(self):
 		# Translators: location text for a playlist item (example: item 1 of 10).
 		return _("Item {current} of {total}").format(
-			current=self.IAccessibleChildID, total=splbase.studioAPI(0, 124)
+			current=self.IAccessibleChildID, total=splbase.studioAPI(0, splbase.SPLTrackCount)
 		)
 
 	# #12 (18.04): select and set focus to this track.
@@ -349,7 +601,8 @@ class StudioPlaylistViewerItem(SPLTrackItem):
 	) -> list[Optional[str]]:
 		if columns is None:
 			columns = list(range(18))
-		columnContents = [self._getColumnContentRaw(col) for col in columns]
+		# 21.03: read columns in one go.
+		columnContents = self._getColumnContentsRaw(columns)
 		if readable:
 			# #148 (20.10): Use enumerate function to obtain both column content and position in one go
 			# rather than using a range based on list length.
@@ -413,6 +666,8 @@ class StudioPlaylistViewerItem(SPLTrackItem):
 			splconfig.SPLConfig["ColumnAnnouncement"]["UseScreenColumnOrder"] = False
 			# Translators: presented when NVDA will present track columns in custom order set by a user.
 			ui.message(_("Use custom order when announcing track columns"))
+		# 21.03: track names are built differently now.
+		self.compileTrackNamePlan()
 		braille.handler.handleUpdate(self)
 
 	# Track comments.
@@ -675,6 +930,11 @@ class AppModule(appModuleHandler.AppModule):
 	_focusedTrack: Optional[Any] = None
 	# Monitor Studio API routines.
 	_SPLStudioMonitor = None
+	_heartbeatRecord: Optional[splscheduler.InventoryRecord] = None
+	# 21.03: Studio window readiness (see Studio API module) and startup metadata status announcement
+	# deferred until Studio window shows up.
+	_studioWindowReady = None
+	_startupMetadataAnnouncementPending = False
 
 	# Prepare the settings dialog among other things.
 	def __init__(self, *args, **kwargs):
@@ -707,6 +967,11 @@ class AppModule(appModuleHandler.AppModule):
 		# #94 (19.03/18.09.7-LTS): also listen to profile reset action.
 		splactions.SPLActionProfileSwitched.register(self.actionProfileSwitched)
 		splactions.SPLActionSettingsReset.register(self.actionSettingsReset)
+		# 21.03: react to Studio state changes such as microphone status.
+		splactions.SPLActionStudioStateChanged.register(self.actionStudioStateChanged)
+		# 21.03: rebuild things built from settings such as status bar dispatch table when settings change.
+		splactions.SPLActionSettingsLoaded.register(self.actionSettingsChanged)
+		splactions.SPLActionSettingsChanged.register(self.actionSettingsChanged)
 		# 20.09: to avoid a resource leak, metadata actions must be registered here,
 		# not when splmisc module is being imported.
 		splactions.SPLActionProfileSwitched.register(splmisc.metadata_actionProfileSwitched)
@@ -716,6 +981,9 @@ class AppModule(appModuleHandler.AppModule):
 		# Announce status changes while using other programs.
 		import eventHandler
 		eventHandler.requestEvents(eventName="nameChange", processId=self.processID, windowClassName="TStatusBar")
+		# Countdown text events are always requested.
+		# 21.03: filtering happens in name change event, which returns early if there are no countdown alarms
+		# (neither end of track/song ramp alarms nor braille timer are on).
 		eventHandler.requestEvents(eventName="nameChange", processId=self.processID, windowClassName="TStaticText")
 		# Also for requests window.
 		eventHandler.requestEvents(eventName="show", processId=self.processID, windowClassName="TRequests")
@@ -738,13 +1006,18 @@ class AppModule(appModuleHandler.AppModule):
 		# in order to synchronize announcement order.
 		self._initStudioWindowFocused = threading.Event()
 		# Let me know the Studio window handle.
-		# 6.1: Do not allow this thread to run forever (seen when evaluation times out and the app module starts).
-		self.noMoreHandle = threading.Event()
 		log.debug("SPL: locating Studio window handle")
+		# 21.03: rather than polling for Studio window every second, wait for Studio window readiness.
+		# Readiness is resolved by a backoff probe or when Studio window shows up, whichever comes first.
+		self._studioWindowReady = splbase.studioWindowReady()
+		self._studioWindowReady.add_done_callback(self._onStudioWindowReady)
 		# If this is started right away, foreground and focus objects will be NULL according to NVDA
 		# if NVDA restarts while Studio is running.
-		t = threading.Thread(target=self._locateSPLHwnd)
-		wx.CallAfter(t.start)
+		# 6.1: Do not allow this probe to run forever (seen when evaluation times out and the app module starts).
+		# This is done by cancelling scheduler jobs when the app module terminates.
+		wx.CallAfter(
+			splscheduler.runTask, splbase.studioWindowReadyProbe(), name="studioWindowReadyProbe", owner="splstudio"
+		)
 		# Display startup dialogs if any.
 		# 17.10: not when minimal startup flag is set.
 		# 18.08.1: sometimes, wxPython 4 says wx.App isn't ready.
@@ -753,26 +1026,28 @@ class AppModule(appModuleHandler.AppModule):
 		except Exception:
 			pass
 
-	# Locate the handle for main window for caching purposes.
-	def _locateSPLHwnd(self) -> None:
-		hwnd = user32.FindWindowW("SPLStudio", None)
-		while not hwnd:
-			time.sleep(1)
-			# If the demo copy expires and the app module begins, this loop will spin forever.
-			# Make sure this loop catches this case.
-			if self.noMoreHandle.is_set():
-				self.noMoreHandle.clear()
-				return
-			hwnd = user32.FindWindowW("SPLStudio", None)
-		# Only this thread will have privilege of notifying handle's existence.
-		with threading.Lock():
-			splbase._SPLWin = hwnd
-			log.debug(f"SPL: Studio handle is {hwnd}")
+	# Studio window readiness callback, which may be called from any thread.
+	def _onStudioWindowReady(self, ready) -> None:
+		# Readiness is cancelled when the app module terminates before Studio window is found.
+		if ready.cancelled():
+			return
+		wx.CallAfter(self._locateSPLHwnd, ready.result())
+
+	# Perform actions requiring Studio window handle once Studio window is ready.
+	# 21.03: called from main thread when Studio window readiness is resolved (formerly a polling thread).
+	def _locateSPLHwnd(self, hwnd: int) -> None:
+		# Don't bother if the app module terminated while waiting for main thread.
+		if self._studioWindowReady is None:
+			return
+		# 21.03: Studio handle cache (and its generation) is managed by Studio API module.
+		log.debug(f"SPL: Studio handle is {hwnd}, ready after {splbase.studioReadyLatency:.3f} seconds")
 		# #41 (18.04): start background monitor.
 		# 18.08: unless Studio is exiting.
+		# 21.03: heartbeat wakeups and CPU time are recorded in add-on timer inventory.
 		try:
-			self._SPLStudioMonitor = wx.PyTimer(self.studioAPIMonitor)
-			wx.CallAfter(self._SPLStudioMonitor.Start, 1000)
+			self._heartbeatRecord = splscheduler.registerTimer("heartbeat", owner="splstudio")
+			self._SPLStudioMonitor = wx.PyTimer(self._heartbeatRecord.measure(self.studioAPIMonitor))
+			self._SPLStudioMonitor.Start(self.heartbeatNormalInterval)
 		except Exception:
 			pass
 		# Remind me to broadcast metadata information.
@@ -795,47 +1070,172 @@ class AppModule(appModuleHandler.AppModule):
 			# something other than playlist viewer, the below method won't work at all.
 			# Thankfully, NVDA's notion of foreground window depends on a global variable,
 			# and if it is not set, this is a restart with Studio running, so just announce it.
-			if api.getForegroundObject() is not None:
-				self._initStudioWindowFocused.wait()
-			splmisc._earlyMetadataAnnouncerInternal(splmisc.metadataStatus(), startup=True)
+			# 21.03: rather than waiting, let the foreground event announce it when Studio window shows up.
+			if api.getForegroundObject() is not None and not self._initStudioWindowFocused.is_set():
+				self._startupMetadataAnnouncementPending = True
+			else:
+				splmisc._earlyMetadataAnnouncerInternal(splmisc.metadataStatus(), startup=True)
 
 	# Studio API heartbeat.
 	# Although useful for library scan detection, it can be extended to cover other features.
 
+	# 21.03: Studio state flags obtained by the heartbeat (status indecies for Studio API command 39).
+	_studioStateFlags = (
+		"playing", "automation", "microphone", "lineIn", "recordToFile", "cartEdit", "cartInsert"
+	)
+	_studioStateRequests = [(index, splbase.SPLStatusInfo) for index in range(len(_studioStateFlags))]
+	_studioState: Optional[list[int]] = None
+	# 21.03: adaptive heartbeat intervals (in milliseconds).
+	# Poll quickly while library scan is in progress or playlist is loading,
+	# back off exponentially (up to a maximum) if nothing changes for a while,
+	# and slow down if Studio is not the foreground app.
+	heartbeatFastInterval = 500
+	heartbeatNormalInterval = 1000
+	heartbeatIdleMaxInterval = 8000
+	heartbeatBackgroundInterval = 5000
+	# Number of heartbeats without changes before backing off.
+	heartbeatIdleThreshold = 5
+	heartbeatInterval = heartbeatNormalInterval
+	_lastHeartbeat: Optional[list[int]] = None
+	_heartbeatIdleCount = 0
+	# Heartbeat statistics, viewable via heartbeatStats method.
+	_heartbeatStats: Optional[dict[str, int]] = None
+
 	def studioAPIMonitor(self) -> None:
-		# Only proceed if Studio handle is valid.
-		if not user32.FindWindowW("SPLStudio", None):
+		# 21.03: obtain library scan count and track count in one batch.
+		# Only proceed if Studio handle is valid (batch result is None if Studio is gone).
+		# #92 (19.01.1/18.09.7-LTS): if Studio dies, zero will be returned,
+		# which is taken care of by checking the window handle after the batch.
+		# 21.03: also obtain Studio state flags in the same batch.
+		# 21.03: library scan progress samples must be fresh for scan rate to be accurate.
+		if self._libraryScanTracker is not None:
+			splbase.invalidateStudioAPICache(splbase.SPLLibraryScanCount)
+		heartbeat = splbase.studioAPIBatch(
+			[(1, splbase.SPLLibraryScanCount), (0, splbase.SPLTrackCount)] + self._studioStateRequests
+		)
+		if heartbeat is None:
 			if self._SPLStudioMonitor is not None:
 				self._SPLStudioMonitor.Stop()
 				self._SPLStudioMonitor = None
-				return
+				self._heartbeatRecord.stop()
+			self._studioState = None
+			self._lastHeartbeat = None
+			# 21.03/20.09.6-LTS: library scan progress will not be announced (makes sense since Studio is gone).
+			if self._libraryScanTracker is not None:
+				self._libraryScanTracker = None
+				self.libraryScanning = False
+			return
+		libScanCount, trackCount, *studioState = heartbeat
+		# 21.03: cached column contents are keyed by row position, so they become stale when tracks are
+		# added or removed (playlist modified status text changes only for the first change).
+		if self._lastHeartbeat is not None and trackCount != self._lastHeartbeat[1]:
+			splbase.invalidateColumnContentCache()
+		self._updateStudioState(studioState)
+		self._adjustHeartbeatInterval(heartbeat)
+		# 21.03: library scan progress is tracked by the heartbeat instead of a separate reporter.
+		if self._libraryScanTracker is not None:
+			self._trackLibraryScan(libScanCount)
 		# #41 (18.04): background library scan detection.
 		# Thankfully, current lib scan reporter function will not proceed
 		# when library scan is happening via Insert Tracks dialog.
-		# #92 (19.01.1/18.09.7-LTS): if Studio dies, zero will be returned, so check for window handle once more.
-		# #155 (21.03): library scan count must be an integer.
-		libScanCount: Optional[int] = splbase.studioAPI(1, 32)
-		if libScanCount and libScanCount >= 0:
-			if not user32.FindWindowW("SPLStudio", None):
-				return
-			if not self.libraryScanning:
-				self.script_libraryScanMonitor(None)
+		elif libScanCount and libScanCount >= 0 and not self.libraryScanning:
+			self.script_libraryScanMonitor(None)
 		# #86 (18.12/18.09.6-LTS): certain internal markers require presence of a playlist,
 		# otherwise unexpected things may happen.
-		trackCount = splbase.studioAPI(0, 124)
 		if not trackCount:
 			if self._focusedTrack is not None:
 				self._focusedTrack = None
 			if self._analysisMarker is not None:
 				self._analysisMarker = None
 		# #145 (20.09: playlist analysis marker value must be below track count.
-		# #155 (21.03): and track count must be an integer.
-		if (
-			self._analysisMarker is not None and trackCount is not None
-			and not 0 <= self._analysisMarker < trackCount
-		):
+		if self._analysisMarker is not None and not 0 <= self._analysisMarker < trackCount:
 			self._analysisMarker = None
 
+	# 21.03: choose the next heartbeat interval based on what happened since the last heartbeat.
+	def _adjustHeartbeatInterval(self, heartbeat: list[int]) -> None:
+		lastHeartbeat, self._lastHeartbeat = self._lastHeartbeat, heartbeat
+		if self._heartbeatStats is None:
+			self._heartbeatStats = {"ticks": 0, "changed": 0, "fast": 0, "idle": 0, "background": 0}
+		self._heartbeatStats["ticks"] += 1
+		if lastHeartbeat is None or heartbeat != lastHeartbeat:
+			self._heartbeatStats["changed"] += 1
+			self._heartbeatIdleCount = 0
+		else:
+			self._heartbeatIdleCount += 1
+		# Playlist is loading if track count has changed since the last heartbeat.
+		playlistLoading = lastHeartbeat is not None and heartbeat[1] != lastHeartbeat[1]
+		if self.libraryScanning or playlistLoading:
+			interval = self.heartbeatFastInterval
+			self._heartbeatStats["fast"] += 1
+		else:
+			interval = self.heartbeatNormalInterval
+			if self._heartbeatIdleCount >= self.heartbeatIdleThreshold:
+				interval = min(
+					interval * 2 ** (self._heartbeatIdleCount - self.heartbeatIdleThreshold + 1),
+					self.heartbeatIdleMaxInterval
+				)
+				self._heartbeatStats["idle"] += 1
+			fg = api.getForegroundObject()
+			if fg is None or fg.processID != self.processID:
+				interval = max(interval, self.heartbeatBackgroundInterval)
+				self._heartbeatStats["background"] += 1
+			# Microphone alarm, Cart Explorer and other Studio state change subscribers
+			# depend on the heartbeat to learn about Studio state changes promptly.
+			if self._studioStateSubscribersActive():
+				interval = min(interval, self.heartbeatNormalInterval)
+		if interval != self.heartbeatInterval:
+			log.debug(f"SPL: heartbeat interval changed from {self.heartbeatInterval} to {interval} ms")
+			self.heartbeatInterval = interval
+			if self._SPLStudioMonitor is not None:
+				self._SPLStudioMonitor.Start(interval)
+
+	# Does anyone need prompt Studio state change notifications?
+	# This app module is always registered, but only needs them for microphone alarm and Cart Explorer.
+	def _studioStateSubscribersActive(self) -> bool:
+		if splconfig.SPLConfig["MicrophoneAlarm"]["MicAlarm"] or self.cartExplorer:
+			return True
+		return any(
+			handler != self.actionStudioStateChanged
+			for handler in splactions.SPLActionStudioStateChanged.handlers
+		)
+
+	# Returns current heartbeat interval and heartbeat counts
+	# (total, with changes, fast polling, backing off, and in the background).
+	def heartbeatStats(self) -> dict[str, int]:
+		stats = dict(self._heartbeatStats) if self._heartbeatStats is not None else {}
+		stats["interval"] = self.heartbeatInterval
+		return stats
+
+	# 21.03: compare Studio state with the one from the previous heartbeat
+	# and let others know about flags that have changed.
+	# Nothing is announced for the first heartbeat as there is nothing to compare against.
+	# The exception is microphone status, as microphone alarm must be armed if microphone is already on.
+	def _updateStudioState(self, studioState: list[int]) -> None:
+		previousState, self._studioState = self._studioState, studioState
+		if previousState is None:
+			micOn = studioState[self._studioStateFlags.index("microphone")]
+			if micOn:
+				splactions.SPLActionStudioStateChanged.notify(flag="microphone", value=micOn)
+			return
+		for flag, previous, current in zip(self._studioStateFlags, previousState, studioState):
+			if previous != current:
+				log.debug(f"SPL: Studio state {flag} changed from {previous} to {current}")
+				splactions.SPLActionStudioStateChanged.notify(flag=flag, value=current)
+
+	# Status bar text (without " On" or " Off") to Studio state flag map.
+	_statusBarStateFlags = {"Microphone": "microphone", "Cart Edit": "cartEdit", "Cart Insert": "cartInsert"}
+
+	# 21.03: record a Studio state change reported by status bar
+	# and let others know about it unless the heartbeat has already done so.
+	def _setStudioState(self, flag: str, value: int) -> None:
+		if self._studioState is not None:
+			index = self._studioStateFlags.index(flag)
+			if self._studioState[index] == value:
+				return
+			self._studioState[index] = value
+		log.debug(f"SPL: Studio state {flag} changed to {value} (status bar)")
+		splactions.SPLActionStudioStateChanged.notify(flag=flag, value=value)
+
 	# Let the global plugin know if SPLController passthrough is allowed.
 	def SPLConPassthrough(self) -> bool:
 		return splconfig.SPLConfig["Advanced"]["SPLConPassthrough"]
@@ -843,9 +1243,16 @@ class AppModule(appModuleHandler.AppModule):
 	# The only job of the below event is to notify others that Studio window has appeared for the first time.
 	# This is used to coordinate various status announcements.
 
+	# 21.03: Studio window showing up also means Studio window readiness can be resolved without the probe.
+
 	def event_foreground(self, obj, nextHandler):
 		if not self._initStudioWindowFocused.is_set() and obj.windowClassName == "TStudioForm":
 			self._initStudioWindowFocused.set()
+			if self._studioWindowReady is not None and not self._studioWindowReady.done():
+				splbase.studioHandle()
+			if self._startupMetadataAnnouncementPending:
+				self._startupMetadataAnnouncementPending = False
+				splmisc._earlyMetadataAnnouncerInternal(splmisc.metadataStatus(), startup=True)
 		nextHandler()
 
 	def event_NVDAObject_init(self, obj):
@@ -912,106 +1319,239 @@ class AppModule(appModuleHandler.AppModule):
 	# These items are static text items whose name changes.
 	# Note: There are two status bars, hence the need to exclude Up time so it doesn't announce every minute.
 	# Unfortunately, Window handles and WindowControlIDs seem to change, so can't be used.
-	# Only announce changes if told to do so via the following function.
-	def _TStatusBarChanged(self, obj: Any) -> bool:
-		name = obj.name
-		if name.startswith("  Up time:"):
-			return False
-		elif name.startswith("Scheduled for"):
-			if self.scheduledTimeCache == name:
-				return False
-			self.scheduledTimeCache = name
-			return splconfig.SPLConfig["SayStatus"]["SayScheduledFor"]
-		elif "Listener" in name:
-			return splconfig.SPLConfig["SayStatus"]["SayListenerCount"]
-		elif name.startswith("Cart") and obj.IAccessibleChildID == 3:
-			return splconfig.SPLConfig["SayStatus"]["SayPlayingCartName"]
+	# 21.03: rather than checking status text against a long chain of conditions and settings for every change,
+	# status text is classified using the patterns below (first match wins),
+	# and a dispatch table compiled from settings tells which handler (if any) will take care of it.
+	# Patterns are (status kind, text test, text, status bar item or None for any item).
+	_statusBarPatterns: tuple[tuple[str, Callable[[str, str], bool], str, Optional[int]], ...] = (
+		("upTime", str.startswith, "  Up time:", None),
+		("scheduledFor", str.startswith, "Scheduled for", None),
+		("listener", str.__contains__, "Listener", None),
+		("cart", str.startswith, "Cart", 3),
+		("playStatus", str.__contains__, "Play status", 1),
+		("loading", str.__contains__, "Loading", 1),
+		("match", str.__contains__, "match", None),
+	)
+	# Status kind to handler map (None if the status should not be announced).
+	_statusBarDispatch: Optional[dict[str, Optional[Callable[[Any, str, int], None]]]] = None
+
+	# Compile status bar dispatch table from add-on settings.
+	# Called when settings are loaded, changed, reset or when broadcast profiles are switched.
+	def _compileStatusBarDispatch(self) -> None:
+		sayStatus = splconfig.SPLConfig["SayStatus"]
+		self._statusBarDispatch = {
+			"upTime": None,
+			"scheduledFor": self._statusBarScheduledFor if sayStatus["SayScheduledFor"] else None,
+			"listener": self._statusBarMessage if sayStatus["SayListenerCount"] else None,
+			"cart": self._statusBarMessage if sayStatus["SayPlayingCartName"] else None,
+			"playStatus": self._statusBarPlayStatus,
+			"loading": self._statusBarLoading,
+			"match": self._statusBarMatch,
+			"status": self._statusBarMessage,
+		}
+
+	def _statusBarKind(self, name: str, childID: int) -> str:
+		for kind, test, text, item in self._statusBarPatterns:
+			if test(name, text) and (item is None or item == childID):
+				return kind
+		return "status"
+
+	# 21.03: status bar event coalescing.
+	# During library scans and while insert tracks dialog is searching,
+	# status bar text changes many times a second, flooding NVDA's event queue with name change events.
+	# Status changes of the same kind arriving within the coalescing window are collapsed,
+	# and only the latest status is handled when the window closes.
+	# Status text is recorded when events arrive, as status bar text would have changed again by then.
+	statusBarCoalescingWindow = 250  # Milliseconds.
+	_coalescedStatusBarChanges = ("Loading", "match")
+	# Pending changes keyed by (status bar item, kind),
+	# with values being [object, status text, number of events].
+	_pendingStatusBarChanges: Optional[dict[tuple[int, str], list[Any]]] = None
+	_statusBarFlushTimer: Optional[wx.CallLater] = None
+	# Inventory record for status bar flush timers, registered when status bar changes are first coalesced.
+	_statusBarFlushRecord: Optional[splscheduler.InventoryRecord] = None
+	# Number of status bar events not handled by themselves due to coalescing.
+	statusBarEventsSuppressed = 0
+
+	def _coalesceStatusBarChange(self, obj: Any, name: str, kind: str) -> None:
+		if self._pendingStatusBarChanges is None:
+			self._pendingStatusBarChanges = {}
+		key = (obj.IAccessibleChildID, kind)
+		pending = self._pendingStatusBarChanges.get(key)
+		if pending is not None:
+			pending[0] = obj
+			pending[1] = name
+			pending[2] += 1
+			self.statusBarEventsSuppressed += 1
+			return
+		self._pendingStatusBarChanges[key] = [obj, name, 1]
+		if self._statusBarFlushTimer is None:
+			if self._statusBarFlushRecord is None:
+				self._statusBarFlushRecord = splscheduler.registerTimer("status bar coalescing", owner="splstudio")
+			self._statusBarFlushTimer = wx.CallLater(
+				self.statusBarCoalescingWindow, self._statusBarFlushRecord.measure(self._flushStatusBarChanges)
+			)
+
+	def _flushStatusBarChanges(self) -> None:
+		self._statusBarFlushTimer = None
+		pendingChanges, self._pendingStatusBarChanges = self._pendingStatusBarChanges, None
+		if not pendingChanges:
+			return
+		for obj, name, eventCount in pendingChanges.values():
+			# Status bar might be gone by now.
+			try:
+				self._statusBarChanged(obj, name, eventCount=eventCount)
+			except Exception:
+				log.debug("SPL: failed to handle coalesced status bar change", exc_info=True)
+
+	# Handle status bar changes.
+	# Name is status text when the event arrived.
+	# Event count is the number of name change events represented by this call (more than 1 if coalesced).
+	def _statusBarChanged(self, obj: Any, name: str, eventCount: int = 1) -> None:
+		if self._statusBarDispatch is None:
+			self._compileStatusBarDispatch()
+		# Only announce changes in status bar objects when told to do so.
+		handler = self._statusBarDispatch[self._statusBarKind(name, obj.IAccessibleChildID)]
+		if handler is not None:
+			handler(obj, name, eventCount)
+
+	# Status bar handlers.
+
+	def _statusBarMessage(self, obj: Any, name: str, eventCount: int) -> None:
+		# The first status bar item is reserved for play status, library scan and insert tracks search results.
+		if obj.IAccessibleChildID == 1:
+			return
+		# 16.12: Because cart edit text shows cart insert status, exclude this from toggle state announcement.
+		if name.endswith((" On", " Off")) and not name.startswith("Cart "):
+			self._toggleMessage(name)
+		else:
+			ui.message(name)
+		# 21.03: microphone alarm and cart explorer respond to Studio state changes,
+		# so let them know right away rather than waiting for the next heartbeat.
+		if name.endswith((" On", " Off")):
+			status, _sep, toggle = name.rpartition(" ")
+			flag = self._statusBarStateFlags.get(status)
+			if flag is not None:
+				self._setStudioState(flag, int(toggle == "On"))
+
+	def _statusBarScheduledFor(self, obj: Any, name: str, eventCount: int) -> None:
+		if self.scheduledTimeCache == name:
+			return
+		self.scheduledTimeCache = name
+		self._statusBarMessage(obj, name, eventCount)
+
+	def _statusBarPlayStatus(self, obj: Any, name: str, eventCount: int) -> None:
+		# Strip off "  Play status: " for brevity only in main playlist window.
+		ui.message(name.split(":")[1][1:])
+
+	def _statusBarLoading(self, obj: Any, name: str, eventCount: int) -> None:
+		if splconfig.SPLConfig["General"]["LibraryScanAnnounce"] not in ("off", "ending"):
+			# If library scan is in progress, announce its progress when told to do so.
+			# 21.03: count coalesced events, too, so progress is announced every 100 status updates as before.
+			previousScanCount = self.scanCount
+			self.scanCount += eventCount
+			if self.scanCount // 100 > previousScanCount // 100:
+				self._libraryScanAnnouncer(
+					name[1:name.find("]")],
+					splconfig.SPLConfig["General"]["LibraryScanAnnounce"]
+				)
+		if not self.libraryScanning:
+			if self.productVersion not in noLibScanMonitor:
+				self.libraryScanning = True
+
+	def _statusBarMatch(self, obj: Any, name: str, eventCount: int) -> None:
 		# 20.07: in insert tracks dialog, name change event is fired continuously until actual result is known.
-		# To prevent an event flood risk, say "no" if the same result text was cached.
-		elif "match" in name and api.getForegroundObject().windowClassName == "TTrackInsertForm":
-			return self.matchedResultsCache != name
-		return True
+		# To prevent an event flood risk, say nothing if the same result text was cached.
+		if (
+			self.matchedResultsCache == name
+			and api.getForegroundObject().windowClassName == "TTrackInsertForm"
+		):
+			return
+		if obj.IAccessibleChildID != 1:
+			self._statusBarMessage(obj, name, eventCount)
+			return
+		# 20.07: announce search/match results from insert tracks dialog
+		# while there is no library rescan in progress.
+		# Only announce match count as the whole thing is very verbose,
+		# and results text would have been checked by status bar checker anyway.
+		if not self.libraryScanning:
+			self.matchedResultsCache = name
+			ui.message(" ".join(name.split()[:2]))
+		else:
+			if splconfig.SPLConfig["General"]["LibraryScanAnnounce"] != "off" and self.libraryScanning:
+				if splconfig.SPLConfig["General"]["BeepAnnounce"]:
+					tones.beep(370, 100)
+				else:
+					# Translators: Presented when library scan is complete.
+					splannouncer.announce(
+						_("Scan complete with {scanCount} items").format(scanCount=name.split()[3]),
+						category="libraryScan"
+					)
+			if self.libraryScanning:
+				self.libraryScanning = False
+			self.scanCount = 0
 
 	# Now the actual event.
 	def event_nameChange(self, obj, nextHandler):
 		# Do not let NVDA get name for None object when SPL window is maximized.
-		if not obj.name:
+		# 21.03: obtain status text once, as it could change while this event is being handled.
+		name = obj.name
+		if not name:
 			return
-		# Only announce changes in status bar objects when told to do so.
-		if obj.windowClassName == "TStatusBar" and self._TStatusBarChanged(obj):
-			# Special handling for Play Status
-			if obj.IAccessibleChildID == 1:
-				if "Play status" in obj.name:
-					# Strip off "  Play status: " for brevity only in main playlist window.
-					ui.message(obj.name.split(":")[1][1:])
-				elif "Loading" in obj.name:
-					if splconfig.SPLConfig["General"]["LibraryScanAnnounce"] not in ("off", "ending"):
-						# If library scan is in progress, announce its progress when told to do so.
-						self.scanCount += 1
-						if self.scanCount % 100 == 0:
-							self._libraryScanAnnouncer(
-								obj.name[1:obj.name.find("]")],
-								splconfig.SPLConfig["General"]["LibraryScanAnnounce"]
-							)
-					if not self.libraryScanning:
-						if self.productVersion not in noLibScanMonitor:
-							self.libraryScanning = True
-				elif "match" in obj.name:
-					# 20.07: announce search/match results from insert tracks dialog
-					# while there is no library rescan in progress.
-					# Only announce match count as the whole thing is very verbose,
-					# and results text would have been checked by status bar checker anyway.
-					if not self.libraryScanning:
-						self.matchedResultsCache = obj.name
-						ui.message(" ".join(obj.name.split()[:2]))
-					else:
-						if splconfig.SPLConfig["General"]["LibraryScanAnnounce"] != "off" and self.libraryScanning:
-							if splconfig.SPLConfig["General"]["BeepAnnounce"]:
-								tones.beep(370, 100)
-							else:
-								# Translators: Presented when library scan is complete.
-								ui.message(_("Scan complete with {scanCount} items").format(scanCount=obj.name.split()[3]))
-						if self.libraryScanning:
-							self.libraryScanning = False
-						self.scanCount = 0
+		# 21.03: cached Studio API responses become stale when playlist is modified or library scan is in progress,
+		# regardless of whether status changes are announced or not.
+		if obj.windowClassName == "TStatusBar":
+			if "Loading" in name:
+				splbase.invalidateStudioAPICache(splbase.SPLLibraryScanCount)
+			elif "Playlist modified" in name or "Playlist Modified" in name:
+				splbase.invalidateStudioAPICache(splbase.SPLTrackCount)
+				splbase.invalidateStudioAPICache(splbase.SPLHourInfo)
+				splbase.invalidateColumnContentCache()
+		# 21.03: status bar changes are handled by the status bar handler,
+		# with progress-like changes (library scan and insert tracks search) coalesced first.
+		if obj.windowClassName == "TStatusBar":
+			kind = next((kind for kind in self._coalescedStatusBarChanges if kind in name), None)
+			if kind is not None:
+				self._coalesceStatusBarChange(obj, name, kind)
 			else:
-				# 16.12: Because cart edit text shows cart insert status, exclude this from toggle state announcement.
-				if obj.name.endswith((" On", " Off")) and not obj.name.startswith("Cart "):
-					self._toggleMessage(obj.name)
-				else:
-					ui.message(obj.name)
-				if self.cartExplorer or splconfig.SPLConfig["MicrophoneAlarm"]["MicAlarm"]:
-					# Activate mic alarm or announce when cart explorer is active.
-					self.doExtraAction(obj.name)
+				self._statusBarChanged(obj, name)
 		# Monitor the end of track and song intro time and announce it.
+		# 21.03: using countdown alarms compiled from settings (nothing to do if there are none).
 		elif obj.windowClassName == "TStaticText":
+			if not self._countdownAlarms:
+				nextHandler()
+				return
 			if obj.simplePrevious is not None:
-				if obj.simplePrevious.name == "Remaining Time":
-					# End of track text.
-					if (
-						splconfig.SPLConfig["General"]["BrailleTimer"] in ("outro", "both")
-						and api.getForegroundObject().processID == self.processID
-					):
-						braille.handler.message(obj.name)
-					if (
-						obj.name == "00:{0:02d}".format(splconfig.SPLConfig["IntroOutroAlarms"]["EndOfTrackTime"])
-						and splconfig.SPLConfig["IntroOutroAlarms"]["SayEndOfTrack"]
-					):
-						self.alarmAnnounce(obj.name, 440, 200)
-				elif obj.simplePrevious.name == "Remaining Song Ramp":
-					# Song intro content.
-					if (
-						splconfig.SPLConfig["General"]["BrailleTimer"] in ("intro", "both")
-						and api.getForegroundObject().processID == self.processID
-					):
-						braille.handler.message(obj.name)
-					if (
-						obj.name == "00:{0:02d}".format(splconfig.SPLConfig["IntroOutroAlarms"]["SongRampTime"])
-						and splconfig.SPLConfig["IntroOutroAlarms"]["SaySongRamp"]
-					):
-						self.alarmAnnounce(obj.name, 512, 400, intro=True)
+				# End of track text or song intro content.
+				countdownAlarm = self._countdownAlarms.get(obj.simplePrevious.name)
+				if countdownAlarm is not None:
+					brailleTimer, alarmText, tone, duration, intro = countdownAlarm
+					countdown = name
+					if brailleTimer and api.getForegroundObject().processID == self.processID:
+						braille.handler.message(countdown)
+					if countdown == alarmText:
+						self.alarmAnnounce(countdown, tone, duration, intro=intro)
 		nextHandler()
 
+	# 21.03: end of track and song intro alarms and braille timer, compiled from settings.
+	# Countdown text changes every second while a track is playing, so avoid looking up settings each time.
+	# Maps the label before countdown text to (braille timer, alarm text or None, alarm tone, duration, intro).
+	_countdownAlarms: dict[str, tuple[bool, Optional[str], float, int, bool]] = {}
+
+	def _compileCountdownAlarms(self) -> None:
+		brailleTimer = splconfig.SPLConfig["General"]["BrailleTimer"]
+		alarms = splconfig.SPLConfig["IntroOutroAlarms"]
+		countdownAlarms = {}
+		for label, brailleTimers, sayAlarm, alarmTime, tone, duration, intro in (
+			("Remaining Time", ("outro", "both"), "SayEndOfTrack", "EndOfTrackTime", 440, 200, False),
+			("Remaining Song Ramp", ("intro", "both"), "SaySongRamp", "SongRampTime", 512, 400, True),
+		):
+			brailleTimerOn = brailleTimer in brailleTimers
+			alarmText = "00:{0:02d}".format(alarms[alarmTime]) if alarms[sayAlarm] else None
+			if brailleTimerOn or alarmText is not None:
+				countdownAlarms[label] = (brailleTimerOn, alarmText, tone, duration, intro)
+		self._countdownAlarms = countdownAlarms
+
 	# JL's additions
 
 	# Handle toggle messages.
@@ -1044,18 +1584,22 @@ class AppModule(appModuleHandler.AppModule):
 			ui.message(msg)
 
 	# Perform extra action in specific situations (mic alarm, for example).
-	def doExtraAction(self, status: str) -> None:
+	# 21.03: respond to Studio state changes reported by Studio API heartbeat.
+	def actionStudioStateChanged(self, flag: str, value: int) -> None:
+		if flag == "microphone":
+			self.micAlarmAction(bool(value))
 		# Be sure to only deal with cart mode changes if Cart Explorer is on.
-		# Optimization: Return early if the below condition is true.
-		if self.cartExplorer and status.startswith("Cart") and status.endswith((" On", " Off")):
+		elif flag in ("cartEdit", "cartInsert") and self.cartExplorer:
 			# 17.01: The best way to detect Cart Edit off is consulting file modification time.
 			# Automatically reload cart information if this is the case.
-			if status in ("Cart Edit Off", "Cart Insert On"):
+			if (flag == "cartEdit" and not value) or (flag == "cartInsert" and value):
 				self.carts = splmisc.cartExplorerRefresh(api.getForegroundObject().name, self.carts)
 			# Translators: Presented when cart modes are toggled while cart explorer is on.
 			ui.message(_("Cart explorer is active"))
-			return
-		# Microphone alarm and alarm interval if defined.
+
+	# Microphone alarm and alarm interval if defined.
+	# 21.03: formerly part of extra action handler which parsed status bar text.
+	def micAlarmAction(self, micOn: bool) -> None:
 		global micAlarmT, micAlarmT2
 		micAlarm = splconfig.SPLConfig["MicrophoneAlarm"]["MicAlarm"]
 		# #38 (17.11/15.10-lts): only enter microphone alarm area if alarm should be turned on.
@@ -1064,7 +1608,7 @@ class AppModule(appModuleHandler.AppModule):
 				micAlarmT.cancel()
 			micAlarmT = None
 			if micAlarmT2 is not None:
-				micAlarmT2.Stop()
+				micAlarmT2.cancel()
 			micAlarmT2 = None
 		else:
 			# Play an alarm sound (courtesy of Jerry Mader from Mader Radio).
@@ -1072,41 +1616,50 @@ class AppModule(appModuleHandler.AppModule):
 			# Translators: Presented when microphone was on for more than a specified time in microphone alarm dialog.
 			micAlarmMessage = _("Warning: Microphone active")
 			# Use a timer to play a tone when microphone was active for more than the specified amount.
-			if status == "Microphone On":
-				micAlarmT = threading.Timer(micAlarm, micAlarmManager, args=[micAlarmWav, micAlarmMessage])
-				try:
-					micAlarmT.start()
-				except RuntimeError:
-					micAlarmT = threading.Timer(micAlarm, messageSound, args=[micAlarmWav, micAlarmMessage])
-					micAlarmT.start()
-			elif status == "Microphone Off":
+			if micOn:
+				# 21.03: do not leave an earlier alarm timer running.
+				if micAlarmT is not None:
+					micAlarmT.cancel()
+				micAlarmT = splscheduler.schedule(
+					micAlarm, micAlarmManager, micAlarmWav, micAlarmMessage, name="micAlarm", owner="splstudio"
+				)
+			else:
 				if micAlarmT is not None:
 					micAlarmT.cancel()
 				micAlarmT = None
 				if micAlarmT2 is not None:
-					micAlarmT2.Stop()
+					micAlarmT2.cancel()
 				micAlarmT2 = None
 
 	# Respond to profile switches if asked.
 	def actionProfileSwitched(self) -> None:
+		self.actionSettingsChanged()
 		# #38 (17.11/15.10-LTS): obtain microphone alarm status.
 		# 21.03/20.09.6-LTS: only if Studio is still alive and Studio API says something.
-		status = splbase.studioAPI(2, 39)
-		if splbase.studioIsRunning(justChecking=True) and status is not None:
-			self.doExtraAction(self._statusBarMessages[2][status])
+		# 21.03: Studio API batch checks Studio window handle before and after obtaining status.
+		status = splbase.studioAPIBatch([(2, splbase.SPLStatusInfo)])
+		if status is not None:
+			self.micAlarmAction(bool(status[0]))
 
 	def actionSettingsReset(self, factoryDefaults: bool = False) -> None:
 		global micAlarmT, micAlarmT2
+		self.actionSettingsChanged()
 		# Regardless of factory defaults flag, turn off microphone alarm timers.
 		if micAlarmT is not None:
 			micAlarmT.cancel()
 		micAlarmT = None
 		if micAlarmT2 is not None:
-			micAlarmT2.Stop()
+			micAlarmT2.cancel()
 		micAlarmT2 = None
-		status = splbase.studioAPI(2, 39)
-		if splbase.studioIsRunning(justChecking=True) and status is not None:
-			self.doExtraAction(self._statusBarMessages[2][status])
+		status = splbase.studioAPIBatch([(2, splbase.SPLStatusInfo)])
+		if status is not None:
+			self.micAlarmAction(bool(status[0]))
+
+	# 21.03: settings were loaded or changed, so rebuild things which depend on settings.
+	def actionSettingsChanged(self) -> None:
+		self._compileStatusBarDispatch()
+		self._compileCountdownAlarms()
+		StudioPlaylistViewerItem.compileTrackNamePlan()
 
 	# Alarm announcement: Alarm notification via beeps, speech or both.
 	def alarmAnnounce(self, timeText: str, tone: float, duration: int, intro: bool = False) -> None:
@@ -1117,10 +1670,12 @@ class AppModule(appModuleHandler.AppModule):
 			if intro:
 				# Translators: Presented when end of introduction is approaching
 				# (example output: 5 sec left in track introduction).
-				ui.message(_("Warning: {seconds} sec left in track introduction").format(seconds=str(alarmTime)))
+				alarmMessage = _("Warning: {seconds} sec left in track introduction").format(seconds=str(alarmTime))
 			else:
 				# Translators: Presented when end of track is approaching.
-				ui.message(_("Warning: {seconds} sec remaining").format(seconds=str(alarmTime)))
+				alarmMessage = _("Warning: {seconds} sec remaining").format(seconds=str(alarmTime))
+			# 21.03: alarms are announced before other pending announcements.
+			splannouncer.announce(alarmMessage, priority=splannouncer.PRIORITY_ALARM)
 
 	# Hacks for gain focus events.
 	def event_gainFocus(self, obj, nextHandler):
@@ -1172,6 +1727,9 @@ class AppModule(appModuleHandler.AppModule):
 		# At the same time, close any opened SPL add-on dialogs.
 		splactions.SPLActionProfileSwitched.unregister(self.actionProfileSwitched)
 		splactions.SPLActionSettingsReset.unregister(self.actionSettingsReset)
+		splactions.SPLActionStudioStateChanged.unregister(self.actionStudioStateChanged)
+		splactions.SPLActionSettingsLoaded.unregister(self.actionSettingsChanged)
+		splactions.SPLActionSettingsChanged.unregister(self.actionSettingsChanged)
 		# 20.09: don't forget about metadata connection announcement handlers.
 		splactions.SPLActionProfileSwitched.unregister(splmisc.metadata_actionProfileSwitched)
 		splactions.SPLActionSettingsReset.unregister(splmisc.metadata_actionSettingsReset)
@@ -1182,7 +1740,7 @@ class AppModule(appModuleHandler.AppModule):
 			micAlarmT.cancel()
 		micAlarmT = None
 		if micAlarmT2 is not None:
-			micAlarmT2.Stop()
+			micAlarmT2.cancel()
 		micAlarmT2 = None
 		log.debug("SPL: saving add-on settings")
 		splconfig.terminate()
@@ -1190,24 +1748,56 @@ class AppModule(appModuleHandler.AppModule):
 		self._focusedTrack = None
 		# #86: track time analysis marker should be gone, too.
 		self._analysisMarker = None
+		# 21.03: Studio window readiness actions should not run after this point.
+		self._studioWindowReady = None
+		# 21.03: coalesced status bar changes are no longer relevant.
+		if self._statusBarFlushTimer is not None:
+			self._statusBarFlushTimer.Stop()
+			self._statusBarFlushTimer = None
+		if self._statusBarFlushRecord is not None:
+			self._statusBarFlushRecord.stop()
+			self._statusBarFlushRecord = None
+		self._pendingStatusBarChanges = None
+		log.debug(f"SPL: status bar events suppressed by coalescing: {self.statusBarEventsSuppressed}")
 		# #41: We're done monitoring Studio API.
 		if self._SPLStudioMonitor is not None:
 			self._SPLStudioMonitor.Stop()
 			self._SPLStudioMonitor = None
+			self._heartbeatRecord.stop()
+		log.debug(f"SPL: heartbeat statistics: {self.heartbeatStats()}")
 		try:
 			self.prefsMenu.Remove(self.SPLSettings)
 		except (RuntimeError, AttributeError):
 			pass
 		# Tell the handle finder thread it's time to leave this world.
-		self.noMoreHandle.set()
+		# 21.03: cancel all scheduled jobs (handle finder, microphone alarm, library scan reporter)
+		# so nothing runs after the app module is gone.
+		splscheduler.cancelJobs(owner="splstudio")
+		pendingJobs = splscheduler.pendingJobs()
+		if pendingJobs:
+			log.debug(f"SPL: scheduled jobs still pending: {pendingJobs}")
 		# Manually clear the following dictionaries.
 		self.carts.clear()
 		self._cachedStatusObjs.clear()
+		splbase.invalidateColumnContentCache()
+		log.debug(f"SPL: column content cache statistics: {splbase.columnContentCacheStats}")
+		SPLTrackItem.resetColumnReadStrategies(self.processID)
 		# Don't forget to reset timestamps for cart files.
 		splmisc._cartEditTimestamps = []
+		# 21.03: pending announcements are no longer relevant.
+		splannouncer.clearAnnouncements()
+		log.debug(f"SPL: announcement statistics: {splannouncer.announcementStats()}")
+		# 21.03: pending Studio API worker requests are no longer needed.
+		splbase.terminateStudioAPIWorker()
+		# 21.03: anything still running for Studio app module at this point is leaking.
+		log.debug(f"SPL: add-on jobs, timers and threads:\n{splscheduler.inventoryReport()}")
+		splscheduler.reportLeaks(owner="splstudio")
+		# 21.03: record Studio API statistics if told to do so.
+		if splbase.studioAPIStatsEnabled:
+			splbase.dumpStudioAPIStats()
 		# Just to make sure:
-		if splbase._SPLWin:
-			splbase._SPLWin = None
+		# 21.03: this also bumps Studio handle generation so handle-dependent caches are invalidated.
+		splbase.resetStudioHandle()
 		# 17.10: remove add-on specific command-line switches.
 		# This is necessary in order to restore full config functionality when NVDA restarts.
 		for cmdSwitch in globalVars.appArgsExtra:
@@ -1271,8 +1861,12 @@ class AppModule(appModuleHandler.AppModule):
 		description=translate("Reports the remaining time of the currently playing track, if any"),
 		gestures=["kb:control+alt+t", "ts(SPL):2finger_flickDown"])
 	def script_sayRemainingTime(self, gesture):
+		# 21.03: obtain remaining time from Studio API worker so speech is not blocked if Studio is busy.
 		if splbase.studioIsRunning():
-			self.announceTime(splbase.studioAPI(3, 105), offset=1)
+			splbase.studioAPIAsync(
+				3, splbase.SPLCurTrackPlaybackTime,
+				callback=lambda remainingTime: self.announceTime(remainingTime, offset=1)
+			)
 
 	@scriptHandler.script(
 		# Message comes from Foobar 2000 app module, part of NVDA Core.
@@ -1280,7 +1874,28 @@ class AppModule(appModuleHandler.AppModule):
 		gesture="kb:alt+shift+t")
 	def script_sayElapsedTime(self, gesture):
 		if splbase.studioIsRunning():
-			self.announceTime(splbase.studioAPI(0, 105))
+			splbase.studioAPIAsync(0, splbase.SPLCurTrackPlaybackTime, callback=self.announceTime)
+
+	# 21.03: show Studio API statistics (diagnostics; no gesture is assigned by default).
+	@scriptHandler.script(
+		# Translators: Input help mode message for a command in StationPlaylist add-on.
+		description=_("Shows Studio API call statistics if enabled via --spl-apistats command-line switch"))
+	def script_studioAPIStats(self, gesture):
+		if not splbase.studioAPIStatsEnabled:
+			# Translators: presented when Studio API statistics are not being collected.
+			ui.message(_("Studio API statistics are not enabled"))
+			return
+		splbase.dumpStudioAPIStats(browseable=True)
+
+	# 21.03: show add-on jobs, timers and threads (diagnostics; no gesture is assigned by default).
+	@scriptHandler.script(
+		# Translators: Input help mode message for a command in StationPlaylist add-on.
+		description=_("Shows background jobs, timers and threads used by StationPlaylist add-on"))
+	def script_addonInventory(self, gesture):
+		ui.browseableMessage(
+			# Translators: title of a window showing background jobs, timers and threads used by the add-on.
+			splscheduler.inventoryReport(), title=_("StationPlaylist add-on background activities")
+		)
 
 	@scriptHandler.script(
 		description=_(
@@ -1388,6 +2003,8 @@ class AppModule(appModuleHandler.AppModule):
 			brailleTimer = "off"
 		splconfig.SPLConfig["General"]["BrailleTimer"] = brailleTimer
 		splconfig.message("BrailleTimer", brailleTimer)
+		# 21.03: countdown alarms include braille timer.
+		self._compileCountdownAlarms()
 
 	# The track finder utility for find track script and other functions
 	# Perform a linear search to locate the track name and/or description which matches the entered value.
@@ -1415,7 +2032,12 @@ class AppModule(appModuleHandler.AppModule):
 		# this function should fail instead of raising attribute error.
 		if obj is not None and not column:
 			column = [obj.indexOf("Artist"), obj.indexOf("Title")]
-		track = self._trackLocator(text, obj=obj, directionForward=directionForward, columns=column)
+		# 21.03: searching a large playlist can be cancelled by pressing Escape.
+		try:
+			track = self._trackLocator(text, obj=obj, directionForward=directionForward, columns=column)
+		except splmisc.PlaylistWalkCancelled as e:
+			splmisc.playlistWalkCancelledMessage(e.rows)
+			return
 		if track:
 			# We need to fire set focus event twice and exit this routine.
 			# 16.10.1/15.2 LTS: Just select this track in order to
@@ -1431,16 +2053,17 @@ class AppModule(appModuleHandler.AppModule):
 	# Split from track finder in 2015.
 	# Return a track with the given search criteria.
 	# Column is a list of columns to be searched.
+	# 21.03: the search can be cancelled through a playlist walk token (by default, by pressing Escape).
 	def _trackLocator(
 			self, text: str, obj: Any = api.getFocusObject(),
-			directionForward: bool = True, columns: list[int] = []
+			directionForward: bool = True, columns: list[int] = [],
+			token: Optional[splmisc.PlaylistWalkToken] = None
 	) -> Any:
 		# 21.03/20.09.6-LTS: it doesn't make sense to search for tracks if text and/or columns are not specified.
 		# It is also an optimization because the below loop will not be run if any of the following are true.
 		if not text or not columns:
 			return None
-		nextTrack = "next" if directionForward else "previous"
-		while obj is not None:
+		for obj in splmisc.playlistWalk(obj, directionForward=directionForward, token=token):
 			# Do not use column content attribute, because sometimes NVDA will say
 			# it isn't a track item when in fact it is.
 			# If this happens, use the module level version of column content getter.
@@ -1449,7 +2072,6 @@ class AppModule(appModuleHandler.AppModule):
 				columnText = obj._getColumnContentRaw(column)
 				if columnText and text in columnText:
 					return obj
-			obj = getattr(obj, nextTrack)
 		return None
 
 	# Find a specific track based on a searched text.
@@ -1691,20 +2313,21 @@ class AppModule(appModuleHandler.AppModule):
 				self.libraryScanning = True
 
 	# Report library scan (number of items scanned) in the background.
+	# 21.03: rather than running a reporter thread, let Studio API heartbeat sample library scan progress
+	# and report scan rate and time remaining.
+	_libraryScanTracker: Optional[splmisc.LibraryScanTracker] = None
+
 	def monitorLibraryScan(self) -> None:
-		global libScanT
-		if libScanT and libScanT.is_alive() and api.getForegroundObject().windowClassName == "TTrackInsertForm":
+		if self._libraryScanTracker is not None:
 			return
 		# #155 (21.03): ideally library scan count would be an integer.
-		libScanCount: Optional[int] = splbase.studioAPI(1, 32)
-		if libScanCount is not None and libScanCount < 0:
-			self.libraryScanning = False
-			return
-		time.sleep(0.1)
-		# Is library scan count still an integer?
-		libScanCount = splbase.studioAPI(1, 32)
+		# 21.03: also obtain library item count when the scan starts (items in the library before this scan)
+		# so time remaining can be estimated during the first scan in this session.
+		libScanStatus = splbase.studioAPIBatch(
+			[(1, splbase.SPLLibraryScanCount), (0, splbase.SPLLibraryScanCount)]
+		)
 		if (
-			libScanCount is None
+			libScanStatus is None or libScanStatus[0] < 0
 			or (
 				api.getForegroundObject().windowClassName == "TTrackInsertForm"
 				and self.productVersion in noLibScanMonitor
@@ -1712,64 +2335,78 @@ class AppModule(appModuleHandler.AppModule):
 		):
 			self.libraryScanning = False
 			return
-		# 17.04: Library scan may have finished while this thread was sleeping.
-		if libScanCount < 0:
-			self.libraryScanning = False
-			# Translators: Presented when library scanning is finished.
-			ui.message(_("{itemCount} items in the library").format(itemCount=splbase.studioAPI(0, 32)))
-		else:
-			libScanT = threading.Thread(target=self.libraryScanReporter)
-			libScanT.daemon = True
-			libScanT.start()
-
-	def libraryScanReporter(self) -> None:
-		scanIter = 0
-		# 17.04: Use the constant directly
-		# as Studio provides a convenient method to detect completion of library scans.
-		# #155 (21.03): And make sure it is an integer, too.
-		scanCount: Optional[int] = splbase.studioAPI(1, 32)
-		while scanCount is not None and scanCount >= 0:
-			if not self.libraryScanning or not user32.FindWindowW("SPLStudio", None):
-				return
-			time.sleep(1)
-			# Do not continue if we're back on insert tracks form or library scan is finished.
-			if api.getForegroundObject().windowClassName == "TTrackInsertForm" or not self.libraryScanning:
-				return
-			# Scan count may have changed during sleep.
-			scanCount = splbase.studioAPI(1, 32)
-			# 21.03/20.09.6-LTS: return early if scan count is None (Studio dies).
-			# This also means library scan progress will not be announced (makes sense since Studio is gone).
-			if scanCount is None:
-				self.libraryScanning = False
-				return
-			if scanCount < 0:
-				break
-			scanIter += 1
-			if scanIter % 5 == 0 and splconfig.SPLConfig["General"]["LibraryScanAnnounce"] not in ("off", "ending"):
-				# 21.01/20.09.5-LTS: queue the announcement to main thread because of braille handler thread.
-				wx.CallAfter(self._libraryScanAnnouncer, scanCount, splconfig.SPLConfig["General"]["LibraryScanAnnounce"])
+		libScanCount, itemCount = libScanStatus
+		# Item count from the last completed scan is used if Studio says the library is empty.
+		self._libraryScanTracker = splmisc.LibraryScanTracker(expectedTotal=itemCount if itemCount > 0 else None)
+		self._libraryScanTracker.update(libScanCount)
+
+	# Called from Studio API heartbeat with the latest library scan count.
+	def _trackLibraryScan(self, scanCount: int) -> None:
+		tracker = self._libraryScanTracker
+		# Scan completion might have been announced by status bar (insert tracks dialog).
+		if not self.libraryScanning:
+			self._libraryScanTracker = None
+			return
+		# Do not announce anything while insert tracks dialog is active as status bar shows scan progress.
+		insertTracks = api.getForegroundObject().windowClassName == "TTrackInsertForm"
+		announcementType = splconfig.SPLConfig["General"]["LibraryScanAnnounce"]
+		if scanCount >= 0:
+			if tracker.update(scanCount) and not insertTracks and announcementType not in ("off", "ending"):
+				self._libraryScanAnnouncer(scanCount, announcementType, timeRemaining=tracker.eta)
+			return
 		self.libraryScanning = False
-		# 18.04: what if config database died?
-		if splconfig.SPLConfig and splconfig.SPLConfig["General"]["LibraryScanAnnounce"] != "off":
-			if splconfig.SPLConfig["General"]["BeepAnnounce"]:
-				tones.beep(370, 100)
-			else:
-				# Translators: Presented after library scan is done.
-				ui.message(_("Scan complete with {itemCount} items").format(itemCount=splbase.studioAPI(0, 32)))
+		self._libraryScanTracker = None
+		# 21.03: library item count has changed, so obtain the latest count from Studio.
+		splbase.invalidateStudioAPICache(splbase.SPLLibraryScanCount)
+		itemCount = splbase.studioAPI(0, splbase.SPLLibraryScanCount)
+		summary = tracker.finish(itemCount)
+		if announcementType == "off" or insertTracks:
+			return
+		if splconfig.SPLConfig["General"]["BeepAnnounce"]:
+			tones.beep(370, 100)
+			return
+		if announcementType == "numbers" and summary["averageRate"]:
+			scanCompleteMessage = (
+				# Translators: Presented after library scan is done, along with scan duration and scan rate.
+				_("Scan complete with {itemCount} items in {duration}, {rate} items per second").format(
+					itemCount=itemCount, duration=self._ms2time(round(summary["duration"]), ms=False),
+					rate=round(summary["averageRate"])
+				)
+			)
+		else:
+			# Translators: Presented after library scan is done.
+			scanCompleteMessage = _("Scan complete with {itemCount} items").format(itemCount=itemCount)
+		# 21.03: this replaces pending scan progress announcement.
+		splannouncer.announce(scanCompleteMessage, category="libraryScan")
 
 	# Take care of library scanning announcement.
-	def _libraryScanAnnouncer(self, count: int, announcementType: str) -> None:
+	# 21.03: time remaining (in seconds) is announced if it can be estimated.
+	def _libraryScanAnnouncer(
+			self, count: int, announcementType: str, timeRemaining: Optional[float] = None
+	) -> None:
+		# 21.03: scan progress announcements are queued as progress, with a newer one replacing an older one.
+		scanMessage = None
 		if announcementType == "progress":
-			# Translators: Presented when library scan is in progress.
-			tones.beep(550, 100) if splconfig.SPLConfig["General"]["BeepAnnounce"] else ui.message(_("Scanning"))
+			if splconfig.SPLConfig["General"]["BeepAnnounce"]:
+				tones.beep(550, 100)
+			else:
+				# Translators: Presented when library scan is in progress.
+				scanMessage = _("Scanning")
 		elif announcementType == "numbers":
 			if splconfig.SPLConfig["General"]["BeepAnnounce"]:
 				tones.beep(550, 100)
 				# No need to provide translatable string - just use index.
-				ui.message("{0}".format(count))
+				scanMessage = "{0}".format(count)
+			elif timeRemaining is not None:
+				# Translators: Presented when library scan is in progress, along with estimated time remaining.
+				scanMessage = _("{itemCount} items scanned, about {timeRemaining} remaining").format(
+					itemCount=count, timeRemaining=self._ms2time(round(timeRemaining) + 1, ms=False)
+				)
 			else:
 				# Translators: Presented when library scan is in progress.
-				ui.message(_("{itemCount} items scanned").format(itemCount=count))
+				scanMessage = _("{itemCount} items scanned").format(itemCount=count)
+		if scanMessage is not None:
+			splannouncer.announce(scanMessage, priority=splannouncer.PRIORITY_PROGRESS, category="libraryScan")
 
 	# Place markers.
 	placeMarker: Optional[str] = None
@@ -1805,7 +2442,7 @@ class AppModule(appModuleHandler.AppModule):
 		description=_("Opens a dialog to quickly enable or disable metadata streaming."))
 	def script_manageMetadataStreams(self, gesture):
 		# Do not even think about opening this dialog if handle to Studio isn't found.
-		if splbase._SPLWin is None:
+		if not splbase.studioIsRunning(justChecking=True):
 			# Translators: Presented when streaming dialog cannot be shown.
 			ui.message(_("Cannot open metadata streaming dialog"))
 			return
@@ -1856,7 +2493,8 @@ class AppModule(appModuleHandler.AppModule):
 				# while focused on places other than Playlist Viewer.
 				ui.message(_("Please return to playlist viewer before invoking this command."))
 			return self.SPLPlaylistNotFocused
-		if not splbase.studioAPI(0, 124):
+		# 21.03: SPL Assistant layer commands are answered with track count prefetched when entering the layer.
+		if not splbase.studioAPI(0, splbase.SPLTrackCount, prefetched=self.SPLAssistant):
 			if announceErrors:
 				# Translators: an error message presented when performing some playlist commands
 				# while no playlist has been loaded.
@@ -1902,13 +2540,15 @@ class AppModule(appModuleHandler.AppModule):
 	# Return total duration of a range of tracks.
 	# This is used in track time analysis when multiple tracks are selected.
 	# This is also called from playlist duration scripts.
-	def playlistDuration(self, start: Any = None, end: Any = None) -> int:
+	# 21.03: raises splmisc.PlaylistWalkCancelled if the walk is cancelled (by default, by pressing Escape).
+	def playlistDuration(
+			self, start: Any = None, end: Any = None, token: Optional[splmisc.PlaylistWalkToken] = None
+	) -> int:
 		if start is None:
 			start = api.getFocusObject()
 		duration = start.indexOf("Duration")
 		totalDuration = 0
-		obj = start
-		while obj not in (None, end):
+		for obj in splmisc.playlistWalk(start, end, token=token):
 			# Technically segue.
 			segue = obj._getColumnContentRaw(duration)
 			# NVDA 2020.4 returns an empty string instead of None in order to
@@ -1919,14 +2559,17 @@ class AppModule(appModuleHandler.AppModule):
 				totalDuration += (int(hms[-2]) * 60) + int(hms[-1])
 				if len(hms) == 3:
 					totalDuration += int(hms[0]) * 3600
-			obj = obj.next
 		return totalDuration
 
 	# Playlist snapshots
 	# Data to be gathered comes from a set of flags.
 	# By default, playlist duration (including shortest and average),
 	# category summary and other statistics will be gathered.
-	def playlistSnapshots(self, obj: Any, end: Any, snapshotFlags: Optional[list[str]] = None) -> dict[str, Any]:
+	# 21.03: raises splmisc.PlaylistWalkCancelled if the walk is cancelled (by default, by pressing Escape).
+	def playlistSnapshots(
+			self, obj: Any, end: Any, snapshotFlags: Optional[list[str]] = None,
+			token: Optional[splmisc.PlaylistWalkToken] = None
+	) -> dict[str, Any]:
 		# #55 (18.05): is this a complete snapshot?
 		completePlaylistSnapshot = obj.IAccessibleChildID == 1 and end is None
 		# Track count and total duration are always included.
@@ -1950,14 +2593,16 @@ class AppModule(appModuleHandler.AppModule):
 		genre = obj.indexOf("Genre")
 		genres = []
 		# A specific version of the playlist duration loop is needed in order to gather statistics.
-		while obj not in (None, end):
-			segue = obj._getColumnContentRaw(duration)
-			trackTitle = obj._getColumnContentRaw(title)
-			categories.append(obj._getColumnContentRaw(category))
+		for obj in splmisc.playlistWalk(obj, end, token=token):
+			# 21.03: read columns for this track in one go.
+			segue, trackTitle, trackCategory, trackArtist, trackGenre = obj._getColumnContentsRaw(
+				[duration, title, category, artist, genre]
+			)
+			categories.append(trackCategory)
 			# Don't record artist and genre information for an hour marker (reported by a broadcaster).
 			if categories[-1] != "Hour Marker":
-				artists.append(obj._getColumnContentRaw(artist))
-				genres.append(obj._getColumnContentRaw(genre))
+				artists.append(trackArtist)
+				genres.append(trackGenre)
 			# 21.03/20.09.6-LTS: convert segue to an integer for ease of min/max comparison.
 			# NVDA 2020.4 returns an empty string instead of None in order to
 			# avoid errors with 64-bit SysListView32 controls.
@@ -1969,10 +2614,9 @@ class AppModule(appModuleHandler.AppModule):
 					segue += int(hms[0]) * 3600
 				totalDuration += segue
 				trackLengths.append((segue, trackTitle))
-			obj = obj.next
 		# #55 (18.05): use total track count if it is an entire playlist, if not, resort to categories count.
 		if completePlaylistSnapshot:
-			snapshot["PlaylistItemCount"] = splbase.studioAPI(0, 124)
+			snapshot["PlaylistItemCount"] = splbase.studioAPI(0, splbase.SPLTrackCount)
 		else:
 			snapshot["PlaylistItemCount"] = len(categories)
 		snapshot["PlaylistTrackCount"] = len(artists)
@@ -2166,15 +2810,16 @@ class AppModule(appModuleHandler.AppModule):
 	@scriptHandler.script(gestures=["kb:Shift+delete", "kb:Shift+numpadDelete"])
 	def script_deleteTrack(self, gesture):
 		self.preTrackRemoval()
+		# 21.03: tracks below the deleted one will move up, so cached column contents are no longer valid.
+		splbase.invalidateColumnContentCache()
 		gesture.send()
 
 	# When Escape is pressed, activate background library scan if conditions are right.
 	@scriptHandler.script(gesture="kb:escape")
 	def script_escape(self, gesture):
 		gesture.send()
-		if self.libraryScanning:
-			if not libScanT or (libScanT and not libScanT.is_alive()):
-				self.monitorLibraryScan()
+		if self.libraryScanning and self._libraryScanTracker is None:
+			self.monitorLibraryScan()
 
 	# SPL Assistant: reports status on playback, operation, etc.
 	# Used layer command approach to save gesture assignments.
@@ -2191,6 +2836,8 @@ class AppModule(appModuleHandler.AppModule):
 
 	def finish(self):
 		self.SPLAssistant = False
+		# 21.03: values prefetched when entering SPL Assistant are no longer needed.
+		splbase.clearPrefetchedStudioAPIResponses()
 		self.clearGestureBindings()
 		self.bindGestures(self.__gestures)
 		if self.cartExplorer:
@@ -2202,6 +2849,16 @@ class AppModule(appModuleHandler.AppModule):
 
 	# SPL Assistant flag.
 	SPLAssistant = False
+	# 21.03: Studio API requests prefetched when entering SPL Assistant layer:
+	# status flags, hour values (track duration, remaining, scheduled for, scheduled to play)
+	# and track count (checked by playlist commands).
+	# Only layer commands are answered from prefetched responses.
+	# Listener count is not prefetched as listener count command announces status bar text instead.
+	_SPLAssistantPrefetchRequests = (
+		[(index, splbase.SPLStatusInfo) for index in range(7)]
+		+ [(index, splbase.SPLHourInfo) for index in (0, 1, 3, 4)]
+		+ [(0, splbase.SPLTrackCount)]
+	)
 
 	# The SPL Assistant layer driver.
 
@@ -2222,7 +2879,7 @@ class AppModule(appModuleHandler.AppModule):
 			return
 		try:
 			# 7.0: Don't bother if handle to Studio isn't found.
-			if splbase._SPLWin is None:
+			if not splbase.studioIsRunning(justChecking=True):
 				# Translators: Presented when SPL Assistant cannot be invoked.
 				ui.message(_("Failed to locate Studio main window, cannot enter SPL Assistant"))
 				return
@@ -2239,6 +2896,8 @@ class AppModule(appModuleHandler.AppModule):
 			for i in range(5):
 				self.bindGesture(f"kb:shift+{i}", "metadataEnabled")
 			self.SPLAssistant = True
+			# 21.03: obtain values likely to be asked for by layer commands in the background.
+			splbase.prefetchStudioAPI(self._SPLAssistantPrefetchRequests)
 			tones.beep(512, 50)
 			if splconfig.SPLConfig["Advanced"]["CompatibilityLayer"] == "jfw":
 				ui.message("JAWS")
@@ -2271,10 +2930,16 @@ class AppModule(appModuleHandler.AppModule):
 	}
 
 	_cachedStatusObjs: dict[int, Any] = {}
+	# 21.03: Studio handle generation for which status objects were cached.
+	_cachedStatusObjsGeneration: int = 0
 
 	# Called in the layer commands themselves.
 	# 16.11: in Studio 5.20, it is possible to obtain some of these via the API, hence the API method is used.
 	def status(self, infoIndex: int) -> Any:
+		# 21.03: cached status objects are no longer valid if Studio has restarted.
+		if self._cachedStatusObjsGeneration != splbase.studioHandleGeneration:
+			self._cachedStatusObjs.clear()
+			self._cachedStatusObjsGeneration = splbase.studioHandleGeneration
 		# Look up the cached objects first for faster response.
 		if infoIndex not in self._cachedStatusObjs:
 			fg = api.getForegroundObject()
@@ -2313,7 +2978,7 @@ class AppModule(appModuleHandler.AppModule):
 	# (API is for Studio 5.20 and later).
 	def sayStatus(self, index: int) -> None:
 		# 21.03/20.09.6-LTS: no, status index must be an integer.
-		studioStatus = splbase.studioAPI(index, 39)
+		studioStatus = splbase.studioAPI(index, splbase.SPLStatusInfo, prefetched=self.SPLAssistant)
 		if studioStatus is None:
 			return
 		status = self._statusBarMessages[index][studioStatus]
@@ -2340,8 +3005,13 @@ class AppModule(appModuleHandler.AppModule):
 
 	def script_sayCartEditStatus(self, gesture):
 		# 16.12: Because cart edit status also shows cart insert status, verbosity control will not apply.
-		cartEdit = splbase.studioAPI(5, 39)
-		cartInsert = splbase.studioAPI(6, 39)
+		# 21.03: obtain both in one batch, and say nothing if Studio is gone.
+		cartStatus = splbase.studioAPIBatch(
+			[(5, splbase.SPLStatusInfo), (6, splbase.SPLStatusInfo)], prefetched=self.SPLAssistant
+		)
+		if cartStatus is None:
+			return
+		cartEdit, cartInsert = cartStatus
 		if cartEdit:
 			ui.message("Cart Edit On")
 		elif not cartEdit and cartInsert:
@@ -2350,18 +3020,21 @@ class AppModule(appModuleHandler.AppModule):
 			ui.message("Cart Edit Off")
 
 	def script_sayHourTrackDuration(self, gesture):
-		self.announceTime(splbase.studioAPI(0, 27))
+		self.announceTime(splbase.studioAPI(0, splbase.SPLHourInfo, prefetched=self.SPLAssistant))
 
 	def script_sayHourRemaining(self, gesture):
 		# 7.0: Split from playlist remaining script (formerly the playlist remainder command).
-		self.announceTime(splbase.studioAPI(1, 27))
+		self.announceTime(splbase.studioAPI(1, splbase.SPLHourInfo, prefetched=self.SPLAssistant))
 
 	def script_sayPlaylistRemainingDuration(self, gesture):
 		if self.canPerformPlaylistCommands() == self.SPLPlaylistNoErrors:
 			obj = api.getFocusObject()
 			if obj.role == controlTypes.ROLE_LIST:
 				obj = obj.firstChild
-			self.announceTime(self.playlistDuration(start=obj), ms=False)
+			try:
+				self.announceTime(self.playlistDuration(start=obj), ms=False)
+			except splmisc.PlaylistWalkCancelled as e:
+				splmisc.playlistWalkCancelledMessage(e.rows)
 
 	def script_sayPlaylistModified(self, gesture):
 		obj = self.status(self.SPLSystemStatus).getChild(5)
@@ -2376,7 +3049,7 @@ class AppModule(appModuleHandler.AppModule):
 			self.finish()
 			return
 		try:
-			if not splbase.studioAPI(0, 39):
+			if not splbase.studioAPI(0, splbase.SPLStatusInfo, prefetched=self.SPLAssistant):
 				# Message comes from Foobar 2000 app module, part of NVDA Core.
 				nextTrack = translate("No track playing")
 			else:
@@ -2404,7 +3077,7 @@ class AppModule(appModuleHandler.AppModule):
 			self.finish()
 			return
 		try:
-			if not splbase.studioAPI(0, 39):
+			if not splbase.studioAPI(0, splbase.SPLStatusInfo, prefetched=self.SPLAssistant):
 				# Message comes from Foobar 2000 app module, part of NVDA Core.
 				currentTrack = translate("No track playing")
 			else:
@@ -2450,7 +3123,7 @@ class AppModule(appModuleHandler.AppModule):
 		# Sometimes, hour markers return seconds.999 due to rounding error, hence this must be taken care of here.
 		# #155 (21.03): Studio API can return None if Studio dies.
 		# Also, because this will become an integer tuple below, use Any type flag to tell Mypy to skip this line.
-		trackStarts: Optional[Any] = splbase.studioAPI(3, 27)
+		trackStarts: Optional[Any] = splbase.studioAPI(3, splbase.SPLHourInfo, prefetched=self.SPLAssistant)
 		if trackStarts is None:
 			return
 		trackStarts = divmod(trackStarts, 1000)
@@ -2465,7 +3138,9 @@ class AppModule(appModuleHandler.AppModule):
 		# 7.0: This script announces length of time remaining until the selected track will play.
 		# This is the only time hour announcement should not be used
 		# in order to conform to what's displayed on screen.
-		self.announceTime(splbase.studioAPI(4, 27), includeHours=False)
+		self.announceTime(
+			splbase.studioAPI(4, splbase.SPLHourInfo, prefetched=self.SPLAssistant), includeHours=False
+		)
 
 	def script_sayListenerCount(self, gesture):
 		obj = self.status(self.SPLSystemStatus).getChild(3)
@@ -2481,12 +3156,14 @@ class AppModule(appModuleHandler.AppModule):
 	def script_libraryScanMonitor(self, gesture):
 		if not self.libraryScanning:
 			# #155 (21.03): if library scan count is None, then final scan count would also be None.
-			libScanCount = splbase.studioAPI(1, 32)
+			libScanCount = splbase.studioAPI(1, splbase.SPLLibraryScanCount)
 			# Do nothing if library scan count is indeed None.
 			if libScanCount is None:
 				return
 			if libScanCount < 0:
-				ui.message(_("{itemCount} items in the library").format(itemCount=splbase.studioAPI(0, 32)))
+				ui.message(_("{itemCount} items in the library").format(
+					itemCount=splbase.studioAPI(0, splbase.SPLLibraryScanCount)
+				))
 				return
 			self.libraryScanning = True
 			if not splconfig.SPLConfig["General"]["BeepAnnounce"]:
@@ -2533,9 +3210,13 @@ class AppModule(appModuleHandler.AppModule):
 			# #75 (18.08): use segue instead as it gives more accurate information as to the actual total duration.
 			# Add a 1 because track position subtracts it for comparison purposes.
 			# 18.10: rework this so this feature can work on track objects directly.
-			totalLength = self.playlistDuration(
-				start=focus.parent.getChild(analysisBegin), end=focus.parent.getChild(analysisEnd + 1)
-			)
+			try:
+				totalLength = self.playlistDuration(
+					start=focus.parent.getChild(analysisBegin), end=focus.parent.getChild(analysisEnd + 1)
+				)
+			except splmisc.PlaylistWalkCancelled as e:
+				splmisc.playlistWalkCancelledMessage(e.rows)
+				return
 			# Playlist duration method returns raw seconds, so do not force milliseconds,
 			# and in case of multiple tracks, multiply this by 1000.
 			if analysisRange == 1:
@@ -2582,7 +3263,11 @@ class AppModule(appModuleHandler.AppModule):
 			start = obj.parent.getChild(analysisBegin)
 			end = obj.parent.getChild(analysisEnd).next
 		# Speak and braille on the first press, display a decorated HTML message for subsequent presses.
-		self.playlistSnapshotOutput(self.playlistSnapshots(start, end), scriptCount)
+		# 21.03: gathering snapshots can be cancelled by pressing Escape.
+		try:
+			self.playlistSnapshotOutput(self.playlistSnapshots(start, end), scriptCount)
+		except splmisc.PlaylistWalkCancelled as e:
+			splmisc.playlistWalkCancelledMessage(e.rows)
 		self.finish()
 
 	def script_playlistTranscripts(self, gesture):
@@ -2640,7 +3325,11 @@ class AppModule(appModuleHandler.AppModule):
 			# #155 (21.03): an extra check to make sure it is indeed a string.
 			if self.placeMarker is not None and self.placeMarker != "":
 				obj = api.getFocusObject().parent.firstChild
-				track = self._trackLocator(self.placeMarker, obj=obj, columns=[obj.indexOf("Filename")])
+				try:
+					track = self._trackLocator(self.placeMarker, obj=obj, columns=[obj.indexOf("Filename")])
+				except splmisc.PlaylistWalkCancelled as e:
+					splmisc.playlistWalkCancelledMessage(e.rows)
+					return
 				# 21.03/20.09.6-LTS: only do the following if a track is found.
 				if track:
 					# 16.11: Just like Track Finder, use select track function to select the place marker track.
@@ -2665,7 +3354,7 @@ class AppModule(appModuleHandler.AppModule):
 	# Gesture(s) for the following script cannot be changed by users.
 	def script_metadataEnabled(self, gesture):
 		url = int(gesture.displayName[-1])
-		if splbase.studioAPI(url, 36):
+		if splbase.studioAPI(url, splbase.SPLMetadataStreaming):
 			# 0 is DSP encoder status, others are servers.
 			if url:
 				# Translators: Status message for metadata streaming.
@@ -18,7 +18,12 @@ SPLActionSettingsLoaded = extensionPoints.Action()
 SPLActionProfileSwitched = extensionPoints.Action()
 # Settings are being saved.
 SPLActionSettingsSaved = extensionPoints.Action()
+# 21.03: settings were changed from add-on settings dialog.
+SPLActionSettingsChanged = extensionPoints.Action()
 # Settings are reloading or set to factory defaults.
 SPLActionSettingsReset = extensionPoints.Action()
 # Studio is terminating.
 SPLActionAppTerminating = extensionPoints.Action()
+# 21.03: Studio state (playback, automation, microphone and others) has changed.
+# Handlers are given the name of the state flag (see Studio app module) and its new value.
+SPLActionStudioStateChanged = extensionPoints.Action()
@@ -0,0 +1,95 @@
+# SPL Studio announcement broker
+# An app module and global plugin package for NVDA
+# Copyright 2021 Joseph Lee, released under GPL.
+# Announcements from Studio app module, encoders and support modules (main and background threads)
+# are queued here and delivered from NVDA's main thread in priority order.
+# This module provides services for other modules, not the other way around.
+
+# While waiting for delivery, an identical announcement is merged with the pending one,
+# and an announcement of a given category (library scan progress or status of a given encoder, for example)
+# replaces the pending announcement of the same category so stale announcements are not heard.
+
+# #155 (21.03): remove __future__ import when NVDA runs under Python 3.10.
+from __future__ import annotations
+from typing import Optional
+import itertools
+import threading
+import wx
+import ui
+
+# Announcement priorities (higher priority announcements are delivered first).
+PRIORITY_PROGRESS = 0
+PRIORITY_STATUS = 1
+PRIORITY_ALARM = 2
+
+# Pending announcements beyond this count are dropped (lowest priority and oldest first).
+maxPendingAnnouncements = 20
+
+
+class _Announcement:
+
+	__slots__ = ("message", "priority", "category", "order")
+
+	def __init__(self, message: str, priority: int, category: Optional[str], order: int) -> None:
+		self.message = message
+		self.priority = priority
+		self.category = category
+		self.order = order
+
+
+_pendingAnnouncements: list[_Announcement] = []
+_pendingLock = threading.Lock()
+_deliveryQueued = False
+_announcementCounter = itertools.count()
+# Announcement metrics (queued, delivered, merged with identical pending ones, superseded, and dropped).
+_announcementStats = {"queued": 0, "delivered": 0, "merged": 0, "superseded": 0, "dropped": 0}
+
+
+# Queue an announcement, which can be done from any thread.
+# Category is used to replace a pending announcement of the same category with this one.
+def announce(message: str, priority: int = PRIORITY_STATUS, category: Optional[str] = None) -> None:
+	global _deliveryQueued
+	with _pendingLock:
+		_announcementStats["queued"] += 1
+		for announcement in _pendingAnnouncements:
+			if announcement.message == message:
+				announcement.priority = max(announcement.priority, priority)
+				_announcementStats["merged"] += 1
+				return
+		if category is not None:
+			for announcement in _pendingAnnouncements:
+				if announcement.category == category:
+					_pendingAnnouncements.remove(announcement)
+					_announcementStats["superseded"] += 1
+					break
+		_pendingAnnouncements.append(_Announcement(message, priority, category, next(_announcementCounter)))
+		if len(_pendingAnnouncements) > maxPendingAnnouncements:
+			_pendingAnnouncements.remove(min(_pendingAnnouncements, key=lambda a: (a.priority, a.order)))
+			_announcementStats["dropped"] += 1
+		if _deliveryQueued:
+			return
+		_deliveryQueued = True
+	wx.CallAfter(_deliverAnnouncements)
+
+
+def _deliverAnnouncements() -> None:
+	global _deliveryQueued
+	with _pendingLock:
+		announcements = sorted(_pendingAnnouncements, key=lambda a: (-a.priority, a.order))
+		_pendingAnnouncements.clear()
+		_deliveryQueued = False
+		_announcementStats["delivered"] += len(announcements)
+	for announcement in announcements:
+		ui.message(announcement.message)
+
+
+# Drop pending announcements, typically when the app module is terminating.
+def clearAnnouncements() -> None:
+	with _pendingLock:
+		_announcementStats["dropped"] += len(_pendingAnnouncements)
+		_pendingAnnouncements.clear()
+
+
+def announcementStats() -> dict[str, int]:
+	with _pendingLock:
+		return dict(_announcementStats)
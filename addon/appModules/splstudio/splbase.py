@@ -4,15 +4,480 @@
 
 # Base services for Studio app module and support modules
 
-from typing import Optional
-import ui
-from winUser import sendMessage, user32
+# #155 (21.03): remove __future__ import when NVDA runs under Python 3.10.
+from __future__ import annotations
+from typing import Any, Callable, Generator, Optional
+import threading
+import time
+import bisect
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+# 21.03: GUI and other NVDA modules (except logging and translations) are imported where needed
+# so Studio API services can be used (and measured) without NVDA's GUI.
+# See devScripts/studioAPISimulation.py for running these services over a simulated Studio or a recording.
 from logHandler import log
 import addonHandler
 addonHandler.initTranslation()
+from . import spltransport
+from . import splscheduler
+
+# Studio API commands (lParem values for WM_USER messages sent to Studio window).
+# 21.03: shared by Studio app module, SPL Controller and encoders.
+SPLVersion = 2
+SPLPlay = 12
+SPLStop = 13
+SPLPause = 15
+SPLAutomate = 16
+SPLMic = 17
+SPLLineIn = 18
+SPLCartPlayer = 19
+SPLHourInfo = 27
+SPLFileDuration = 30
+SPLLibraryScanCount = 32
+SPLListenerCount = 35
+SPLMetadataStreaming = 36
+SPLStatusInfo = 39
+SPL_TrackPlaybackStatus = 104
+SPLCurTrackPlaybackTime = 105
+SPLSelectTrack = 121
+SPLTrackCount = 124
+SPLTrackFilename = 211
+
+
+# 21.03: return the value of the given add-on command-line switch (--switch=value),
+# an empty string if the switch is given without a value (--switch), or None if not given.
+# Unknown command-line switches are kept by NVDA in globalVars.appArgsExtra.
+def _commandLineSwitch(switch: str) -> Optional[str]:
+	try:
+		import globalVars
+	except ImportError:
+		return None
+	prefix = switch + "="
+	for arg in globalVars.appArgsExtra:
+		if arg == switch:
+			return ""
+		elif arg.startswith(prefix):
+			return arg[len(prefix):]
+	return None
+
+
+# 21.03: create Studio API transport selected via --spl-transport command-line switch
+# (see Studio API transports module for choices), using Studio if not given or not valid.
+def _createStudioAPITransport() -> spltransport.StudioAPITransport:
+	spec = _commandLineSwitch("--spl-transport")
+	if spec is not None:
+		try:
+			transport = spltransport.createTransport(spec)
+			log.info(f"SPL: using Studio API transport {spec}")
+			return transport
+		except (ValueError, OSError):
+			log.error(f"SPL: cannot use Studio API transport {spec}, using Studio instead", exc_info=True)
+	return spltransport.User32Transport()
 
 # Cache the handle to main Studio window.
 _SPLWin: Optional[int] = None
+# 21.03: Studio window handle generation, incremented whenever cached Studio window handle changes
+# (Studio starts, exits, or restarts).
+# Other caches (status objects, column contents and others) can record the generation they were built for
+# and invalidate themselves when it changes.
+studioHandleGeneration: int = 0
+# Handle cache is updated from main and background threads (library scan, encoders and others).
+_studioHandleLock = threading.Lock()
+# 21.03: Studio window readiness, resolved with Studio window handle when Studio window is first found
+# (by the readiness probe or when Studio app module hears from Studio windows).
+# Code which needs Studio window should wait for this instead of polling for the window.
+_studioReady: Optional[Future] = None
+_studioReadyRequested = 0.0
+# Readiness probe delays (in seconds), doubled after each failed probe up to the maximum.
+studioReadyProbeInitialDelay = 0.05
+studioReadyProbeMaxDelay = 1.0
+# Time (in seconds) taken for Studio window to become ready, recorded for startup latency tracking.
+studioReadyLatency: Optional[float] = None
+# 21.03: Studio API response cache.
+# Some values such as track count, library item count and hour values change rarely
+# but are asked for frequently (for example, when moving through tracks), so keep responses for a short time.
+# Time to live (in seconds) for responses, keyed by Studio API command.
+studioAPICacheTTL: dict[int, float] = {
+	SPLHourInfo: 0.5,  # Hour track duration, hour remaining, scheduled time.
+	SPLLibraryScanCount: 1.0,  # Library scan progress and library item count.
+	SPLTrackCount: 2.0,
+}
+# Cached responses keyed by (arg, command), with values being (response, expiration time).
+_studioAPICache: dict[tuple[int, int], tuple[int, float]] = {}
+# 21.03: responses prefetched in anticipation of SPL Assistant layer commands,
+# keyed by (arg, command), with values being (response, expiration time, Studio handle generation).
+# Only requests asking for prefetched responses (SPL Assistant layer commands) are answered from these,
+# and prefetched responses expire shortly after being obtained even if the layer is still active.
+prefetchedResponseTTL = 2.0
+_prefetchedResponses: dict[tuple[int, int], tuple[int, float, int]] = {}
+# Incremented when prefetched responses are cleared so prefetches finishing afterwards are discarded.
+_prefetchGeneration: int = 0
+# 21.03: responses are cached and prefetched on Studio API worker thread while being looked up,
+# invalidated and cleared on the main thread, so access to both caches (including checking prefetch
+# generation and storing prefetched responses) is guarded by this lock.
+# If Studio handle lock is also needed, acquire it first.
+_studioAPICacheLock = threading.Lock()
+# 21.03: Studio API requests are sent with a time-out (in milliseconds)
+# so NVDA will not freeze if Studio is busy or is exiting.
+studioAPITimeout: int = 1000
+# 21.03: Studio API transport (user32 by default, simulated Studio or recordings for measurements).
+_transport: spltransport.StudioAPITransport = _createStudioAPITransport()
+# Studio API worker thread for asynchronous requests, created when first needed.
+_studioAPIWorker: Optional[ThreadPoolExecutor] = None
+_studioAPIWorkerRecord: Optional[splscheduler.InventoryRecord] = None
+# 21.03: single-flight Studio API requests.
+# Library scan reporter, Studio API monitor, encoder monitors and the main thread can ask for the same value
+# at the same time, so callers wait for the identical request in flight instead of sending their own.
+# Only requests which obtain values (not the ones changing Studio state) are coalesced.
+studioAPISingleFlightCommands: frozenset[int] = frozenset({
+	SPLHourInfo, SPLLibraryScanCount, SPLListenerCount, SPLStatusInfo,
+	SPL_TrackPlaybackStatus, SPLCurTrackPlaybackTime, SPLTrackCount
+})
+# Requests in flight keyed by (arg, command).
+_inFlightRequests: dict[tuple[int, int], _InFlightRequest] = {}
+_inFlightLock = threading.Lock()
+# 21.03: Playlist Viewer column content cache.
+# A focus change reads several columns of the focused track (category sounds, track comments, name, braille),
+# each being a cross-process read, so keep column contents for a short time.
+# Cached contents keyed by (list window handle, row ID, column), with values being (content, expiration time),
+# least recently used first.
+columnContentCacheSize = 512
+columnContentCacheTTL = 1.0
+_columnContentCache: OrderedDict[tuple[int, int, int], tuple[Optional[str], float]] = OrderedDict()
+# Studio handle generation the column content cache was filled for.
+_columnContentCacheGeneration: int = 0
+columnContentCacheStats = {"hits": 0, "misses": 0, "evictions": 0}
+# Number of requests not sent because an identical request was in flight, keyed by (arg, command).
+studioAPICoalescedRequests: dict[tuple[int, int], int] = {}
+# 21.03: Studio API statistics (call counts, failures and latency histogram for each command).
+# Off by default as this is meant for diagnostics, enabled via --spl-apistats command-line switch.
+studioAPIStatsEnabled: bool = _commandLineSwitch("--spl-apistats") is not None
+# Upper bounds (in milliseconds) for latency histogram buckets, with the last bucket holding slower calls.
+studioAPILatencyBuckets: tuple[int, ...] = (1, 5, 10, 50, 100, 500, 1000)
+# Statistics are kept for at most this many commands so memory use stays bounded.
+_studioAPIStatsMaxCommands = 256
+_studioAPIStats: dict[int, _StudioAPICommandStats] = {}
+_studioAPIStatsLock = threading.Lock()
+
+
+# Is the given window handle still the main Studio window?
+# This is much cheaper than looking up Studio window class across all top-level windows.
+def _isStudioWindow(hwnd: Optional[int]) -> bool:
+	return bool(hwnd) and _transport.isStudioWindow(hwnd)
+
+
+# Return Studio window handle (0 if Studio is not running), updating the handle cache if necessary.
+# 21.03: check the cached handle first, and look up Studio window class only if the cached handle is invalid.
+def studioHandle() -> int:
+	global _SPLWin, studioHandleGeneration
+	hwnd = _SPLWin
+	if _isStudioWindow(hwnd):
+		return hwnd
+	hwnd = _transport.findStudioWindow()
+	with _studioHandleLock:
+		if (hwnd or None) != _SPLWin:
+			_SPLWin = hwnd or None
+			studioHandleGeneration += 1
+			with _studioAPICacheLock:
+				_studioAPICache.clear()
+				_prefetchedResponses.clear()
+			log.debug(f"SPL: Studio handle is {hwnd}, handle generation {studioHandleGeneration}")
+	if hwnd:
+		_resolveStudioReady(hwnd)
+	return hwnd
+
+
+# Forget Studio window handle, typically when the app module is terminating.
+def resetStudioHandle() -> None:
+	global _SPLWin, studioHandleGeneration, _studioReady
+	with _studioHandleLock:
+		if _SPLWin is not None:
+			_SPLWin = None
+			studioHandleGeneration += 1
+			with _studioAPICacheLock:
+				_studioAPICache.clear()
+				_prefetchedResponses.clear()
+		# Readiness is for this Studio session only.
+		ready, _studioReady = _studioReady, None
+	# Cancelling runs callbacks, so do it outside the lock.
+	if ready is not None:
+		ready.cancel()
+
+
+# Return Studio window readiness future, resolved with Studio window handle once Studio window is found.
+# Callbacks added to it may be called from any thread (including the caller's if already resolved).
+def studioWindowReady() -> Future:
+	global _studioReady, _studioReadyRequested
+	with _studioHandleLock:
+		if _studioReady is None:
+			_studioReady = Future()
+			_studioReadyRequested = time.perf_counter()
+		ready = _studioReady
+	if not ready.done() and _SPLWin is not None:
+		_resolveStudioReady(_SPLWin)
+	return ready
+
+
+def _resolveStudioReady(hwnd: int) -> None:
+	global studioReadyLatency
+	with _studioHandleLock:
+		ready = _studioReady
+		# Once running, readiness can no longer be cancelled and will be resolved only once.
+		# Resolved or cancelled readiness cannot be set to running again (Future raises RuntimeError).
+		if ready is None or ready.done() or ready.running() or not ready.set_running_or_notify_cancel():
+			return
+		studioReadyLatency = time.perf_counter() - _studioReadyRequested
+	log.debug(f"SPL: Studio window ready after {studioReadyLatency:.3f} seconds")
+	ready.set_result(hwnd)
+
+
+# A scheduler task which probes for Studio window with exponential backoff until Studio window is ready.
+# Event handlers can resolve readiness earlier by calling studioHandle when they hear from Studio windows.
+def studioWindowReadyProbe() -> Generator[float, None, None]:
+	ready = studioWindowReady()
+	delay = studioReadyProbeInitialDelay
+	while not ready.done() and not studioHandle():
+		yield delay
+		delay = min(delay * 2, studioReadyProbeMaxDelay)
+
+
+# Clear cached Studio API responses, either for the given command or for all commands.
+# Event handlers can call this when they know cached values became stale (playlist modified, for example).
+# 21.03: this also clears prefetched responses.
+def invalidateStudioAPICache(command: Optional[int] = None) -> None:
+	with _studioAPICacheLock:
+		if command is None:
+			_studioAPICache.clear()
+			_prefetchedResponses.clear()
+			return
+		for key in [key for key in _studioAPICache if key[1] == command]:
+			del _studioAPICache[key]
+		for key in [key for key in _prefetchedResponses if key[1] == command]:
+			del _prefetchedResponses[key]
+
+
+# Return prefetched response for the given request, or None if not prefetched, expired,
+# or prefetched for a different Studio window.
+def _prefetchedResponse(arg: int, command: int) -> Optional[int]:
+	with _studioAPICacheLock:
+		prefetched = _prefetchedResponses.get((arg, command))
+	if prefetched is None or prefetched[1] < time.monotonic() or prefetched[2] != studioHandleGeneration:
+		return None
+	return prefetched[0]
+
+
+# Return cached response for the given request, or None if not cached or expired.
+# 21.03: prefetched responses are consulted first if asked.
+def _cachedResponse(arg: int, command: int, prefetched: bool = False) -> Optional[int]:
+	if prefetched:
+		val = _prefetchedResponse(arg, command)
+		if val is not None:
+			return val
+	with _studioAPICacheLock:
+		cached = _studioAPICache.get((arg, command))
+	if cached is None or cached[1] < time.monotonic():
+		return None
+	return cached[0]
+
+
+# Cache the response if responses for this command can be cached.
+def _cacheResponse(arg: int, command: int, val: int) -> None:
+	ttl = studioAPICacheTTL.get(command)
+	if ttl:
+		with _studioAPICacheLock:
+			_studioAPICache[(arg, command)] = (val, time.monotonic() + ttl)
+
+
+# Return contents of the given columns of a Playlist Viewer row, calling read function
+# (with a list of column indices) for columns which are not cached or have expired.
+# The cache is cleared when Studio handle generation changes.
+def cachedColumnContents(
+		listHandle: int, row: int, columns: list[int], read: Callable[[list[int]], list[Optional[str]]]
+) -> list[Optional[str]]:
+	global _columnContentCacheGeneration
+	if _columnContentCacheGeneration != studioHandleGeneration:
+		_columnContentCache.clear()
+		_columnContentCacheGeneration = studioHandleGeneration
+	now = time.monotonic()
+	contents: list[Optional[str]] = []
+	missing: list[int] = []
+	for column in columns:
+		key = (listHandle, row, column)
+		cached = _columnContentCache.get(key)
+		if cached is not None and cached[1] >= now:
+			_columnContentCache.move_to_end(key)
+			columnContentCacheStats["hits"] += 1
+			contents.append(cached[0])
+		else:
+			columnContentCacheStats["misses"] += 1
+			contents.append(None)
+			missing.append(column)
+	if not missing:
+		return contents
+	missingContents = dict(zip(missing, read(missing)))
+	for pos, column in enumerate(columns):
+		if column in missingContents:
+			contents[pos] = missingContents[column]
+	for column, content in missingContents.items():
+		key = (listHandle, row, column)
+		_columnContentCache[key] = (content, now + columnContentCacheTTL)
+		_columnContentCache.move_to_end(key)
+	while len(_columnContentCache) > columnContentCacheSize:
+		_columnContentCache.popitem(last=False)
+		columnContentCacheStats["evictions"] += 1
+	return contents
+
+
+# Return content of the given column of a Playlist Viewer row, calling read function (with column index)
+# if the content is not cached or has expired.
+def cachedColumnContent(
+		listHandle: int, row: int, column: int, read: Callable[[int], Optional[str]]
+) -> Optional[str]:
+	return cachedColumnContents(listHandle, row, [column], lambda columns: [read(columns[0])])[0]
+
+
+# Clear cached column contents, typically when playlist is modified.
+def invalidateColumnContentCache() -> None:
+	_columnContentCache.clear()
+
+
+# Make sure cached column contents still belong to the track at the given row
+# by comparing freshly read content of a stable column (such as Filename) with the cached one.
+# Because rows are identified by position, tracks moved or deleted without changing playlist modified status
+# would otherwise be presented using contents of the track which used to be at this row.
+def validateColumnContentRow(listHandle: int, row: int, column: int, content: Optional[str]) -> None:
+	cached = _columnContentCache.get((listHandle, row, column))
+	if cached is not None and cached[0] != content:
+		for key in [key for key in _columnContentCache if key[:2] == (listHandle, row)]:
+			del _columnContentCache[key]
+	_columnContentCache[(listHandle, row, column)] = (content, time.monotonic() + columnContentCacheTTL)
+	_columnContentCache.move_to_end((listHandle, row, column))
+
+
+class _StudioAPICommandStats:
+	"""Call count, failures (None results and errors) and latency histogram for a Studio API command."""
+
+	__slots__ = ("calls", "noResults", "errors", "totalTime", "histogram")
+
+	def __init__(self) -> None:
+		self.calls = 0
+		self.noResults = 0
+		self.errors = 0
+		self.totalTime = 0.0
+		self.histogram = [0] * (len(studioAPILatencyBuckets) + 1)
+
+
+# Record a Studio API call (latency in seconds) if statistics are enabled.
+def recordStudioAPICall(command: int, latency: float, result: Optional[int], error: bool = False) -> None:
+	if not studioAPIStatsEnabled:
+		return
+	bucket = bisect.bisect_left(studioAPILatencyBuckets, latency * 1000)
+	with _studioAPIStatsLock:
+		stats = _studioAPIStats.get(command)
+		if stats is None:
+			if len(_studioAPIStats) >= _studioAPIStatsMaxCommands:
+				return
+			stats = _studioAPIStats[command] = _StudioAPICommandStats()
+		stats.calls += 1
+		if error:
+			stats.errors += 1
+		elif result is None:
+			stats.noResults += 1
+		stats.totalTime += latency
+		stats.histogram[bucket] += 1
+
+
+# Return Studio API statistics as text, one line per command.
+def studioAPIStatsReport() -> str:
+	bucketLabels = [f"<={bound}ms" for bound in studioAPILatencyBuckets] + [f">{studioAPILatencyBuckets[-1]}ms"]
+	report = []
+	with _studioAPIStatsLock:
+		for command, stats in sorted(_studioAPIStats.items()):
+			histogram = ", ".join(
+				f"{label}: {count}" for label, count in zip(bucketLabels, stats.histogram) if count
+			)
+			report.append(
+				f"Command {command}: {stats.calls} calls, {stats.noResults} None, {stats.errors} errors, "
+				f"average {stats.totalTime / stats.calls * 1000:.2f}ms ({histogram})"
+			)
+	coalesced = sum(studioAPICoalescedRequests.values())
+	report.append(f"Requests saved by waiting for identical requests in flight: {coalesced}")
+	return "\n".join(report)
+
+
+# Write Studio API statistics to the log or show them in a browseable message.
+def dumpStudioAPIStats(browseable: bool = False) -> None:
+	report = studioAPIStatsReport()
+	if browseable:
+		import ui
+		# Translators: title of a window showing Studio API statistics.
+		ui.browseableMessage(report, title=_("Studio API statistics"))
+	else:
+		log.info(f"SPL: Studio API statistics:\n{report}")
+
+
+# Send a Studio API request (WM_USER message) to the given window with a time-out.
+# Returns None if the request times out or the window is gone.
+def _sendMessage(hwnd: int, arg: int, command: int) -> Optional[int]:
+	start = time.perf_counter()
+	try:
+		val = _transport.sendMessage(hwnd, arg, command, studioAPITimeout)
+	except Exception:
+		recordStudioAPICall(command, time.perf_counter() - start, None, error=True)
+		raise
+	recordStudioAPICall(command, time.perf_counter() - start, val)
+	if val is None:
+		log.debug(f"SPL: Studio API request wParem {arg}, lParem {command} failed or timed out")
+	return val
+
+
+# Replace Studio API transport, returning the previous one.
+# Studio handle and responses obtained through the previous transport are forgotten.
+def setStudioAPITransport(transport: spltransport.StudioAPITransport) -> spltransport.StudioAPITransport:
+	global _transport
+	previousTransport, _transport = _transport, transport
+	resetStudioHandle()
+	invalidateStudioAPICache()
+	log.debug(f"SPL: Studio API transport is {transport.__class__.__name__}")
+	return previousTransport
+
+
+class _InFlightRequest:
+	"""A Studio API request sent by a thread and waited on by others asking for the same thing."""
+
+	__slots__ = ("done", "result")
+
+	def __init__(self) -> None:
+		self.done = threading.Event()
+		self.result: Optional[int] = None
+
+
+# Send a Studio API request unless an identical request is already in flight,
+# in which case wait for its result.
+def _singleFlightSendMessage(hwnd: int, arg: int, command: int) -> Optional[int]:
+	if command not in studioAPISingleFlightCommands:
+		return _sendMessage(hwnd, arg, command)
+	key = (arg, command)
+	with _inFlightLock:
+		request = _inFlightRequests.get(key)
+		isSender = request is None
+		if isSender:
+			request = _inFlightRequests[key] = _InFlightRequest()
+		else:
+			studioAPICoalescedRequests[key] = studioAPICoalescedRequests.get(key, 0) + 1
+	if not isSender:
+		log.debug(f"SPL: waiting for Studio API request in flight, wParem {arg}, lParem {command}")
+		# Time-out in case the sender is stuck, with None meaning the request timed out.
+		if not request.done.wait(studioAPITimeout / 1000 + 1):
+			return None
+		return request.result
+	try:
+		request.result = _sendMessage(hwnd, arg, command)
+	finally:
+		with _inFlightLock:
+			del _inFlightRequests[key]
+		request.done.set()
+	return request.result
 
 
 # Check if Studio itself is running.
@@ -21,13 +486,12 @@ _SPLWin: Optional[int] = None
 # 19.02: some checks will need to omit message output.
 def studioIsRunning(justChecking: bool = False) -> bool:
 	# Keep the boolean flag handy because of message output.
-	isStudioAlive = (
-		(_SPLWin is not None and _SPLWin == user32.FindWindowW("SPLStudio", None))
-		or (_SPLWin is None and user32.FindWindowW("SPLStudio", None) != 0)
-	)
+	# 21.03: consult Studio handle cache.
+	isStudioAlive = studioHandle() != 0
 	if not isStudioAlive:
 		log.debug("SPL: Studio is not alive")
 		if not justChecking:
+			import ui
 			# Translators: A message informing users that Studio is not running so certain commands will not work.
 			ui.message(_("Studio main window not found"))
 	return isStudioAlive
@@ -35,26 +499,158 @@ def studioIsRunning(justChecking: bool = False) -> bool:
 
 # Use SPL Studio API to obtain needed values.
 # A thin wrapper around user32.SendMessage function with Studio handle and WM_USER supplied.
+# 21.03: requests are delivered by Studio API transport.
 # #45 (18.02): returns whatever result SendMessage function says.
 # If NVDA is in debug mode, print arg, command and other values.
 # 18.05: strengthen this by checking for the handle once more.
 # #92 (19.03): SendMessage function returns something from anything (including from dead window handles),
 # so really make sure Studio window handle is alive.
-def studioAPI(arg: int, command: int) -> Optional[int]:
-	if not studioIsRunning(justChecking=True):
+# 21.03: SPL Assistant layer commands can ask for responses prefetched when entering the layer.
+def studioAPI(arg: int, command: int, prefetched: bool = False) -> Optional[int]:
+	hwnd = studioHandle()
+	if not hwnd:
 		return None
+	# 21.03: return cached response if possible.
+	val = _cachedResponse(arg, command, prefetched=prefetched)
+	if val is not None:
+		log.debug(f"SPL: Studio API cached result for wParem {arg}, lParem {command} is {val}")
+		return val
 	log.debug(f"SPL: Studio API wParem is {arg}, lParem is {command}")
-	val = sendMessage(_SPLWin, 1024, arg, command)
+	# 21.03: send the request with a time-out, with time-outs resulting in None.
+	# 21.03: or wait for the identical request in flight.
+	val = _singleFlightSendMessage(hwnd, arg, command)
 	log.debug(f"SPL: Studio API result is {val}")
 	# 21.03/20.09.6-LTS: SendMessage function might be stuck while Studio exits, resulting in NULL window handle.
-	if not user32.FindWindowW("SPLStudio", None):
+	if not _isStudioWindow(hwnd):
 		val = None
 		log.debug("Studio window is gone, Studio API result is None")
+	elif val is not None:
+		_cacheResponse(arg, command, val)
 	return val
 
 
+# Call Studio API several times in a row, checking Studio window handle once before and once after the batch.
+# Requests are (arg, command) pairs, and results are returned in request order.
+# 21.03: if Studio window is gone before or during the batch, the whole batch result is None
+# so callers do not have to check each result for None (Studio gone).
+def studioAPIBatch(requests: list[tuple[int, int]], prefetched: bool = False) -> Optional[list[int]]:
+	hwnd = studioHandle()
+	if not hwnd:
+		log.debug("SPL: Studio is not alive, Studio API batch not performed")
+		return None
+	log.debug(f"SPL: Studio API batch requests are {requests}")
+	# 21.03: only send requests whose responses are not cached.
+	results = [_cachedResponse(arg, command, prefetched=prefetched) for arg, command in requests]
+	sent = [pos for pos, val in enumerate(results) if val is None]
+	for pos in sent:
+		results[pos] = _singleFlightSendMessage(hwnd, *requests[pos])
+		# Do not wait for the rest if a request times out as Studio is busy or is exiting.
+		if results[pos] is None:
+			log.debug("Studio API request timed out, Studio API batch result is None")
+			return None
+	log.debug(f"SPL: Studio API batch results are {results}")
+	if not _isStudioWindow(hwnd):
+		log.debug("Studio window is gone, Studio API batch result is None")
+		return None
+	for pos in sent:
+		_cacheResponse(*requests[pos], results[pos])
+	return results
+
+
+# Asynchronous Studio API.
+# 21.03: Studio API requests are sent from a dedicated worker thread,
+# and results (None if Studio is gone or the request timed out) are returned as futures.
+# If a callback is given, it is called from NVDA's main thread with the result,
+# which allows scripts to announce results without blocking speech while Studio is busy.
+
+
+def _getStudioAPIWorker() -> ThreadPoolExecutor:
+	global _studioAPIWorker, _studioAPIWorkerRecord
+	if _studioAPIWorker is None:
+		_studioAPIWorker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="SPLStudioAPI")
+		# 21.03: record the worker in add-on thread inventory.
+		_studioAPIWorkerRecord = splscheduler.registerTimer("Studio API worker", owner="splstudio", kind="thread")
+	return _studioAPIWorker
+
+
+# Run func from Studio API worker thread, recording wakeups and CPU time.
+def _submitToStudioAPIWorker(func: Callable[..., Any], *args: Any) -> Future:
+	worker = _getStudioAPIWorker()
+	return worker.submit(_studioAPIWorkerRecord.wakeup, func, *args)
+
+
+def _submitStudioAPIRequest(
+		func: Callable[..., Any], request: tuple[Any, ...], callback: Optional[Callable[[Any], None]]
+) -> Future:
+	future = _submitToStudioAPIWorker(func, *request)
+	if callback is not None:
+		import wx
+
+		def _onDone(future: Future) -> None:
+			try:
+				result = future.result()
+			except Exception:
+				log.debugWarning("SPL: Studio API worker request failed", exc_info=True)
+				result = None
+			wx.CallAfter(callback, result)
+		future.add_done_callback(_onDone)
+	return future
+
+
+def studioAPIAsync(
+		arg: int, command: int, callback: Optional[Callable[[Optional[int]], None]] = None
+) -> Future:
+	return _submitStudioAPIRequest(studioAPI, (arg, command), callback)
+
+
+def studioAPIBatchAsync(
+		requests: list[tuple[int, int]], callback: Optional[Callable[[Optional[list[int]]], None]] = None
+) -> Future:
+	return _submitStudioAPIRequest(studioAPIBatch, (requests,), callback)
+
+
+# Obtain responses for the given requests from Studio API worker and keep them for a short time
+# (until they expire or prefetched responses are cleared),
+# so follow-up requests asking for prefetched responses can be answered from memory.
+# Until the prefetch is done, identical requests wait for the prefetch instead of asking Studio again.
+def prefetchStudioAPI(requests: list[tuple[int, int]]) -> Future:
+	generation = _prefetchGeneration
+
+	def _prefetch() -> Optional[list[int]]:
+		handleGeneration = studioHandleGeneration
+		results = studioAPIBatch(requests)
+		with _studioAPICacheLock:
+			# Do not keep responses if prefetched responses were cleared or Studio window changed in the meantime.
+			if (
+				results is not None and generation == _prefetchGeneration
+				and handleGeneration == studioHandleGeneration
+			):
+				expiration = time.monotonic() + prefetchedResponseTTL
+				for request, result in zip(requests, results):
+					_prefetchedResponses[request] = (result, expiration, handleGeneration)
+		return results
+	return _submitToStudioAPIWorker(_prefetch)
+
+
+def clearPrefetchedStudioAPIResponses() -> None:
+	global _prefetchGeneration
+	with _studioAPICacheLock:
+		_prefetchGeneration += 1
+		_prefetchedResponses.clear()
+
+
+# Stop Studio API worker thread, typically when Studio app module terminates.
+# Pending requests are abandoned rather than waited for.
+def terminateStudioAPIWorker() -> None:
+	global _studioAPIWorker
+	if _studioAPIWorker is not None:
+		_studioAPIWorker.shutdown(wait=False)
+		_studioAPIWorker = None
+		_studioAPIWorkerRecord.stop()
+
+
 # Select a track upon request.
 def selectTrack(trackIndex: int) -> None:
-	studioAPI(-1, 121)
 	log.debug(f"SPL: selecting track index {trackIndex}")
-	studioAPI(trackIndex, 121)
+	# 21.03: deselect all tracks and select the desired track in one batch.
+	studioAPIBatch([(-1, SPLSelectTrack), (trackIndex, SPLSelectTrack)])
@@ -0,0 +1,95 @@
+# SPL track columns
+# An app module and global plugin package for NVDA
+# Copyright 2021 Joseph Lee, released under GPL.
+# Column headers and header to column index maps for track items in Studio, Creator and Track Tool.
+# This module provides services for other modules, not the other way around.
+
+# 21.03: track items look up column indices many times (often inside loops over columns),
+# so rather than building a tuple of column headers and searching it every time,
+# header to index maps are built once for each product version and shared by Studio, Creator and Track Tool.
+# Maps are read-only so callers cannot change them by accident.
+
+# #155 (21.03): remove __future__ import when NVDA runs under Python 3.10.
+from __future__ import annotations
+from typing import Callable, Mapping, Optional
+from types import MappingProxyType
+
+
+# Return a tuple of Studio Playlist Viewer column headers
+# (status column followed by default column announcement order).
+# #142 (20.09): status column (0) is the name of the track as reported by MSAA.
+# Studio columns do not depend on Studio version, but the version is accepted (and ignored)
+# so column headers for all products can be obtained the same way.
+def studioColumns(studioVersion: str = "") -> tuple[str, ...]:
+	from . import splconfig
+	return ("Status",) + tuple(splconfig._SPLDefaults["ColumnAnnouncement"]["ColumnOrder"])
+
+
+# Return a tuple of Creator column headers.
+def creatorColumns(creatorVersion: str) -> tuple[str, ...]:
+	# Nine columns per line for each tuple.
+	if creatorVersion >= "5.31":
+		return (
+			"Artist", "Title", "Position", "Cue", "Intro", "Outro", "Segue", "Duration", "Last Scheduled",
+			"7 Days", "Date Restriction", "Year", "Album", "Genre", "Mood", "Energy", "Tempo", "BPM",
+			"Gender", "Rating", "File Created", "Filename", "Client", "Other", "Intro Link", "Outro Link", "Language"
+		)
+	else:
+		return (
+			"Artist", "Title", "Position", "Cue", "Intro", "Outro", "Segue", "Duration", "Last Scheduled",
+			"7 Days", "Date Restriction", "Year", "Album", "Genre", "Mood", "Energy", "Tempo", "BPM",
+			"Gender", "Rating", "File Created", "Filename", "Client", "Other", "Intro Link", "Outro Link"
+		)
+
+
+# Return a tuple of Track Tool column headers.
+def trackToolColumns(ttVersion: str) -> tuple[str, ...]:
+	# Nine columns per line for each tuple.
+	if ttVersion < "5.31":
+		return (
+			"Artist", "Title", "Duration", "Cue", "Overlap", "Intro", "Outro", "Segue", "Hook Start",
+			"Hook Len", "Year", "Album", "CD Code", "URL 1", "URL 2", "Genre", "Mood", "Energy",
+			"Tempo", "BPM", "Gender", "Rating", "Filename", "Client", "Other", "Intro Link", "Outro Link",
+			"ReplayGain", "Record Label", "ISRC"
+		)
+	else:
+		return (
+			"Artist", "Title", "Duration", "Cue", "Overlap", "Intro", "Outro", "Segue", "Hook Start",
+			"Hook Len", "Year", "Album", "CD Code", "URL 1", "URL 2", "Genre", "Mood", "Energy",
+			"Tempo", "BPM", "Gender", "Rating", "Filename", "Client", "Other", "Intro Link", "Outro Link",
+			"ReplayGain", "Record Label", "ISRC", "Language"
+		)
+
+
+# Column headers for each product, given product version.
+_productColumns: dict[str, Callable[[str], tuple[str, ...]]] = {
+	"studio": studioColumns,
+	"creator": creatorColumns,
+	"tracktool": trackToolColumns,
+}
+# Header to index maps keyed by (product, version).
+_headerMaps: dict[tuple[str, str], Mapping[str, int]] = {}
+
+
+# Return header to column index map for the given product (studio, creator, tracktool) and version.
+# Studio columns do not depend on Studio version.
+def headerMap(product: str, version: str = "") -> Mapping[str, int]:
+	key = (product, version if product != "studio" else "")
+	try:
+		return _headerMaps[key]
+	except KeyError:
+		pass
+	headers = _productColumns[product](version)
+	headerIndices = {}
+	# Just like tuple index method, the first column with the given header wins.
+	for index, header in enumerate(headers):
+		headerIndices.setdefault(header, index)
+	# Dictionary assignment is atomic, so worst case is building the same map twice.
+	_headerMaps[key] = MappingProxyType(headerIndices)
+	return _headerMaps[key]
+
+
+# Return column index for the given header, or None if the product does not have such a column.
+def columnIndex(product: str, version: str, header: str) -> Optional[int]:
+	return headerMap(product, version).get(header)
+
@@ -732,6 +732,8 @@ def initialize() -> None:
 			trackComments = pickle.load(f)
 	except (IOError, EOFError, pickle.UnpicklingError):
 		pass
+	# 21.03: let others build things from settings (status bar dispatch table, for example).
+	splactions.SPLActionSettingsLoaded.notify()
 	if len(_configLoadStatus):
 		messages = []
 		# 6.1: Display just the error message if the only corrupt profile is the normal profile.
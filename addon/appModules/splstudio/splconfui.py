@@ -1454,6 +1454,13 @@ class SPLConfigDialog(gui.MultiCategorySettingsDialog):
 		super(SPLConfigDialog, self).onOk(evt)
 		global _configDialogOpened
 		_configDialogOpened = False
+		# 21.03: let others rebuild things built from settings.
+		splactions.SPLActionSettingsChanged.notify()
+
+	def onApply(self, evt):
+		super(SPLConfigDialog, self).onApply(evt)
+		# 21.03: settings were saved without closing the dialog, so let others rebuild things built from settings.
+		splactions.SPLActionSettingsChanged.notify()
 
 	def onCancel(self, evt):
 		super(SPLConfigDialog, self).onCancel(evt)
@@ -6,23 +6,26 @@
 
 # #155 (21.03): remove __future__ import when NVDA runs under Python 3.10.
 from __future__ import annotations
-from typing import Any, Optional
+from typing import Any, Callable, Iterator, Optional
 import weakref
 import os
-import threading
+import time
 from _csv import reader  # For cart explorer.
 import gui
 import wx
 import nvwave
-import queueHandler
+import tones
+import inputCore
+from winUser import user32
 import speech
 import ui
 from logHandler import log
 import addonHandler
 addonHandler.initTranslation()
-from winUser import user32
 from . import splbase
 from . import splactions
+from . import splscheduler
+from . import splannouncer
 from ..skipTranslation import translate
 
 
@@ -119,7 +122,7 @@ class SPLFindDialog(wx.Dialog):
 		global _findDialogOpened
 		text = self.findEntry.Value
 		# Studio, are you alive?
-		if user32.FindWindowW("SPLStudio", None) and text:
+		if splbase.studioIsRunning(justChecking=True) and text:
 			appMod = self.obj.appModule
 			# 21.03/20.09.6-LTS: search columns should not be None - list of integers expected.
 			column = [self.columnHeaders.Selection + 1] if self.columnSearch else []
@@ -235,14 +238,21 @@ class SPLTimeRangeDialog(wx.Dialog):
 			return
 		self.Destroy()
 		global _findDialogOpened
-		if user32.FindWindowW("SPLStudio", None):
-			obj = self.obj.next
+		if splbase.studioIsRunning(justChecking=True):
 			# Manually locate tracks here.
-			while obj is not None:
-				filename = splbase.studioAPI(obj.IAccessibleChildID - 1, 211)
-				if minDuration <= splbase.studioAPI(filename, 30) <= maxDuration:
-					break
-				obj = obj.next
+			# 21.03: the walk can be cancelled by pressing Escape.
+			track = None
+			try:
+				for obj in playlistWalk(self.obj.next):
+					filename = splbase.studioAPI(obj.IAccessibleChildID - 1, splbase.SPLTrackFilename)
+					if minDuration <= splbase.studioAPI(filename, splbase.SPLFileDuration) <= maxDuration:
+						track = obj
+						break
+			except PlaylistWalkCancelled as e:
+				_findDialogOpened = False
+				playlistWalkCancelledMessage(e.rows)
+				return
+			obj = track
 			if obj is not None:
 				# Set focus only once, as do action method on tracks will set focus twice.
 				obj.setFocus()
@@ -397,12 +407,13 @@ def cartExplorerRefresh(studioTitle: str, currentCarts: dict[str, Any]) -> dict[
 # Gather streaming flags into a list.
 # 18.04: raise runtime error if list is nothing
 # (thankfully the splbase's StudioAPI will return None if Studio handle is not found).
-def metadataList() -> list[Optional[int]]:
-	metadata = [splbase.studioAPI(pos, 36) for pos in range(5)]
-	# 21.03/20.09.6-LTS: make sure None is not included in metadata list,
+def metadataList() -> list[int]:
+	# 21.03: obtain all streaming flags in one batch.
+	metadata = splbase.studioAPIBatch([(pos, splbase.SPLMetadataStreaming) for pos in range(5)])
+	# 21.03/20.09.6-LTS: make sure None is not returned as metadata list,
 	# otherwise it results in no metadata data for streams.
-	# This could happen if Studio dies while retrieving metadata list with some items returning None.
-	if None in metadata:
+	# This could happen if Studio dies while retrieving metadata list.
+	if metadata is None:
 		raise RuntimeError("Studio handle not found, no metadata list to return")
 	return metadata
 
@@ -414,9 +425,10 @@ def metadataConnector(servers: Optional[list[bool]] = None) -> None:
 	if servers is None:
 		from . import splconfig
 		servers = splconfig.SPLConfig["MetadataStreaming"]["MetadataEnabled"]
-	for url in range(5):
-		dataLo = 0x00010000 if servers[url] else 0xffff0000
-		splbase.studioAPI(dataLo | url, 36)
+	# 21.03: set all streaming flags in one batch.
+	splbase.studioAPIBatch([
+		((0x00010000 if servers[url] else 0xffff0000) | url, splbase.SPLMetadataStreaming) for url in range(5)
+	])
 
 
 # Metadata status formatter.
@@ -463,7 +475,7 @@ def metadataStatus() -> str:
 
 
 # Handle a case where instant profile ssitch occurs twice within the switch time-out.
-_earlyMetadataAnnouncer: Optional[threading.Timer] = None
+_earlyMetadataAnnouncer: Optional[splscheduler.ScheduledJob] = None
 
 
 # Internal metadata status announcer.
@@ -474,7 +486,8 @@ _earlyMetadataAnnouncer: Optional[threading.Timer] = None
 def _metadataAnnouncerInternal(status: str, startup: bool = False) -> None:
 	if not startup:
 		speech.cancelSpeech()
-	queueHandler.queueFunction(queueHandler.eventQueue, ui.message, status)
+	# 21.03: announced via announcement broker, replacing pending metadata status announcement.
+	splannouncer.announce(status, category="metadataStatus")
 	nvwave.playWaveFile(os.path.join(os.path.dirname(__file__), "SPL_Metadata.wav"))
 	# #51 (18.03/15.14-LTS): close link to metadata announcer thread when finished.
 	global _earlyMetadataAnnouncer
@@ -486,10 +499,10 @@ def _earlyMetadataAnnouncerInternal(status: str, startup: bool = False) -> None:
 	if _earlyMetadataAnnouncer is not None:
 		_earlyMetadataAnnouncer.cancel()
 		_earlyMetadataAnnouncer = None
-	_earlyMetadataAnnouncer = threading.Timer(
-		2, _metadataAnnouncerInternal, args=[status], kwargs={"startup": startup}
+	# 21.03: run from the add-on scheduler instead of a dedicated timer thread.
+	_earlyMetadataAnnouncer = splscheduler.schedule(
+		2, _metadataAnnouncerInternal, status, startup=startup, name="metadataAnnouncer", owner="splstudio"
 	)
-	_earlyMetadataAnnouncer.start()
 
 
 # Delay the action handler if Studio handle is not found.
@@ -520,7 +533,7 @@ def metadata_actionProfileSwitched(configDialogActive: bool = False, settingsRes
 		# 18.04: ask the handle finder to return to this place if Studio handle isn't ready.
 		# This is typically the case when launching Studio
 		# and profile switch occurs while demo registration screen is up.
-		handle = user32.FindWindowW("SPLStudio", None)
+		handle = splbase.studioHandle()
 		if not handle:
 			_delayMetadataAction = True
 			return
@@ -537,6 +550,218 @@ def metadata_actionSettingsReset(factoryDefaults: bool = False) -> None:
 	metadata_actionProfileSwitched(settingsReset=True)
 
 
+# Library scan progress tracker
+# 21.03: fed with library scan count samples (from Studio API heartbeat),
+# estimates scan rate (items per second) and time remaining, and decides when to announce progress.
+# Rather than announcing every few samples, progress is announced based on time and items scanned.
+class LibraryScanTracker:
+
+	# Weight given to the latest rate sample (exponentially weighted moving average).
+	rateSmoothing = 0.3
+	# Announce progress every this many seconds, or sooner (but not before minimum interval is up)
+	# if many items were scanned since the last announcement.
+	announceInterval = 10.0
+	announceMinInterval = 3.0
+	announceItems = 1000
+	# Library item count from the last completed scan, used to estimate time remaining
+	# if the expected item count (library item count when the scan started) is not given.
+	lastTotal: Optional[int] = None
+
+	def __init__(self, expectedTotal: Optional[int] = None, clock: Callable[[], float] = time.monotonic) -> None:
+		self.clock = clock
+		self.expectedTotal = expectedTotal if expectedTotal is not None else LibraryScanTracker.lastTotal
+		self.started = clock()
+		self.count = 0
+		self.samples = 0
+		self.announcements = 0
+		# Items per second.
+		self.rate: Optional[float] = None
+		# First and last (time, scan count) samples.
+		# Monitoring can start in the middle of a scan, so the first sample is not necessarily zero items.
+		self._firstSample: Optional[tuple[float, int]] = None
+		self._lastSample: Optional[tuple[float, int]] = None
+		self._lastAnnouncement: tuple[float, int] = (self.started, 0)
+
+	# Record a scan count sample, returning True if progress should be announced.
+	def update(self, count: int) -> bool:
+		now = self.clock()
+		if self._lastSample is not None:
+			lastTime, lastCount = self._lastSample
+			elapsed = now - lastTime
+			if elapsed > 0 and count >= lastCount:
+				sampleRate = (count - lastCount) / elapsed
+				if self.rate is None:
+					self.rate = sampleRate
+				else:
+					self.rate = self.rateSmoothing * sampleRate + (1 - self.rateSmoothing) * self.rate
+		if self._firstSample is None:
+			self._firstSample = (now, count)
+		self._lastSample = (now, count)
+		self.count = count
+		self.samples += 1
+		lastAnnounced, lastAnnouncedCount = self._lastAnnouncement
+		sinceAnnouncement = now - lastAnnounced
+		if sinceAnnouncement >= self.announceInterval or (
+			sinceAnnouncement >= self.announceMinInterval and count - lastAnnouncedCount >= self.announceItems
+		):
+			self._lastAnnouncement = (now, count)
+			self.announcements += 1
+			return True
+		return False
+
+	# Estimated time remaining in seconds, or None if it cannot be estimated
+	# (rate unknown or the library is now bigger than before).
+	@property
+	def eta(self) -> Optional[float]:
+		if not self.rate or not self.expectedTotal or self.count >= self.expectedTotal:
+			return None
+		return (self.expectedTotal - self.count) / self.rate
+
+	# Library scan is done, returning duration (seconds), item count, items scanned while monitoring
+	# and average rate (items per second).
+	# Average rate is items scanned between the first and the last samples divided by time between them,
+	# as the library item count includes items scanned before monitoring began.
+	def finish(self, total: Optional[int]) -> dict[str, Any]:
+		duration = self.clock() - self.started
+		if total is None:
+			total = self.count
+		else:
+			LibraryScanTracker.lastTotal = total
+		scanned = 0
+		averageRate = None
+		if self._firstSample is not None and self._lastSample is not None:
+			firstTime, firstCount = self._firstSample
+			lastTime, lastCount = self._lastSample
+			scanned = max(lastCount - firstCount, 0)
+			if lastTime > firstTime:
+				averageRate = scanned / (lastTime - firstTime)
+		summary = {
+			"duration": duration, "items": total, "scanned": scanned, "averageRate": averageRate,
+			"samples": self.samples, "announcements": self.announcements
+		}
+		log.debug(f"SPL: library scan summary: {summary}")
+		return summary
+
+
+# Playlist walks
+# 21.03: track finder, place marker, time range finder, playlist duration, snapshots, and transcripts
+# walk the playlist one track at a time from NVDA's main thread, which can take a while for large playlists.
+# A walk token is checked for each track, and every few tracks, it checks if the walk should stop
+# (Escape was pressed, another add-on script is about to run, or the walk was cancelled from elsewhere)
+# and reports number of tracks walked so far.
+# Because the main thread is busy while walking, Escape and gestures for add-on scripts
+# (Studio app module and SPL Controller) are caught when NVDA decides to execute them
+# (from the keyboard hook), so the new script runs once the walk stops.
+# If the gesture decider is not available, only Escape is caught by polling keyboard state.
+class PlaylistWalkCancelled(RuntimeError):
+
+	def __init__(self, rows: int) -> None:
+		super().__init__(f"playlist walk cancelled after {rows} tracks")
+		self.rows = rows
+
+
+class PlaylistWalkToken:
+
+	# Check for Escape key and report progress every this many tracks.
+	checkInterval = 50
+
+	def __init__(self, progress: Optional[Callable[[int], None]] = None, cancelOnEscape: bool = True) -> None:
+		self.progress = progress
+		self.cancelOnEscape = cancelOnEscape
+		self.rows = 0
+		self.cancelled = False
+
+	def cancel(self) -> None:
+		self.cancelled = True
+
+	# Called for each track walked, raising PlaylistWalkCancelled if the walk should stop.
+	def check(self) -> None:
+		self.rows += 1
+		if not self.rows % self.checkInterval:
+			if self.cancelOnEscape and _escapeDecider is None and user32.GetAsyncKeyState(_VK_ESCAPE) & 0x8000:
+				self.cancelled = True
+			if not self.cancelled and self.progress is not None:
+				self.progress(self.rows)
+		if self.cancelled:
+			log.debug(f"SPL: playlist walk cancelled after {self.rows} tracks")
+			raise PlaylistWalkCancelled(self.rows)
+
+
+_VK_ESCAPE = 0x1B
+_activeWalks: list[PlaylistWalkToken] = []
+_escapeDecider: Optional[Any] = getattr(inputCore, "decide_executeGesture", None)
+
+
+# Packages whose scripts cancel playlist walks in progress (first two parts of script module names).
+_addonScriptPackages = {("appModules", "splstudio"), ("globalPlugins", "splUtils")}
+
+
+# Does the gesture run an add-on script?
+def _isAddonScript(gesture: Any) -> bool:
+	try:
+		script = gesture.script
+	except Exception:
+		return False
+	module = getattr(script, "__module__", None) or ""
+	return tuple(module.split(".")[:2]) in _addonScriptPackages
+
+
+# Called from keyboard hook when NVDA is about to execute a gesture.
+# 21.03: walks are cancelled by Escape and by gestures starting another add-on script.
+def _cancelWalksOnGesture(gesture: Any) -> bool:
+	if getattr(gesture, "mainKeyName", None) == "escape" or _isAddonScript(gesture):
+		cancelPlaylistWalks(escape=True)
+	# Gestures should still be processed as usual.
+	return True
+
+
+# Cancel playlist walks in progress, returning the number of walks cancelled.
+# If escape is True, only walks which can be cancelled by the broadcaster
+# (pressing Escape or starting another add-on script) are cancelled.
+def cancelPlaylistWalks(escape: bool = False) -> int:
+	walks = [walk for walk in list(_activeWalks) if not walk.cancelled and (not escape or walk.cancelOnEscape)]
+	for walk in walks:
+		walk.cancel()
+	return len(walks)
+
+
+# Play a short tone every few hundred tracks so broadcasters know a long walk is still going.
+playlistWalkProgressInterval = 500
+
+
+def playlistWalkProgress(rows: int) -> None:
+	if not rows % playlistWalkProgressInterval:
+		tones.beep(440, 20)
+
+
+def playlistWalkCancelledMessage(rows: int) -> None:
+	# Translators: presented when a playlist operation such as track finder is canceled.
+	ui.message(_("Canceled after {tracks} tracks").format(tracks=rows))
+
+
+# Yield tracks from obj up to (but not including) end, checking walk token for each track.
+# If no token is given, the walk can be cancelled by pressing Escape or starting another add-on script,
+# and progress tones are played.
+def playlistWalk(
+		obj: Any, end: Any = None, directionForward: bool = True, token: Optional[PlaylistWalkToken] = None
+) -> Iterator[Any]:
+	if token is None:
+		token = PlaylistWalkToken(progress=playlistWalkProgress)
+	nextTrack = "next" if directionForward else "previous"
+	_activeWalks.append(token)
+	if len(_activeWalks) == 1 and _escapeDecider is not None:
+		_escapeDecider.register(_cancelWalksOnGesture)
+	try:
+		while obj not in (None, end):
+			token.check()
+			yield obj
+			obj = getattr(obj, nextTrack)
+	finally:
+		_activeWalks.remove(token)
+		if not _activeWalks and _escapeDecider is not None:
+			_escapeDecider.unregister(_cancelWalksOnGesture)
+
+
 # Playlist transcripts processor
 # Takes a snapshot of the active playlist (a 2-D array) and transforms it into various formats.
 # To account for expansions, let a master function call different formatters based on output format.
@@ -596,7 +821,8 @@ def savePlaylistTranscriptsToFile(
 # Header will not be included if additional decorations will be done (mostly for HTML and others).
 # Prefix and suffix denote text to be added around entries (useful for various additional decoration rules).
 def playlist2msaa(
-		start: Any, end: Any, additionalDecorations: bool = False, prefix: str = "", suffix: str = ""
+		start: Any, end: Any, additionalDecorations: bool = False, prefix: str = "", suffix: str = "",
+		token: Optional[PlaylistWalkToken] = None
 ) -> list[str]:
 	playlistTranscripts = []
 	# Just pure text, ready for the clipboard or writing to a txt file.
@@ -607,7 +833,7 @@ def playlist2msaa(
 	obj = start
 	columnHeaders = columnPresentationOrder()
 	columnPos = [obj.indexOf(column) for column in columnHeaders]
-	while obj not in (None, end):
+	for obj in playlistWalk(start, end, token=token):
 		# Exclude status column, and no need to make this readable.
 		columnContents = obj._getColumnContents(columns=columnPos)
 		# Filter empty columns.
@@ -617,12 +843,13 @@ def playlist2msaa(
 			if content is not None:
 				filteredContent.append("{}: {}".format(columnHeaders[column], content))
 		playlistTranscripts.append("{0}{1}{2}".format(prefix, "; ".join(filteredContent), suffix))
-		obj = obj.next
 	return playlistTranscripts
 
 
-def playlist2txt(start: Any, end: Any, transcriptAction: int) -> None:
-	playlistTranscripts = playlist2msaa(start, end)
+def playlist2txt(
+		start: Any, end: Any, transcriptAction: int, token: Optional[PlaylistWalkToken] = None
+) -> None:
+	playlistTranscripts = playlist2msaa(start, end, token=token)
 	if transcriptAction == 0:
 		displayPlaylistTranscripts(playlistTranscripts)
 	elif transcriptAction == 1:
@@ -634,7 +861,9 @@ def playlist2txt(start: Any, end: Any, transcriptAction: int) -> None:
 SPLPlaylistTranscriptFormats.append(("txt", playlist2txt, "plain text with one line per entry"))
 
 
-def playlist2htmlTable(start: Any, end: Any, transcriptAction: int) -> None:
+def playlist2htmlTable(
+		start: Any, end: Any, transcriptAction: int, token: Optional[PlaylistWalkToken] = None
+) -> None:
 	if transcriptAction == 1:
 		playlistTranscripts = ["<html><head><title>Playlist Transcripts</title></head>"]
 		playlistTranscripts.append("<body>")
@@ -650,10 +879,9 @@ def playlist2htmlTable(start: Any, end: Any, transcriptAction: int) -> None:
 	)
 	obj = start
 	columnPos = [obj.indexOf(column) for column in columnHeaders]
-	while obj not in (None, end):
+	for obj in playlistWalk(start, end, token=token):
 		columnContents = obj._getColumnContents(columns=columnPos, readable=True)
 		playlistTranscripts.append("<tr><td>{trackContents}</tr>".format(trackContents="<td>".join(columnContents)))
-		obj = obj.next
 	playlistTranscripts.append("</table>")
 	if transcriptAction == 0:
 		displayPlaylistTranscripts(playlistTranscripts, HTMLDecoration=True)
@@ -665,7 +893,9 @@ def playlist2htmlTable(start: Any, end: Any, transcriptAction: int) -> None:
 SPLPlaylistTranscriptFormats.append(("htmltable", playlist2htmlTable, "Table in HTML format"))
 
 
-def playlist2htmlList(start: Any, end: Any, transcriptAction: int) -> None:
+def playlist2htmlList(
+		start: Any, end: Any, transcriptAction: int, token: Optional[PlaylistWalkToken] = None
+) -> None:
 	if transcriptAction == 1:
 		playlistTranscripts = ["<html><head><title>Playlist Transcripts</title></head>"]
 		playlistTranscripts.append("<body>")
@@ -673,7 +903,7 @@ def playlist2htmlList(start: Any, end: Any, transcriptAction: int) -> None:
 	else:
 		playlistTranscripts = ["<h1>Playlist Transcripts</h1>"]
 	playlistTranscripts.append("<p><ol>")
-	playlistTranscripts += playlist2msaa(start, end, additionalDecorations=True, prefix="<li>")
+	playlistTranscripts += playlist2msaa(start, end, additionalDecorations=True, prefix="<li>", token=token)
 	playlistTranscripts.append("</ol>")
 	if transcriptAction == 0:
 		displayPlaylistTranscripts(playlistTranscripts, HTMLDecoration=True)
@@ -685,16 +915,17 @@ def playlist2htmlList(start: Any, end: Any, transcriptAction: int) -> None:
 SPLPlaylistTranscriptFormats.append(("htmllist", playlist2htmlList, "Data list in HTML format"))
 
 
-def playlist2mdTable(start: Any, end: Any, transcriptAction: int) -> None:
+def playlist2mdTable(
+		start: Any, end: Any, transcriptAction: int, token: Optional[PlaylistWalkToken] = None
+) -> None:
 	playlistTranscripts = []
 	columnHeaders = columnPresentationOrder()
 	playlistTranscripts.append("| {headers} |\n".format(headers=" | ".join(columnHeaders)))
 	obj = start
 	columnPos = [obj.indexOf(column) for column in columnHeaders]
-	while obj not in (None, end):
+	for obj in playlistWalk(start, end, token=token):
 		columnContents = obj._getColumnContents(columns=columnPos, readable=True)
 		playlistTranscripts.append("| {trackContents} |\n".format(trackContents=" | ".join(columnContents)))
-		obj = obj.next
 	if transcriptAction == 0:
 		displayPlaylistTranscripts(playlistTranscripts)
 	elif transcriptAction == 1:
@@ -706,16 +937,17 @@ def playlist2mdTable(start: Any, end: Any, transcriptAction: int) -> None:
 SPLPlaylistTranscriptFormats.append(("mdtable", playlist2mdTable, "Table in Markdown format"))
 
 
-def playlist2csv(start: Any, end: Any, transcriptAction: int) -> None:
+def playlist2csv(
+		start: Any, end: Any, transcriptAction: int, token: Optional[PlaylistWalkToken] = None
+) -> None:
 	playlistTranscripts = []
 	columnHeaders = columnPresentationOrder()
 	playlistTranscripts.append("\"{0}\"\n".format("\",\"".join([col for col in columnHeaders])))
 	obj = start
 	columnPos = [obj.indexOf(column) for column in columnHeaders]
-	while obj not in (None, end):
+	for obj in playlistWalk(start, end, token=token):
 		columnContents = obj._getColumnContents(columns=columnPos, readable=True)
 		playlistTranscripts.append("\"{0}\"\n".format("\",\"".join([content for content in columnContents])))
-		obj = obj.next
 	if transcriptAction == 0:
 		displayPlaylistTranscripts(playlistTranscripts)
 	elif transcriptAction == 1:
@@ -726,6 +958,15 @@ def playlist2csv(start: Any, end: Any, transcriptAction: int) -> None:
 
 SPLPlaylistTranscriptFormats.append(("csv", playlist2csv, "Comma-separated values"))
 
+
+# Run a playlist transcript converter, announcing cancellation if the playlist walk is cancelled.
+def _transcribePlaylist(converter: Callable[..., None], start: Any, end: Any, transcriptAction: int) -> None:
+	try:
+		converter(start, end, transcriptAction)
+	except PlaylistWalkCancelled as e:
+		playlistWalkCancelledMessage(e.rows)
+
+
 # Playlist transcripts help desk
 _plTranscriptsDialogOpened = False
 
@@ -843,19 +1084,26 @@ class SPLPlaylistTranscriptsDialog(wx.Dialog):
 			start = self.obj
 		if transcriptRange == 3:
 			# Try to locate boundaries for current hour slot.
-			start = self.obj.appModule._trackLocator(
-				"Hour Marker", obj=self.obj, directionForward=False, columns=[self.obj.indexOf("Category")]
-			)
-			end = self.obj.appModule._trackLocator(
-				"Hour Marker", obj=self.obj, columns=[self.obj.indexOf("Category")]
-			)
-			# What if current track is indeed an hour marker?
-			if end == self.obj:
+			# 21.03: locating hour markers can be cancelled by pressing Escape.
+			try:
+				start = self.obj.appModule._trackLocator(
+					"Hour Marker", obj=self.obj, directionForward=False, columns=[self.obj.indexOf("Category")]
+				)
 				end = self.obj.appModule._trackLocator(
-					"Hour Marker", obj=self.obj.next, columns=[self.obj.indexOf("Category")]
+					"Hour Marker", obj=self.obj, columns=[self.obj.indexOf("Category")]
 				)
+				# What if current track is indeed an hour marker?
+				if end == self.obj:
+					end = self.obj.appModule._trackLocator(
+						"Hour Marker", obj=self.obj.next, columns=[self.obj.indexOf("Category")]
+					)
+			except PlaylistWalkCancelled as e:
+				self.Destroy()
+				_plTranscriptsDialogOpened = False
+				playlistWalkCancelledMessage(e.rows)
+				return
 		wx.CallLater(
-			200, SPLPlaylistTranscriptFormats[self.transcriptFormat.Selection][1],
+			200, _transcribePlaylist, SPLPlaylistTranscriptFormats[self.transcriptFormat.Selection][1],
 			start, end, self.transcriptAction.Selection
 		)
 		self.Destroy()
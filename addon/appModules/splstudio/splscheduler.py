@@ -0,0 +1,394 @@
+# SPL Studio scheduler
+# An app module and global plugin package for NVDA
+# Copyright 2021 Joseph Lee, released under GPL.
+# Runs delayed, repeating and long-running jobs for Studio app module, encoders and support modules
+# from one scheduler thread instead of a thread or a timer per job.
+# This module provides services for other modules, not the other way around.
+
+# Jobs are kept in a heap ordered by due time.
+# Long-running jobs (tasks) are generators which yield the number of seconds to wait before resuming them,
+# and returning from the generator finishes the task.
+# Jobs which must interact with GUI can be run from NVDA's main thread instead of the scheduler thread.
+# Each job has an owner so modules can cancel all of their jobs when terminating.
+# The scheduler thread exits when there are no more jobs and is recreated when a job is scheduled.
+# Long-running pollers which may block (cross-process calls, for example) can run their tasks
+# on dedicated threads so they do not hold up other jobs.
+
+# 21.03: this module also keeps an inventory of add-on jobs, timers and threads.
+# Scheduled jobs are recorded automatically, and timers and threads not run by the scheduler
+# (Studio API heartbeat and worker, for example) are registered by their owners.
+# Each record has an owner, start time, CPU time and wakeup count so leaks and runaway pollers can be found.
+
+# #155 (21.03): remove __future__ import when NVDA runs under Python 3.10.
+from __future__ import annotations
+from typing import Any, Callable, Generator, Optional
+import heapq
+import itertools
+import threading
+import time
+# 21.03: wx is imported where needed so scheduler (and base services) can run without NVDA's GUI.
+from logHandler import log
+
+
+class ScheduledJob:
+	"""A handle to a scheduled job, used to cancel or inspect it."""
+
+	def __init__(
+			self, func: Optional[Callable[..., Any]], args: tuple[Any, ...], kwargs: dict[str, Any],
+			name: str, owner: Optional[str], interval: Optional[float] = None, mainThread: bool = False,
+			task: Optional[Generator[float, None, None]] = None
+	) -> None:
+		self.func = func
+		self.args = args
+		self.kwargs = kwargs
+		self.name = name
+		self.owner = owner
+		self.interval = interval
+		self.mainThread = mainThread
+		self.task = task
+		self.due = 0.0
+		self.runs = 0
+		self.cancelled = False
+		self.finished = False
+		# Inventory information.
+		self.kind = "task" if task is not None else "job"
+		self.started = time.time()
+		self.cpuTime = 0.0
+		# Set when a task run from a dedicated thread should wake up (cancelled, for example).
+		self._wakeup: Optional[threading.Event] = None
+		# The dedicated thread running this task, if any.
+		self._thread: Optional[threading.Thread] = None
+		_register(self)
+
+	# Is the job still scheduled (or running)?
+	# A task run from a dedicated thread is active until its thread exits, even if cancelled,
+	# as the thread might be stuck (in a cross-process call, for example).
+	@property
+	def active(self) -> bool:
+		if self._thread is not None and self._thread.is_alive():
+			return True
+		return not self.cancelled and not self.finished
+
+	def cancel(self) -> None:
+		if not self.cancelled and not self.finished:
+			self.cancelled = True
+			if self._wakeup is not None:
+				self._wakeup.set()
+			else:
+				_removeCancelledJobs()
+				# A job being run will be retired by the scheduler thread once it is done.
+				if _runningJob is not self:
+					_retire(self)
+
+	# Wakeups (for inventory purposes).
+	@property
+	def wakeups(self) -> int:
+		return self.runs
+
+	# Run the job once, returning the delay until the next run or None if the job is done.
+	def _run(self) -> Optional[float]:
+		if self.cancelled:
+			return None
+		self.runs += 1
+		if self.task is not None:
+			start = time.thread_time()
+			try:
+				return next(self.task)
+			except StopIteration:
+				return None
+			finally:
+				self.cpuTime += time.thread_time() - start
+		if self.mainThread:
+			import wx
+			wx.CallAfter(self._callFunc)
+		else:
+			self._callFunc()
+		return self.interval
+
+	def _callFunc(self) -> None:
+		# Job might have been cancelled while waiting for main thread.
+		if self.cancelled:
+			return
+		start = time.thread_time()
+		try:
+			self.func(*self.args, **self.kwargs)
+		except Exception:
+			log.error(f"SPL: scheduled job {self.name} failed", exc_info=True)
+		finally:
+			self.cpuTime += time.thread_time() - start
+
+	def __repr__(self) -> str:
+		return (
+			f"<ScheduledJob {self.name} owner={self.owner} due in {self.due - time.monotonic():.3f}s "
+			f"runs={self.runs} interval={self.interval} mainThread={self.mainThread}>"
+		)
+
+
+class InventoryRecord:
+	"""Inventory record for a timer or thread not run by the scheduler.
+	Owners call wakeup (or wrap their callbacks with measure) whenever the timer or thread does some work,
+	and stop when they stop the timer or thread.
+	"""
+
+	def __init__(self, name: str, owner: Optional[str], kind: str = "timer") -> None:
+		self.name = name
+		self.owner = owner
+		self.kind = kind
+		self.started = time.time()
+		self.cpuTime = 0.0
+		self.wakeups = 0
+		self.stopped = False
+		_register(self)
+
+	@property
+	def active(self) -> bool:
+		return not self.stopped
+
+	# Call func, recording a wakeup and CPU time used by it.
+	def wakeup(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+		start = time.thread_time()
+		try:
+			return func(*args, **kwargs)
+		finally:
+			self.wakeups += 1
+			self.cpuTime += time.thread_time() - start
+
+	# Return a function which calls func via wakeup method.
+	def measure(self, func: Callable[..., Any]) -> Callable[..., Any]:
+		def _measured(*args: Any, **kwargs: Any) -> Any:
+			return self.wakeup(func, *args, **kwargs)
+		return _measured
+
+	def stop(self) -> None:
+		self.stopped = True
+		_retire(self)
+
+
+# Inventory of jobs, timers and threads, keyed by record ID.
+# Records are removed when they finish, are cancelled or stopped,
+# with their numbers added to retired totals for each owner (records, CPU time, wakeups).
+_inventory: dict[int, Any] = {}
+_inventoryLock = threading.Lock()
+_retiredRecords: dict[Optional[str], list[Any]] = {}
+
+
+def _register(record: Any) -> None:
+	with _inventoryLock:
+		_inventory[id(record)] = record
+
+
+# Remove the record from the inventory (if not removed already), adding its numbers to retired totals.
+# Must be called with inventory lock held.
+def _retireLocked(record: Any) -> None:
+	if _inventory.get(id(record)) is not record:
+		return
+	del _inventory[id(record)]
+	retired = _retiredRecords.setdefault(record.owner, [0, 0.0, 0])
+	retired[0] += 1
+	retired[1] += record.cpuTime
+	retired[2] += record.wakeups
+
+
+def _retire(record: Any) -> None:
+	with _inventoryLock:
+		_retireLocked(record)
+
+
+# Register a timer or thread not run by the scheduler, returning its inventory record.
+def registerTimer(name: str, owner: Optional[str] = None, kind: str = "timer") -> InventoryRecord:
+	return InventoryRecord(name, owner, kind=kind)
+
+
+# Return active inventory records (jobs, timers, threads), optionally for the given owner only.
+def inventory(owner: Optional[str] = None) -> list[Any]:
+	with _inventoryLock:
+		# Records are retired as they become inactive, but be sure.
+		for record in [record for record in _inventory.values() if not record.active]:
+			_retireLocked(record)
+		return [record for record in _inventory.values() if owner is None or record.owner == owner]
+
+
+def _describeRecord(record: Any) -> str:
+	return (
+		f"{record.kind} {record.name} (owner: {record.owner}): "
+		f"started {time.strftime('%H:%M:%S', time.localtime(record.started))}, "
+		f"CPU time {record.cpuTime:.3f}s, wakeups {record.wakeups}"
+	)
+
+
+# Describe active and retired jobs, timers and threads, along with add-on threads that are alive.
+def inventoryReport(owner: Optional[str] = None) -> str:
+	report = [_describeRecord(record) for record in inventory(owner=owner)]
+	with _inventoryLock:
+		for recordOwner, (count, cpuTime, wakeups) in _retiredRecords.items():
+			if owner is None or recordOwner == owner:
+				report.append(f"finished (owner: {recordOwner}): {count}, CPU time {cpuTime:.3f}s, wakeups {wakeups}")
+	# Add-on threads are named with "SPL" prefix.
+	threads = [thread.name for thread in threading.enumerate() if thread.name.startswith("SPL")]
+	report.append(f"add-on threads alive: {', '.join(threads) if threads else 'none'}")
+	return "\n".join(report)
+
+
+# Log jobs, timers and threads of the given owner which are still active,
+# typically when the owner is terminating (anything left behind is leaking),
+# along with add-on threads that are alive.
+# Threads of cancelled tasks are given a short time (in seconds) to exit before being reported.
+leakGracePeriod = 0.25
+
+
+def reportLeaks(owner: Optional[str] = None) -> int:
+	deadline = time.monotonic() + leakGracePeriod
+	for job in list(_threadTasks):
+		if job._thread is not None and job.cancelled and (owner is None or job.owner == owner):
+			job._thread.join(max(deadline - time.monotonic(), 0))
+	leaks = inventory(owner=owner)
+	for record in leaks:
+		log.debugWarning(f"SPL: still active after termination: {_describeRecord(record)}")
+	threads = [thread.name for thread in threading.enumerate() if thread.name.startswith("SPL")]
+	if threads:
+		log.debugWarning(f"SPL: add-on threads alive after termination of {owner}: {', '.join(threads)}")
+	return len(leaks)
+
+
+# Heap of (due time, sequence number, job) entries.
+_jobQueue: list[tuple[float, int, ScheduledJob]] = []
+_jobCounter = itertools.count()
+_jobsChanged = threading.Condition()
+_schedulerThread: Optional[threading.Thread] = None
+# The job being run from the scheduler thread, if any.
+_runningJob: Optional[ScheduledJob] = None
+
+
+def _push(job: ScheduledJob, delay: float) -> None:
+	global _schedulerThread
+	with _jobsChanged:
+		job.due = time.monotonic() + delay
+		heapq.heappush(_jobQueue, (job.due, next(_jobCounter), job))
+		if _schedulerThread is None:
+			_schedulerThread = threading.Thread(target=_schedulerLoop, name="SPLScheduler", daemon=True)
+			_schedulerThread.start()
+		_jobsChanged.notify()
+
+
+def _removeCancelledJobs() -> None:
+	with _jobsChanged:
+		_jobQueue[:] = [entry for entry in _jobQueue if not entry[2].cancelled]
+		heapq.heapify(_jobQueue)
+		_jobsChanged.notify()
+
+
+def _schedulerLoop() -> None:
+	global _schedulerThread, _runningJob
+	while True:
+		with _jobsChanged:
+			while True:
+				if not _jobQueue:
+					# No more jobs, so let the thread go until another job is scheduled.
+					_schedulerThread = None
+					return
+				waitTime = _jobQueue[0][0] - time.monotonic()
+				if waitTime <= 0:
+					break
+				_jobsChanged.wait(waitTime)
+			job = _runningJob = heapq.heappop(_jobQueue)[2]
+		try:
+			delay = job._run()
+		except Exception:
+			log.error(f"SPL: scheduled job {job.name} failed", exc_info=True)
+			delay = None
+		_runningJob = None
+		if delay is not None and not job.cancelled:
+			_push(job, delay)
+			continue
+		if not job.cancelled:
+			job.finished = True
+		_retire(job)
+
+
+# Run func after delay (in seconds), repeating every interval seconds if given.
+def schedule(
+		delay: float, func: Callable[..., Any], *args: Any, name: Optional[str] = None, owner: Optional[str] = None,
+		interval: Optional[float] = None, mainThread: bool = False, **kwargs: Any
+) -> ScheduledJob:
+	job = ScheduledJob(
+		func, args, kwargs, name if name is not None else func.__name__, owner,
+		interval=interval, mainThread=mainThread
+	)
+	_push(job, delay)
+	return job
+
+
+# Run a task (a generator yielding seconds to wait before resuming it) after delay (in seconds).
+# Tasks are always run from the scheduler thread, thus they should not wait for anything by themselves.
+def runTask(
+		task: Generator[float, None, None], name: str, owner: Optional[str] = None, delay: float = 0
+) -> ScheduledJob:
+	job = ScheduledJob(None, (), {}, name, owner, task=task)
+	_push(job, delay)
+	return job
+
+
+# Tasks run from dedicated threads.
+_threadTasks: set[ScheduledJob] = set()
+
+
+def _threadTaskLoop(job: ScheduledJob) -> None:
+	while True:
+		try:
+			delay = job._run()
+		except Exception:
+			log.error(f"SPL: scheduled job {job.name} failed", exc_info=True)
+			delay = None
+		if delay is None or job.cancelled:
+			break
+		job._wakeup.wait(delay)
+	if not job.cancelled:
+		job.finished = True
+	_threadTasks.discard(job)
+	# The thread is about to exit, so the record can be retired.
+	_retire(job)
+
+
+# Run a task on its own thread (named after the task) rather than the scheduler thread.
+# Meant for long-running pollers which may block for a while, such as encoder status monitors.
+def runThreadTask(task: Generator[float, None, None], name: str, owner: Optional[str] = None) -> ScheduledJob:
+	job = ScheduledJob(None, (), {}, name, owner, task=task)
+	job.kind = "thread"
+	job._wakeup = threading.Event()
+	job._thread = threading.Thread(target=_threadTaskLoop, args=(job,), name=f"SPLTask {name}", daemon=True)
+	_threadTasks.add(job)
+	job._thread.start()
+	return job
+
+
+# Cancel all jobs owned by the given owner (or all jobs if owner is None),
+# returning the number of jobs cancelled.
+def cancelJobs(owner: Optional[str] = None) -> int:
+	with _jobsChanged:
+		jobs = [entry[2] for entry in _jobQueue if owner is None or entry[2].owner == owner]
+		# The job being run right now should not be scheduled again.
+		if _runningJob is not None and _runningJob.active and (owner is None or _runningJob.owner == owner):
+			jobs.append(_runningJob)
+		for job in jobs:
+			job.cancelled = True
+		# The job being run will be retired by the scheduler thread once it is done.
+		queuedJobs = [job for job in jobs if job is not _runningJob]
+	_removeCancelledJobs()
+	for job in queuedJobs:
+		_retire(job)
+	# Tasks run from dedicated threads are woken up so their threads can exit.
+	threadJobs = [
+		job for job in list(_threadTasks) if not job.cancelled and (owner is None or job.owner == owner)
+	]
+	for job in threadJobs:
+		job.cancel()
+	jobs += threadJobs
+	if jobs:
+		log.debug(f"SPL: cancelled {len(jobs)} scheduled jobs for {owner}")
+	return len(jobs)
+
+
+# Return pending jobs in due order, optionally for the given owner only.
+def pendingJobs(owner: Optional[str] = None) -> list[ScheduledJob]:
+	with _jobsChanged:
+		return [entry[2] for entry in sorted(_jobQueue) if owner is None or entry[2].owner == owner]
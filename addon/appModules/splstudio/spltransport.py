@@ -0,0 +1,284 @@
+# SPL Studio API transports
+# An app module and global plugin package for NVDA
+# Copyright 2021 Joseph Lee, released under GPL.
+# Provides ways for Studio API function in base services module to talk to Studio.
+# Besides the real thing (user32.SendMessageTimeout), Studio API requests can be answered
+# by a simulated Studio or replayed from a recording, allowing Studio API users to be measured without Studio.
+# This module provides services for base services module and should not import other add-on modules.
+# 21.03: nor NVDA modules, so transports can be used outside NVDA (benchmarks, for example).
+
+# #155 (21.03): remove __future__ import when NVDA runs under Python 3.10.
+from __future__ import annotations
+from typing import Any, Callable, Optional
+import abc
+import json
+import threading
+import time
+
+
+class StudioAPITransport(abc.ABC):
+	"""Delivers Studio API requests (WM_USER messages) to Studio and returns responses.
+	Window handles returned by a transport are meaningful only to that transport.
+	"""
+
+	# Return Studio window handle or 0 if Studio is not running.
+	@abc.abstractmethod
+	def findStudioWindow(self) -> int:
+		pass
+
+	# Is the given handle still the Studio window?
+	@abc.abstractmethod
+	def isStudioWindow(self, hwnd: int) -> bool:
+		pass
+
+	# Send a request and return the response,
+	# or None if the request failed or timed out (timeout in milliseconds).
+	@abc.abstractmethod
+	def sendMessage(self, hwnd: int, arg: int, command: int, timeout: int) -> Optional[int]:
+		pass
+
+	# Release resources such as files.
+	def close(self) -> None:
+		pass
+
+
+class User32Transport(StudioAPITransport):
+	"""Talks to the actual Studio window via user32 functions."""
+
+	SMTO_ABORTIFHUNG = 0x0002
+	SMTO_ERRORONEXIT = 0x0020
+
+	def __init__(self) -> None:
+		# Windows specific functions are looked up here so other transports can be used anywhere.
+		import ctypes
+		self._ctypes = ctypes
+		self._user32 = ctypes.windll.user32
+
+	def findStudioWindow(self) -> int:
+		return self._user32.FindWindowW("SPLStudio", None)
+
+	# This is much cheaper than looking up Studio window class across all top-level windows.
+	def isStudioWindow(self, hwnd: int) -> bool:
+		if not hwnd or not self._user32.IsWindow(hwnd):
+			return False
+		className = self._ctypes.create_unicode_buffer(256)
+		self._user32.GetClassNameW(hwnd, className, 256)
+		return className.value == "SPLStudio"
+
+	def sendMessage(self, hwnd: int, arg: int, command: int, timeout: int) -> Optional[int]:
+		result = self._ctypes.c_ssize_t()
+		if not self._user32.SendMessageTimeoutW(
+			hwnd, 1024, arg, command, self.SMTO_ABORTIFHUNG | self.SMTO_ERRORONEXIT, timeout,
+			self._ctypes.byref(result)
+		):
+			return None
+		return result.value
+
+
+class SimulatedStudioTransport(StudioAPITransport):
+	"""An in-memory Studio answering Studio API requests from its own state.
+	Playback time is driven by the clock function (time.monotonic by default)
+	so tests and benchmarks can control time.
+	"""
+
+	def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+		self.clock = clock
+		self.hwnd = 1
+		self.running = True
+		# Playlist and playback.
+		self.trackCount = 0
+		self.selectedTrack = -1
+		self.trackDuration = 0  # Milliseconds.
+		self.playbackStatus = 0  # 0 = stopped, 1 = playing, 3 = paused.
+		self._playbackStart = 0.0
+		self._playbackElapsed = 0.0
+		# Hour values keyed by hour info index (track duration, remaining and scheduled times).
+		self.hourInfo: dict[int, int] = {}
+		# Library scan: items scanned per progress query until scan is complete.
+		self.libraryItemCount = 0
+		self._libraryScanTotal = 0
+		self._libraryScanned = -1
+		self.libraryScanStep = 1
+		self.listenerCount = 0
+		# Status flags (see Studio app module for indecies) and metadata streaming flags (DSP encoder and URL 1-4).
+		self.statusFlags = [0] * 7
+		self.metadataFlags = [0] * 5
+		self.lastCart = 0
+		self.requests = 0
+		self._lock = threading.Lock()
+
+	# Simulate Studio starting (with a new window) or exiting.
+	def startStudio(self) -> None:
+		self.hwnd += 1
+		self.running = True
+
+	def exitStudio(self) -> None:
+		self.running = False
+
+	def startLibraryScan(self, itemCount: int) -> None:
+		self._libraryScanTotal = itemCount
+		self._libraryScanned = 0
+
+	def findStudioWindow(self) -> int:
+		return self.hwnd if self.running else 0
+
+	def isStudioWindow(self, hwnd: int) -> bool:
+		return self.running and hwnd == self.hwnd
+
+	def _elapsed(self) -> int:
+		if self.playbackStatus == 1:
+			return int(self._playbackElapsed + (self.clock() - self._playbackStart) * 1000)
+		return int(self._playbackElapsed)
+
+	def _setPlayback(self, status: int) -> None:
+		if status == 1 and self.playbackStatus != 1:
+			self._playbackStart = self.clock()
+		elif status != 1 and self.playbackStatus == 1:
+			self._playbackElapsed = self._elapsed()
+		if status == 0:
+			self._playbackElapsed = 0.0
+		self.playbackStatus = status
+		self.statusFlags[0] = int(status == 1)
+
+	def sendMessage(self, hwnd: int, arg: int, command: int, timeout: int) -> Optional[int]:
+		if not self.isStudioWindow(hwnd):
+			return None
+		with self._lock:
+			self.requests += 1
+			return self._respond(arg, command)
+
+	def _respond(self, arg: int, command: int) -> int:
+		if command == 12:  # Play.
+			self._setPlayback(1)
+		elif command == 13:  # Stop.
+			self._setPlayback(0)
+		elif command == 15:  # Pause (1) or resume (0).
+			self._setPlayback(3 if arg else 1)
+		elif command in (16, 17, 18):  # Automation, microphone, line in.
+			self.statusFlags[command - 15] = int(bool(arg))
+		elif command == 19:
+			self.lastCart = arg
+		elif command == 27:
+			return self.hourInfo.get(arg, 0)
+		elif command == 32:
+			if arg == 0:
+				return self.libraryItemCount
+			if self._libraryScanned < 0:
+				return -1
+			self._libraryScanned += self.libraryScanStep
+			if self._libraryScanned >= self._libraryScanTotal:
+				self.libraryItemCount = self._libraryScanTotal
+				self._libraryScanned = -1
+				return -1
+			return self._libraryScanned
+		elif command == 35:
+			return self.listenerCount
+		elif command == 36:
+			# Set (enable/disable in the high word) or get metadata streaming flag.
+			url = arg & 0xffff
+			if arg & 0xffff0000 == 0x00010000:
+				self.metadataFlags[url] = 1
+			elif arg & 0xffff0000 == 0xffff0000:
+				self.metadataFlags[url] = 0
+			return self.metadataFlags[url]
+		elif command == 39:
+			return self.statusFlags[arg] if 0 <= arg < len(self.statusFlags) else 0
+		elif command == 104:
+			return self.playbackStatus
+		elif command == 105:
+			# Elapsed (0) or remaining (3) time in milliseconds, with -1 meaning nothing is playing.
+			if self.playbackStatus == 0:
+				return -1
+			return self._elapsed() if arg == 0 else max(self.trackDuration - self._elapsed(), 0)
+		elif command == 121:
+			self.selectedTrack = arg
+		elif command == 124:
+			return self.trackCount
+		return 0
+
+
+class RecordingTransport(StudioAPITransport):
+	"""Passes requests to another transport (typically user32) and records requests and responses to a file.
+	The file contains one JSON object per line.
+	"""
+
+	def __init__(self, transport: StudioAPITransport, path: str) -> None:
+		self.transport = transport
+		self._file = open(path, "w", encoding="UTF-8")
+		self._start = time.perf_counter()
+		self._lock = threading.Lock()
+
+	def findStudioWindow(self) -> int:
+		return self.transport.findStudioWindow()
+
+	def isStudioWindow(self, hwnd: int) -> bool:
+		return self.transport.isStudioWindow(hwnd)
+
+	def sendMessage(self, hwnd: int, arg: int, command: int, timeout: int) -> Optional[int]:
+		start = time.perf_counter()
+		result = self.transport.sendMessage(hwnd, arg, command, timeout)
+		record = {
+			"time": round(start - self._start, 6), "latency": round(time.perf_counter() - start, 6),
+			"arg": arg, "command": command, "result": result
+		}
+		with self._lock:
+			if not self._file.closed:
+				self._file.write(json.dumps(record) + "\n")
+		return result
+
+	def close(self) -> None:
+		with self._lock:
+			self._file.close()
+		self.transport.close()
+
+
+class ReplayTransport(StudioAPITransport):
+	"""Answers requests from a recording made by recording transport.
+	Responses for each (arg, command) pair are given in recorded order,
+	with the last response repeated afterwards.
+	Unrecorded requests result in None (as though they timed out).
+	"""
+
+	def __init__(self, path: str) -> None:
+		self._responses: dict[tuple[Any, int], list[Optional[int]]] = {}
+		self._lastResponses: dict[tuple[Any, int], Optional[int]] = {}
+		with open(path, encoding="UTF-8") as recording:
+			for line in recording:
+				if not line.strip():
+					continue
+				record = json.loads(line)
+				self._responses.setdefault((record["arg"], record["command"]), []).append(record["result"])
+		for responses in self._responses.values():
+			responses.reverse()
+		self._lock = threading.Lock()
+
+	def findStudioWindow(self) -> int:
+		return 1
+
+	def isStudioWindow(self, hwnd: int) -> bool:
+		return hwnd == 1
+
+	def sendMessage(self, hwnd: int, arg: int, command: int, timeout: int) -> Optional[int]:
+		key = (arg, command)
+		with self._lock:
+			responses = self._responses.get(key)
+			if responses:
+				self._lastResponses[key] = responses.pop()
+			return self._lastResponses.get(key)
+
+
+# Return a transport given transport specification:
+# empty or "user32" (Studio), "simulated" (simulated Studio),
+# "record:path" (Studio, recording requests and responses to path) or "replay:path" (replay a recording).
+# Raises ValueError if the specification is not valid.
+def createTransport(spec: str = "") -> StudioAPITransport:
+	kind, sep, path = spec.partition(":")
+	if kind in ("", "user32") and not sep:
+		return User32Transport()
+	elif kind == "simulated" and not sep:
+		return SimulatedStudioTransport()
+	elif kind == "record" and path:
+		return RecordingTransport(User32Transport(), path)
+	elif kind == "replay" and path:
+		return ReplayTransport(path)
+	raise ValueError(f"Invalid Studio API transport: {spec}")
@@ -9,33 +9,20 @@
 
 # #155 (21.03): remove __future__ import when NVDA runs under Python 3.10.
 from __future__ import annotations
-from typing import Optional
+from typing import Mapping, Optional
 import appModuleHandler
 import addonHandler
 import tones
 from NVDAObjects.IAccessible import sysListView32
-from .splstudio import splconfig, SPLTrackItem
+from .splstudio import splconfig, splcolumns, SPLTrackItem
 addonHandler.initTranslation()
 
 
 # Return a tuple of column headers.
 # This is just a thinly disguised indexOf function from Studio's track item class.
+# 21.03: column headers are defined in splcolumns module.
 def indexOf(ttVersion: str) -> tuple[str, ...]:
-	# Nine columns per line for each tuple.
-	if ttVersion < "5.31":
-		return (
-			"Artist", "Title", "Duration", "Cue", "Overlap", "Intro", "Outro", "Segue", "Hook Start",
-			"Hook Len", "Year", "Album", "CD Code", "URL 1", "URL 2", "Genre", "Mood", "Energy",
-			"Tempo", "BPM", "Gender", "Rating", "Filename", "Client", "Other", "Intro Link", "Outro Link",
-			"ReplayGain", "Record Label", "ISRC"
-		)
-	else:
-		return (
-			"Artist", "Title", "Duration", "Cue", "Overlap", "Intro", "Outro", "Segue", "Hook Start",
-			"Hook Len", "Year", "Album", "CD Code", "URL 1", "URL 2", "Genre", "Mood", "Energy",
-			"Tempo", "BPM", "Gender", "Rating", "Filename", "Client", "Other", "Intro Link", "Outro Link",
-			"ReplayGain", "Record Label", "ISRC", "Language"
-		)
+	return splcolumns.trackToolColumns(ttVersion)
 
 
 class TrackToolItem(SPLTrackItem):
@@ -48,11 +35,13 @@ class TrackToolItem(SPLTrackItem):
 			tones.beep(550, 100)
 		super(TrackToolItem, self).reportFocus()
 
+	# 21.03: use header to column index map for this version, bound to the app module when first needed.
 	def indexOf(self, header: str) -> Optional[int]:
-		try:
-			return indexOf(self.appModule.productVersion).index(header)
-		except ValueError:
-			return None
+		columnIndices = self.appModule.columnIndices
+		if columnIndices is None:
+			columnIndices = splcolumns.headerMap("tracktool", self.appModule.productVersion)
+			self.appModule.columnIndices = columnIndices
+		return columnIndices.get(header)
 
 	@property
 	def exploreColumns(self) -> list[str]:
@@ -61,6 +50,9 @@ class TrackToolItem(SPLTrackItem):
 
 class AppModule(appModuleHandler.AppModule):
 
+	# 21.03: header to column index map for this Track Tool version (see track item's index of method).
+	columnIndices: Optional[Mapping[str, int]] = None
+
 	def __init__(self, *args, **kwargs):
 		super(AppModule, self).__init__(*args, **kwargs)
 		# #64 (18.07): load config database if not done already.
@@ -69,6 +61,8 @@ class AppModule(appModuleHandler.AppModule):
 	def terminate(self):
 		super(AppModule, self).terminate()
 		splconfig.closeConfig("tracktool")
+		# 21.03: forget column read strategies learned for this app.
+		SPLTrackItem.resetColumnReadStrategies(self.processID)
 
 	def chooseNVDAObjectOverlayClasses(self, obj, clsList):
 		import controlTypes
@@ -10,7 +10,7 @@ import scriptHandler
 import globalVars
 import config
 from NVDAObjects.IAccessible import getNVDAObjectFromEvent
-from winUser import user32, sendMessage, OBJID_CLIENT, getWindowText
+from winUser import user32, OBJID_CLIENT, getWindowText
 import addonHandler
 addonHandler.initTranslation()
 
@@ -32,23 +32,22 @@ def finally_(func, final):
 # SPL Studio uses WM messages to send and receive data, similar to Winamp.
 # See NVDA source/appModules/winamp.py for more information.
 
-# A handle to studio window.
-SPLWin = 0
-
-# Various SPL IPC tags.
-SPLVersion = 2
-SPLPlay = 12
-SPLStop = 13
-SPLPause = 15
-SPLAutomate = 16
-SPLMic = 17
-SPLLineIn = 18
-SPLCartPlayer = 19
-SPLLibraryScanCount = 32
-SPLListenerCount = 35
-SPLStatusInfo = 39
-SPL_TrackPlaybackStatus = 104
-SPLCurTrackPlaybackTime = 105
+# 21.03: Studio API client (Studio window handle cache, Studio API commands, batches and worker thread)
+# is shared with Studio app module and encoders.
+# Importing it loads the whole Studio app module package, so this is done once when first needed
+# (typically the first SPL Controller command) rather than when NVDA starts.
+# SPL Controller commands use Studio API worker so NVDA will not freeze if Studio is busy or is exiting,
+# with results (None if Studio is gone or the request timed out) passed to callbacks in main thread.
+_studioAPIClient = None
+
+
+def studioAPIClient():
+	global _studioAPIClient
+	if _studioAPIClient is None:
+		from appModules.splstudio import splbase
+		_studioAPIClient = splbase
+	return _studioAPIClient
+
 
 # Help message for SPL Controller
 # Translators: the dialog text for SPL Controller help.
@@ -105,10 +104,11 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 			script = self.script_error
 		return finally_(script, self.finish)
 
+	# 21.03: Studio API client, resolved when first needed.
+	def _get_splbase(self):
+		return studioAPIClient()
+
 	def finish(self):
-		# 21.03/20.09.6-LTS: clear SPL window handle.
-		global SPLWin
-		SPLWin = 0
 		self.SPLController = False
 		self.clearGestureBindings()
 
@@ -125,8 +125,8 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 		# Don't do anything if we're already focus on SPL Studio.
 		if "splstudio" in api.getForegroundObject().appModule.appName:
 			return
-		SPLHwnd = user32.FindWindowW("SPLStudio", None)
-		if not SPLHwnd:
+		# 21.03: use Studio window handle cache.
+		if not self.splbase.studioIsRunning(justChecking=True):
 			ui.message(_("SPL Studio is not running."))
 		# 17.01: SetForegroundWindow function is better, as there's no need to traverse top-level windows
 		# and allows users to "switch" to SPL window if the window is minimized.
@@ -149,7 +149,6 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 		description=_("SPl Controller layer command. See add-on guide for available commands.")
 	)
 	def script_SPLControllerPrefix(self, gesture):
-		global SPLWin
 		# Error checks:
 		# 1. If SPL Studio is not running, print an error message.
 		# 2. If we're already  in Studio, ask Studio app module if SPL Assistant can be invoked with this command.
@@ -163,8 +162,8 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 			else:
 				foregroundAppMod.script_SPLAssistantToggle(gesture)
 				return
-		SPLWin = user32.FindWindowW("SPLStudio", None)
-		if SPLWin == 0:
+		# 21.03: Studio window handle is cached by Studio API client.
+		if not self.splbase.studioIsRunning(justChecking=True):
 			# Translators: Presented when StationPlaylist Studio is not running.
 			ui.message(_("SPL Studio is not running."))
 			self.finish()
@@ -196,60 +195,75 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 			self.finish()
 
 	# The layer commands themselves. Calls user32.SendMessage method for each script.
+	# 21.03: through Studio API worker from Studio app module.
 
 	def script_automateOn(self, gesture):
-		sendMessage(SPLWin, 1024, 1, SPLAutomate)
+		self.splbase.studioAPIAsync(1, self.splbase.SPLAutomate)
 		self.finish()
 
 	def script_automateOff(self, gesture):
-		sendMessage(SPLWin, 1024, 0, SPLAutomate)
+		self.splbase.studioAPIAsync(0, self.splbase.SPLAutomate)
 		self.finish()
 
 	def script_micOn(self, gesture):
-		sendMessage(SPLWin, 1024, 1, SPLMic)
+		self.splbase.studioAPIAsync(1, self.splbase.SPLMic)
 		self.finish()
 
 	def script_micOff(self, gesture):
-		sendMessage(SPLWin, 1024, 0, SPLMic)
+		self.splbase.studioAPIAsync(0, self.splbase.SPLMic)
 		self.finish()
 
 	def script_micNoFade(self, gesture):
-		sendMessage(SPLWin, 1024, 2, SPLMic)
+		self.splbase.studioAPIAsync(2, self.splbase.SPLMic)
 		self.finish()
 
 	def script_lineInOn(self, gesture):
-		sendMessage(SPLWin, 1024, 1, SPLLineIn)
+		self.splbase.studioAPIAsync(1, self.splbase.SPLLineIn)
 		self.finish()
 
 	def script_lineInOff(self, gesture):
-		sendMessage(SPLWin, 1024, 0, SPLLineIn)
+		self.splbase.studioAPIAsync(0, self.splbase.SPLLineIn)
 		self.finish()
 
 	def script_stopFade(self, gesture):
-		sendMessage(SPLWin, 1024, 0, SPLStop)
+		self.splbase.studioAPIAsync(0, self.splbase.SPLStop)
 		self.finish()
 
 	def script_stopInstant(self, gesture):
-		sendMessage(SPLWin, 1024, 1, SPLStop)
+		self.splbase.studioAPIAsync(1, self.splbase.SPLStop)
 		self.finish()
 
 	def script_play(self, gesture):
-		sendMessage(SPLWin, 1024, 0, SPLPlay)
+		self.splbase.studioAPIAsync(0, self.splbase.SPLPlay)
 		self.finish()
 
 	def script_pause(self, gesture):
-		playingNow = sendMessage(SPLWin, 1024, 0, SPL_TrackPlaybackStatus)
+		self.splbase.studioAPIAsync(0, self.splbase.SPL_TrackPlaybackStatus, callback=self._pause)
+		self.finish()
+
+	def _pause(self, playingNow):
+		# 21.03: Studio is gone or busy.
+		if playingNow is None:
+			return
 		if not playingNow:
 			# Translators: Presented when no track is playing in StationPlaylist Studio.
 			ui.message(_("There is no track playing. Try pausing while a track is playing."))
-		elif playingNow == 3:
-			sendMessage(SPLWin, 1024, 0, SPLPause)
 		else:
-			sendMessage(SPLWin, 1024, 1, SPLPause)
-		self.finish()
+			# Playback status 3 means paused, so resume playback.
+			self.splbase.studioAPIAsync(0 if playingNow == 3 else 1, self.splbase.SPLPause)
 
 	def script_libraryScanProgress(self, gesture):
-		scanned = sendMessage(SPLWin, 1024, 1, SPLLibraryScanCount)
+		# 21.03: obtain scan progress and library item count in one batch.
+		self.splbase.studioAPIBatchAsync(
+			[(1, self.splbase.SPLLibraryScanCount), (0, self.splbase.SPLLibraryScanCount)],
+			callback=self._announceLibraryScanProgress
+		)
+		self.finish()
+
+	def _announceLibraryScanProgress(self, scanStatus):
+		if scanStatus is None:
+			return
+		scanned, itemCount = scanStatus
 		if scanned >= 0:
 			# Translators: Announces number of items in the Studio's track library (example: 1000 items scanned).
 			scanMessage = _("Scan in progress with {itemCount} items scanned").format(
@@ -258,22 +272,29 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 		else:
 			# Translators: Announces number of items in the Studio's track library (example: 1000 items scanned).
 			scanMessage = _("Scan complete with {itemCount} items scanned").format(
-				itemCount=sendMessage(SPLWin, 1024, 0, SPLLibraryScanCount)
+				itemCount=itemCount
 			)
 		ui.message(scanMessage)
-		self.finish()
 
 	def script_listenerCount(self, gesture):
+		self.splbase.studioAPIAsync(0, self.splbase.SPLListenerCount, callback=self._announceListenerCount)
+		self.finish()
+
+	def _announceListenerCount(self, listenerCount):
+		if listenerCount is None:
+			return
 		ui.message(
 			# Translators: Announces number of stream listeners.
-			_("Listener count: {listenerCount}").format(
-				listenerCount=sendMessage(SPLWin, 1024, 0, SPLListenerCount)
-			)
+			_("Listener count: {listenerCount}").format(listenerCount=listenerCount)
 		)
-		self.finish()
 
 	def script_remainingTime(self, gesture):
-		remainingTime = sendMessage(SPLWin, 1024, 3, SPLCurTrackPlaybackTime)
+		self.splbase.studioAPIAsync(3, self.splbase.SPLCurTrackPlaybackTime, callback=self._announceRemainingTime)
+		self.finish()
+
+	def _announceRemainingTime(self, remainingTime):
+		if remainingTime is None:
+			return
 		if remainingTime < 0:
 			# Translators: Presented when no track is playing in StationPlaylist Studio.
 			ui.message(_("There is no track playing."))
@@ -295,7 +316,6 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 					ui.message("{hh:02d}:{mm:02d}:{ss:02d}".format(hh=hh, mm=mm, ss=ss))
 				else:
 					ui.message("{mm:02d}:{ss:02d}".format(mm=mm, ss=ss))
-		self.finish()
 
 	@scriptHandler.script(
 		# Translators: Input help message for a SPL Controller command.
@@ -303,8 +323,7 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 	)
 	def script_encoderStatus(self, gesture):
 		# Go through below procedure, as custom commands can be assigned for this script.
-		SPLHwnd = user32.FindWindowW("SPLStudio", None)
-		if not SPLHwnd:
+		if not self.splbase.studioIsRunning(justChecking=True):
 			ui.message(_("SPL Studio is not running."))
 			self.finish()
 			return
@@ -324,35 +343,34 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 		description=_("Announces Studio status such as track playback status from other programs")
 	)
 	def script_statusInfo(self, gesture):
-		# Go through below procedure, as custom commands can be assigned for this script.
-		SPLHwnd = user32.FindWindowW("SPLStudio", None)
-		if not SPLHwnd:
-			ui.message(_("SPL Studio is not running."))
-			self.finish()
-			return
 		# Studio 5.20 and later allows fetching status bar info from anywhere via Studio API,
 		# including playback and automation status.
+		# 21.03: obtain all status flags in one batch via Studio API batch function from Studio app module.
+		# The batch checks Studio window handle before and after obtaining status flags,
+		# and because custom commands can be assigned for this script, this also checks if Studio is running.
+		# The batch is performed by Studio API worker so speech is not blocked if Studio is busy.
+		self.splbase.studioAPIBatchAsync(
+			[(0, self.splbase.SPL_TrackPlaybackStatus)]
+			+ [(index, self.splbase.SPLStatusInfo) for index in range(1, 7)],
+			callback=self._announceStatusInfo
+		)
+		self.finish()
+
+	def _announceStatusInfo(self, studioStatus):
+		if studioStatus is None:
+			ui.message(_("SPL Studio is not running."))
+			return
+		playingNow, automation, microphone, lineIn, recordToFile, cartEdit, cartInsert = studioStatus
 		# For consistency reasons (because of the Studio status bar),
 		# messages in this method will remain in English.
 		statusInfo = []
-		playingNow = sendMessage(SPLHwnd, 1024, 0, SPL_TrackPlaybackStatus)
 		statusInfo.append(
 			"Play status: playing" if playingNow else "Play status: stopped"
 		)
-		statusInfo.append(
-			"Automation On" if sendMessage(SPLHwnd, 1024, 1, SPLStatusInfo) else "Automation Off"
-		)
-		statusInfo.append(
-			"Microphone On" if sendMessage(SPLHwnd, 1024, 2, SPLStatusInfo) else "Microphone Off"
-		)
-		statusInfo.append(
-			"Line-In On" if sendMessage(SPLHwnd, 1024, 3, SPLStatusInfo) else "Line-In Off"
-		)
-		statusInfo.append(
-			"Record to file On" if sendMessage(SPLHwnd, 1024, 4, SPLStatusInfo) else "Record to file Off"
-		)
-		cartEdit = sendMessage(SPLHwnd, 1024, 5, SPLStatusInfo)
-		cartInsert = sendMessage(SPLHwnd, 1024, 6, SPLStatusInfo)
+		statusInfo.append("Automation On" if automation else "Automation Off")
+		statusInfo.append("Microphone On" if microphone else "Microphone Off")
+		statusInfo.append("Line-In On" if lineIn else "Line-In Off")
+		statusInfo.append("Record to file On" if recordToFile else "Record to file Off")
 		if cartEdit:
 			statusInfo.append("Cart Edit On")
 		elif not cartEdit and cartInsert:
@@ -360,7 +378,6 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 		else:
 			statusInfo.append("Cart Edit Off")
 		ui.message("; ".join(statusInfo))
-		self.finish()
 
 	def script_currentTrackTitle(self, gesture):
 		studioAppMod = getNVDAObjectFromEvent(user32.FindWindowW("TStudioForm", None), OBJID_CLIENT, 0).appModule
@@ -383,7 +400,7 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 		# Add 1 to cart index to comply with Studio API.
 		cart = self.cartKeys.index(cart) + 1
 		cart *= modifier
-		sendMessage(SPLWin, 1024, cart, SPLCartPlayer)
+		self.splbase.studioAPIAsync(cart, self.splbase.SPLCartPlayer)
 		self.finish()
 
 	def script_conHelp(self, gesture):
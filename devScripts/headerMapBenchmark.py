@@ -0,0 +1,46 @@
+# Column header map benchmark
+# Copyright 2021 Joseph Lee, released under GPL.
+# A development script, not part of the add-on package.
+# Compares column index lookups using header tuples (as done before header maps)
+# and header maps bound once (as track items do),
+# reporting seconds taken by each to look up all headers (plus a nonexistent one) many times.
+# Creator and Track Tool columns do not need NVDA, so run this with Python from the repository root:
+# python devScripts/headerMapBenchmark.py
+
+from __future__ import annotations
+from typing import Optional
+import importlib.util
+import os
+import time
+
+_splcolumnsPath = os.path.join(
+	os.path.dirname(os.path.abspath(__file__)), "..", "addon", "appModules", "splstudio", "splcolumns.py"
+)
+_spec = importlib.util.spec_from_file_location("splcolumns", _splcolumnsPath)
+splcolumns = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(splcolumns)
+
+
+def headerMapBenchmark(product: str, version: str = "", repeat: int = 10000) -> dict[str, float]:
+	headers = list(splcolumns._productColumns[product](version)) + ["Nonexistent"]
+
+	def legacyIndexOf(header: str) -> Optional[int]:
+		try:
+			return splcolumns._productColumns[product](version).index(header)
+		except ValueError:
+			return None
+
+	headerMapIndexOf = splcolumns.headerMap(product, version).get
+	results = {}
+	for name, lookup in (("headerTuple", legacyIndexOf), ("headerMap", headerMapIndexOf)):
+		start = time.perf_counter()
+		for i in range(repeat):
+			for header in headers:
+				lookup(header)
+		results[name] = time.perf_counter() - start
+	return results
+
+
+if __name__ == "__main__":
+	for product, version in (("creator", "5.31"), ("tracktool", "5.31")):
+		print(product, version, headerMapBenchmark(product, version))
@@ -0,0 +1,64 @@
+# Status bar dispatch benchmark
+# Copyright 2021 Joseph Lee, released under GPL.
+# A development script, not part of the add-on package.
+# Measures per-event status bar classification cost (in microseconds) for the legacy chain of conditions
+# (as done before status bar dispatch table) and the compiled dispatch table,
+# replaying status changes (status bar item, status text) many times. No status is announced.
+# Run this from NVDA Python console while Studio window is focused:
+# import sys; sys.path.append(r"path\to\devScripts"); import statusBarDispatchBenchmark
+# statusBarDispatchBenchmark.run(focus.appModule)
+
+from __future__ import annotations
+from typing import Any, Optional
+import time
+
+# Status changes (status bar item, status text) seen during a typical broadcast.
+statusChanges = [
+	(1, "Loading [12345] C:\\Music\\track.mp3"), (1, "  Play status: Playing"),
+	(2, "  Up time: 1d 02:03:04"), (2, "Listeners: 5"), (3, "Cart Edit Off"), (3, "Cart: Station ID"),
+	(4, "Scheduled for 10:00:00"), (2, "Automation On"), (1, "12 matches found")
+] * 10
+
+
+def run(
+		appModule: Any, changes: Optional[list[tuple[int, str]]] = None, repeat: int = 1000
+) -> dict[str, float]:
+	import api
+	from appModules.splstudio import splconfig
+	if changes is None:
+		changes = statusChanges
+
+	def legacyKind(name: str, childID: int) -> Optional[str]:
+		if name.startswith("  Up time:"):
+			return None
+		elif name.startswith("Scheduled for"):
+			return "scheduledFor" if splconfig.SPLConfig["SayStatus"]["SayScheduledFor"] else None
+		elif "Listener" in name:
+			return "listener" if splconfig.SPLConfig["SayStatus"]["SayListenerCount"] else None
+		elif name.startswith("Cart") and childID == 3:
+			return "cart" if splconfig.SPLConfig["SayStatus"]["SayPlayingCartName"] else None
+		elif "match" in name and api.getForegroundObject().windowClassName == "TTrackInsertForm":
+			return "match"
+		if childID == 1:
+			if "Play status" in name:
+				return "playStatus"
+			elif "Loading" in name:
+				return "loading"
+			elif "match" in name:
+				return "match"
+			return None
+		return "status"
+
+	def compiledKind(name: str, childID: int) -> Optional[str]:
+		kind = appModule._statusBarKind(name, childID)
+		return kind if appModule._statusBarDispatch[kind] is not None else None
+
+	appModule._compileStatusBarDispatch()
+	results = {}
+	for method, classifier in (("legacy", legacyKind), ("compiled", compiledKind)):
+		start = time.perf_counter()
+		for i in range(repeat):
+			for childID, name in changes:
+				classifier(name, childID)
+		results[method] = (time.perf_counter() - start) * 1000000 / (repeat * len(changes))
+	return results
@@ -0,0 +1,107 @@
+# Studio API simulation
+# Copyright 2021 Joseph Lee, released under GPL.
+# A development script, not part of the add-on package.
+# Drives Studio API base services (with scheduler) over a simulated Studio or a recording,
+# sending the requests made by the heartbeat, library scan reporter and status scripts,
+# and reporting seconds taken and requests sent by each.
+# Base services need NVDA modules for logging, translations and command-line switches only,
+# so minimal stand-ins are used for these if NVDA modules cannot be imported.
+# Run this with Python from the repository root:
+# python devScripts/studioAPISimulation.py [replay:path]
+
+from __future__ import annotations
+from typing import Any
+import builtins
+import importlib
+import logging
+import os
+import sys
+import time
+import types
+
+_splstudioPath = os.path.join(
+	os.path.dirname(os.path.abspath(__file__)), "..", "addon", "appModules", "splstudio"
+)
+
+
+# Load base services as part of a package without running Studio app module (package) code.
+def loadBaseServices(transportSpec: str = "simulated") -> Any:
+	for name in ("logHandler", "addonHandler", "globalVars"):
+		try:
+			importlib.import_module(name)
+		except ImportError:
+			sys.modules[name] = types.ModuleType(name)
+	logHandler = sys.modules["logHandler"]
+	if not hasattr(logHandler, "log"):
+		logHandler.log = logging.getLogger("SPL")
+		logHandler.log.debugWarning = logHandler.log.debug
+	addonHandler = sys.modules["addonHandler"]
+	if not hasattr(addonHandler, "initTranslation"):
+		addonHandler.initTranslation = lambda: setattr(builtins, "_", lambda text: text)
+	globalVars = sys.modules["globalVars"]
+	if not hasattr(globalVars, "appArgsExtra"):
+		globalVars.appArgsExtra = []
+	globalVars.appArgsExtra += [f"--spl-transport={transportSpec}", "--spl-apistats"]
+	package = types.ModuleType("splstudio")
+	package.__path__ = [_splstudioPath]
+	sys.modules["splstudio"] = package
+	return importlib.import_module("splstudio.splbase")
+
+
+# Heartbeat: library scan count, track count and Studio state flags in one batch.
+def heartbeat(splbase: Any, ticks: int = 1000) -> None:
+	requests = [(1, splbase.SPLLibraryScanCount), (0, splbase.SPLTrackCount)]
+	requests += [(index, splbase.SPLStatusInfo) for index in range(7)]
+	for tick in range(ticks):
+		splbase.studioAPIBatch(requests)
+
+
+# Library scan reporter: item count at scan start, then fresh progress samples until the scan is done.
+def libraryScan(splbase: Any, itemCount: int = 10000, step: int = 10) -> None:
+	transport = splbase._transport
+	if hasattr(transport, "startLibraryScan"):
+		transport.libraryScanStep = step
+		transport.startLibraryScan(itemCount)
+	splbase.studioAPIBatch([(1, splbase.SPLLibraryScanCount), (0, splbase.SPLLibraryScanCount)])
+	# Replayed recordings repeat the last response, so stop after the expected number of samples.
+	for sample in range(itemCount // step + 1):
+		splbase.invalidateStudioAPICache(splbase.SPLLibraryScanCount)
+		if splbase.studioAPI(1, splbase.SPLLibraryScanCount) in (None, -1):
+			break
+
+
+# Status scripts: SPL Assistant layer prefetch followed by status commands answered from prefetched responses.
+def statusScripts(splbase: Any, layers: int = 100) -> None:
+	requests = [(index, splbase.SPLStatusInfo) for index in range(7)]
+	requests += [(index, splbase.SPLHourInfo) for index in (0, 1, 3, 4)]
+	requests += [(0, splbase.SPLTrackCount), (0, splbase.SPLListenerCount)]
+	for layer in range(layers):
+		splbase.prefetchStudioAPI(requests).result()
+		for arg, command in requests:
+			splbase.studioAPI(arg, command, prefetched=True)
+		splbase.clearPrefetchedStudioAPIResponses()
+
+
+def run(transportSpec: str = "simulated") -> dict[str, tuple[float, int]]:
+	splbase = loadBaseServices(transportSpec)
+	from splstudio import splscheduler
+	# Studio window readiness is resolved by the probe run from the scheduler thread.
+	splscheduler.runTask(splbase.studioWindowReadyProbe(), "Studio window ready probe", owner="simulation")
+	splbase.studioWindowReady().result(timeout=5)
+	results = {}
+	scenarios = (("heartbeat", heartbeat), ("libraryScan", libraryScan), ("statusScripts", statusScripts))
+	for name, scenario in scenarios:
+		calls = sum(stats.calls for stats in splbase._studioAPIStats.values())
+		start = time.perf_counter()
+		scenario(splbase)
+		elapsed = time.perf_counter() - start
+		results[name] = (elapsed, sum(stats.calls for stats in splbase._studioAPIStats.values()) - calls)
+	splbase.terminateStudioAPIWorker()
+	print(splbase.studioAPIStatsReport())
+	print(splscheduler.inventoryReport())
+	return results
+
+
+if __name__ == "__main__":
+	for name, (elapsed, requests) in run(*sys.argv[1:2]).items():
+		print(f"{name}: {elapsed:.3f} seconds, {requests} requests sent")